@@ -27,12 +27,21 @@ class AbstractEmployee(BaseModel):
         null=True, 
         blank=True
     )
+    # Resized copies of ``image``, see apps.employee.images.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return self.name
     
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(fields=['created', 'id'], name='%(class)s_created_id_idx'),
+            models.Index(fields=['last_updated'], name='%(class)s_last_updated_idx'),
+            models.Index(fields=['status', 'created', 'id'], name='%(class)s_status_created_idx'),
+            models.Index(fields=['position', 'created', 'id'], name='%(class)s_position_created_idx'),
+            models.Index(fields=['department', 'created', 'id'], name='%(class)s_dept_created_idx'),
+        ]
 
 class AbstractStatus(BaseModel):
     name = models.CharField(max_length=50, unique=True)
@@ -42,6 +51,10 @@ class AbstractStatus(BaseModel):
     
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(fields=['created', 'id'], name='%(class)s_created_id_idx'),
+            models.Index(fields=['last_updated'], name='%(class)s_last_updated_idx'),
+        ]
 
 class AbstractPosition(BaseModel):
     name = models.CharField(max_length=100)
@@ -53,6 +66,11 @@ class AbstractPosition(BaseModel):
     class Meta:
         abstract = True
         unique_together = ('name', 'salary')
+        indexes = [
+            models.Index(fields=['created', 'id'], name='%(class)s_created_id_idx'),
+            models.Index(fields=['last_updated'], name='%(class)s_last_updated_idx'),
+            models.Index(fields=['name', 'id'], name='%(class)s_name_id_idx'),
+        ]
     
 class AbstractDepartment(BaseModel):
     name = models.CharField(max_length=100, unique=True)
@@ -68,4 +86,33 @@ class AbstractDepartment(BaseModel):
     
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(fields=['created', 'id'], name='%(class)s_created_id_idx'),
+            models.Index(fields=['last_updated'], name='%(class)s_last_updated_idx'),
+        ]
 
+
+
+class AbstractDepartmentSummary(models.Model):
+    """
+    Headcount, manager count and salary total of a department's employees,
+    kept up to date by ``apps.employee.summary``.
+    """
+    department = models.OneToOneField(
+        'employee.Department',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='summary'
+    )
+    headcount = models.PositiveIntegerField(default=0)
+    managers = models.PositiveIntegerField(default=0)
+    salary_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Set explicitly by the queryset updates in apps.employee.summary;
+    # conditional GETs of departments validate against it.
+    last_updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.department_id}: {self.headcount}'
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,207 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db.models import DecimalField
+from django.utils.numberformat import format as format_number
+
+from core.cache import LRUCache
+from .models import Department, Position, Status
+
+
+NATURAL_KEYS = {
+    Status: ('name',),
+    Position: ('name', 'salary'),
+    Department: ('name',),
+}
+
+
+class LookupCache:
+    """
+    Two tier cache for the small, read-mostly lookup tables.
+
+    The first tier is a per-process LRU whose entries expire after
+    ``local_ttl`` seconds, which bounds how stale another process's writes
+    can look. The optional second tier is a Django cache alias shared by
+    every worker. Both are invalidated by the post_save/post_delete handlers
+    in ``apps.employee.signals``.
+
+    Natural key lookups are remembered as key -> pk and re-checked against
+    the cached object, so renames don't need their old key evicted.
+
+    Shared keys carry a namespace version, so ``clear`` drops this cache's
+    entries by replacing it instead of clearing the whole alias. Processes
+    see the new version within ``local_ttl``.
+    """
+    version_key = 'lookup:version'
+
+    def __init__(self, max_size=1024, local_ttl=30, alias=None, timeout=300):
+        self.local = LRUCache(max_size=max_size, ttl=local_ttl)
+        self.alias = alias
+        self.timeout = timeout
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    @property
+    def shared(self):
+        return caches[self.alias] if self.alias else None
+
+    def _version(self):
+        if self.shared is None:
+            return ''
+        version = self.local.get(self.version_key, count=False)
+        if version is None:
+            version = self.shared.get(self.version_key)
+            if version is None:
+                self.shared.add(self.version_key, uuid.uuid4().hex, timeout=None)
+                version = self.shared.get(self.version_key)
+            self.local.set(self.version_key, version)
+        return version
+
+    def _pk_key(self, model, pk):
+        return f'lookup:{self._version()}:{model._meta.label_lower}:pk:{pk}'
+
+    def _natural_key_key(self, model, key):
+        digest = hashlib.md5(repr(key).encode(), usedforsecurity=False).hexdigest()
+        return f'lookup:{self._version()}:{model._meta.label_lower}:key:{digest}'
+
+    def _to_pk(self, model, pk):
+        try:
+            return model._meta.pk.to_python(pk)
+        except ValidationError:
+            return None
+
+    def _natural_key(self, model, values):
+        key = []
+        for name in NATURAL_KEYS[model]:
+            field = model._meta.get_field(name)
+            try:
+                value = field.to_python(values[name])
+            except (KeyError, ValidationError):
+                return None
+            if isinstance(field, DecimalField) and value is not None:
+                value = format_number(value, '.', decimal_pos=field.decimal_places)
+            key.append(str(value))
+        return tuple(key)
+
+    def _store(self, model, obj, shared=True):
+        entry = {'obj': obj, 'representations': {}}
+        key = self._pk_key(model, obj.pk)
+        self.local.set(key, entry)
+        if shared and self.shared is not None:
+            self.shared.set(key, obj, self.timeout)
+        return entry
+
+    def _get_entry(self, model, pk):
+        key = self._pk_key(model, pk)
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry
+        if self.shared is not None:
+            obj = self.shared.get(key)
+            if obj is not None:
+                self.shared_hits += 1
+                return self._store(model, obj, shared=False)
+            self.shared_misses += 1
+        obj = model.objects.filter(pk=pk).first()
+        if obj is None:
+            return None
+        return self._store(model, obj)
+
+    def get(self, model, pk):
+        pk = self._to_pk(model, pk)
+        if pk is None:
+            return None
+        entry = self._get_entry(model, pk)
+        return entry['obj'] if entry else None
+
+    def get_many(self, model, pks):
+        found, missing = {}, []
+        for pk in pks:
+            entry = self.local.get(self._pk_key(model, pk))
+            if entry is not None:
+                found[pk] = entry['obj']
+            else:
+                missing.append(pk)
+        if missing and self.shared is not None:
+            keys = {self._pk_key(model, pk): pk for pk in missing}
+            shared = self.shared.get_many(keys)
+            for key, obj in shared.items():
+                found[keys[key]] = obj
+                self._store(model, obj, shared=False)
+            self.shared_hits += len(shared)
+            self.shared_misses += len(missing) - len(shared)
+            missing = [pk for pk in missing if pk not in found]
+        if missing:
+            for pk, obj in model.objects.in_bulk(missing).items():
+                found[pk] = obj
+                self._store(model, obj)
+        return found
+
+    def find(self, model, values):
+        """
+        Returns the ``model`` row matching the ``values`` dict, or None.
+        Dicts holding exactly the natural key are served from the cache.
+        """
+        if set(values) != set(NATURAL_KEYS[model]):
+            return model.objects.filter(**values).first()
+        key = self._natural_key(model, values)
+        if key is None:
+            return None
+        cache_key = self._natural_key_key(model, key)
+        pk = self.local.get(cache_key)
+        if pk is None and self.shared is not None:
+            pk = self.shared.get(cache_key)
+        if pk is not None:
+            obj = self.get(model, pk)
+            if obj is not None and self._natural_key(model, vars(obj)) == key:
+                return obj
+        obj = model.objects.filter(**values).first()
+        if obj is not None:
+            self._store(model, obj)
+            self.local.set(cache_key, obj.pk)
+            if self.shared is not None:
+                self.shared.set(cache_key, obj.pk, self.timeout)
+        return obj
+
+    def representation(self, serializer_class, obj):
+        """
+        Returns ``serializer_class(obj).data``, serializing each lookup row
+        once. The cached copy is only used while ``last_updated`` matches.
+        """
+        model = type(obj)
+        key = self._pk_key(model, obj.pk)
+        entry = self.local.get(key)
+        if entry is None or entry['obj'].last_updated != obj.last_updated:
+            entry = self._store(model, obj, shared=False)
+        data = entry['representations'].get(serializer_class)
+        if data is None:
+            data = entry['representations'][serializer_class] = dict(serializer_class(obj).data)
+        return dict(data)
+
+    def invalidate(self, model, pk):
+        key = self._pk_key(model, pk)
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.set(self.version_key, uuid.uuid4().hex, timeout=None)
+
+    def stats(self):
+        stats = self.local.stats()
+        stats['shared_hits'] = self.shared_hits
+        stats['shared_misses'] = self.shared_misses
+        return stats
+
+
+def get_lookup_cache():
+    options = getattr(settings, 'EMPLOYEE_LOOKUP_CACHE', {})
+    return LookupCache(**{name.lower(): value for name, value in options.items()})
+
+
+lookup_cache = get_lookup_cache()
@@ -3,32 +3,47 @@ from apps.user.models import User
 from apps.employee.models import Employee, Position, Department, Status
 
 
+# Faker values repeat long before 10k rows; the sequence suffix keeps the
+# unique name columns unique however many rows are made.
+
 class PositionFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Position
 
-    name = factory.Faker('job')
+    class Params:
+        title = factory.Faker('job')
+
+    name = factory.LazyAttributeSequence(lambda o, n: f'{o.title[:90]} {n}')
     salary = factory.Faker('random_number', digits=5)
 
 class DepartmentFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Department
 
-    name = factory.Faker('company')
+    class Params:
+        company = factory.Faker('company')
+
+    name = factory.LazyAttributeSequence(lambda o, n: f'{o.company[:90]} {n}')
 
 class StatusFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Status
 
-    name = factory.Faker('word')
+    class Params:
+        word = factory.Faker('word')
+
+    name = factory.LazyAttributeSequence(lambda o, n: f'{o.word[:40]} {n}')
 
 class EmployeeFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Employee
 
-    name = factory.Faker('name')
+    class Params:
+        full_name = factory.Faker('name')
+
+    name = factory.LazyAttributeSequence(lambda o, n: f'{o.full_name} {n}')
     address = factory.Faker('address')
     is_manager = False
     position = factory.SubFactory(PositionFactory)
     department = factory.SubFactory(DepartmentFactory)
-    status = factory.SubFactory(StatusFactory)
\ No newline at end of file
+    status = factory.SubFactory(StatusFactory)
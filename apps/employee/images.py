@@ -0,0 +1,43 @@
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from apps.task.queue import PermanentError, task
+from core import images
+from core.cache import invalidate_instance
+from .models import Employee
+
+
+@task(max_attempts=3, retry_delay=60)
+def process_image(pk, name):
+    """
+    Builds the variants of employee ``pk``'s image ``name`` and records
+    them, unless another image was uploaded in the meantime. Files Pillow
+    can't decode fail without retries.
+    """
+    storage = Employee._meta.get_field('image').storage
+    with storage.open(name) as source:
+        try:
+            variants = images.build_variants(source, storage)
+        except (UnidentifiedImageError, Image.DecompressionBombError) as exc:
+            raise PermanentError({'error': str(exc)})
+    updated = Employee.objects.filter(pk=pk, image=name).update(
+        image_variants={'source': name, 'sizes': variants},
+        last_updated=timezone.now(),
+    )
+    if updated:
+        invalidate_instance(Employee(pk=pk))
+
+
+def schedule_image(employee):
+    """
+    Queues variant generation if ``employee``'s image changed since the
+    variants were made. The task is enqueued in the saving transaction.
+    """
+    name = employee.image.name or ''
+    if name == (employee.image_variants or {}).get('source', ''):
+        return
+    if not name:
+        Employee.objects.filter(pk=employee.pk).update(image_variants={})
+        employee.image_variants = {}
+        return
+    process_image.enqueue(key=f'employee-image:{employee.pk}:{name}', pk=employee.pk, name=name)
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.indexes import IndexAdvisor
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the filter, search and ordering fields of the routed "
+        "viewsets with the indexes created by the migrations and proposes "
+        "the missing ones as Meta.indexes entries; add them to the models "
+        "and run makemigrations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('app_label', nargs='*', help='Only check models of these apps.')
+        parser.add_argument('--check', action='store_true', help='Exit with an error if indexes are missing.')
+
+    def handle(self, *args, **options):
+        advisor = IndexAdvisor(options['app_label'])
+        report = advisor.advise()
+        for view, needs, unindexable in report:
+            self.stdout.write(f'{view.__name__} ({view.queryset.model._meta.label})')
+            for need in needs:
+                if advisor.is_covered(need):
+                    state = self.style.SUCCESS('covered')
+                else:
+                    state = self.style.WARNING('missing')
+                fields = ', '.join(need.fields)
+                self.stdout.write(f'  {state}  {need.model._meta.label} ({fields}) <- {need.reason}')
+            for search_field in unindexable:
+                self.stdout.write(f'  {self.style.NOTICE("no index")}  search {search_field!r} is a substring match')
+
+        missing = advisor.missing(report)
+        if not missing:
+            self.stdout.write('All indexes are in place.')
+            return
+
+        self.stdout.write('\nProposed Meta.indexes entries:')
+        for label, indexes in advisor.meta_indexes(missing).items():
+            self.stdout.write(f'  {label}:')
+            for index in indexes:
+                self.stdout.write(f'    models.Index(fields={index.fields!r}, name={index.name!r}),')
+        if options['check']:
+            raise CommandError(f'{len(missing)} index(es) missing.')
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from services.employee.imports import FORMATS, EmployeeImport, ImportFileError
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates or updates employees from a CSV or XLSX file whose first "
+        "row names the columns: name, address, is_manager, position, "
+        "position_salary, department and status. Positions, departments "
+        "and statuses are given by name and must exist. Existing employees "
+        "keep the fields of columns the file doesn't have. Rows that fail are "
+        "listed in an error report; valid rows are written in chunks, and "
+        "--resume carries on after the last chunk an interrupted run wrote."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file's extension.")
+        parser.add_argument('--chunk-size', type=int, default=EmployeeImport.chunk_size, help="Rows per transaction.")
+        parser.add_argument('--resume', action='store_true', help="Skip the rows a previous run committed.")
+        parser.add_argument('--report', help="Error report path; defaults to PATH.errors.csv.")
+        parser.add_argument('--progress', help="Progress file path; defaults to PATH.progress.json.")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        try:
+            importer = EmployeeImport(
+                options['path'],
+                format=options['format'],
+                progress_path=options['progress'],
+                report_path=options['report'],
+                chunk_size=options['chunk_size'],
+            )
+            result = importer.run(
+                resume=options['resume'],
+                progress=self.progress if options['verbosity'] > 1 else None,
+            )
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(
+            f'Imported {result["rows"]} rows: {result["created"]} created, '
+            f'{result["updated"]} updated, {result["failed"]} failed.'
+        )
+        if result['failed']:
+            self.stdout.write(f'Errors are listed in {importer.report_path}.')
+
+    def progress(self, state):
+        self.stdout.write(f'{state["rows"]} rows, {state["failed"]} failed')
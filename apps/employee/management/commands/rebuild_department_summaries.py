@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.employee import summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the department summaries from the employee table, e.g. "
+        "after rows were changed with queryset.update() or raw SQL. With "
+        "--check, only reports the summaries that are out of date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Compare the summaries with the employee table without writing.",
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = summary.check()
+            for department_id, stored, expected in mismatches:
+                self.stdout.write(f'Department {department_id}: stored {stored}, expected {expected}.')
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} department summaries are out of date.')
+            self.stdout.write('Department summaries are consistent.')
+            return
+        with transaction.atomic():
+            count = summary.refresh()
+        self.stdout.write(f'Rebuilt {count} department summaries.')
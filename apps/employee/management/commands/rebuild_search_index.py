@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from apps.employee.search import employee_search
+from core.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the employee search index from the database, e.g. after "
+        "rows were changed with queryset.update() or raw SQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        with transaction.atomic(using=options['database']):
+            backend.install(employee_search)
+            backend.rebuild(employee_search)
+        self.stdout.write(f'Rebuilt {employee_search.table} with {type(backend).__name__}.')
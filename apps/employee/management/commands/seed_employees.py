@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.employee.seeding import EmployeeSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Adds synthetic employees for development and benchmarks, spread "
+        "over shared pools of positions, departments and statuses. The same "
+        "--seed always gives the same rows and rerunning it adds nothing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, help="Number of employees.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per transaction.")
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help="Processes generating rows; they insert them too unless the database is SQLite.",
+        )
+        parser.add_argument('--positions', type=int, default=50)
+        parser.add_argument('--departments', type=int, default=20)
+        parser.add_argument('--statuses', type=int, default=5)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        for name in ('count', 'batch_size', 'processes', 'positions', 'departments', 'statuses'):
+            if options[name] < 1:
+                label = name if name == 'count' else '--' + name.replace('_', '-')
+                raise CommandError(f'{label} must be at least 1.')
+        seeder = EmployeeSeeder(
+            options['count'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            processes=options['processes'],
+            positions=options['positions'],
+            departments=options['departments'],
+            statuses=options['statuses'],
+            using=options['database'],
+        )
+        started = time.perf_counter()
+        inserted = seeder.run(progress=self.progress if options['verbosity'] > 1 else None)
+        elapsed = time.perf_counter() - started
+        skipped = options['count'] - inserted
+        self.stdout.write(
+            f'Inserted {inserted} employees in {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):.0f} rows/s)'
+            + (f', {skipped} already existed.' if skipped > 0 else '.')
+        )
+
+    def progress(self, done, total):
+        self.stdout.write(f'{done}/{total}')
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0003_alter_employee_department_alter_employee_position_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(fields=['created', 'id'], name='department_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['created', 'id'], name='employee_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(fields=['created', 'id'], name='position_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='status',
+            index=models.Index(fields=['created', 'id'], name='status_created_id_idx'),
+        ),
+    ]
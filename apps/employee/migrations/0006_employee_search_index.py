@@ -0,0 +1,34 @@
+from django.db import migrations
+
+from core.search import SearchIndex, get_search_backend
+
+
+FIELDS = ('name', 'address', 'position__name', 'department__name', 'status__name')
+WEIGHTS = (4, 1, 2, 2, 1)
+
+
+def get_index(apps):
+    return SearchIndex(apps.get_model('employee', 'Employee'), FIELDS, WEIGHTS)
+
+
+def install_search_index(apps, schema_editor):
+    backend = get_search_backend(schema_editor.connection.alias)
+    index = get_index(apps)
+    backend.install(index)
+    if backend.persistent:
+        backend.rebuild(index)
+
+
+def uninstall_search_index(apps, schema_editor):
+    get_search_backend(schema_editor.connection.alias).uninstall(get_index(apps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0005_endpoint_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
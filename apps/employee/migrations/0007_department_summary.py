@@ -0,0 +1,57 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def build_summaries(apps, schema_editor):
+    Department = apps.get_model('employee', 'Department')
+    DepartmentSummary = apps.get_model('employee', 'DepartmentSummary')
+    Employee = apps.get_model('employee', 'Employee')
+    using = schema_editor.connection.alias
+    totals = {
+        row['department']: row
+        for row in Employee.objects.using(using).filter(department__isnull=False).order_by()
+        .values('department')
+        .annotate(
+            headcount=Count('pk'),
+            managers=Count('pk', filter=Q(is_manager=True)),
+            salary_total=Sum('position__salary'),
+        )
+    }
+    DepartmentSummary.objects.using(using).bulk_create(
+        [
+            DepartmentSummary(
+                department_id=pk,
+                headcount=totals.get(pk, {}).get('headcount', 0),
+                managers=totals.get(pk, {}).get('managers', 0),
+                salary_total=totals.get(pk, {}).get('salary_total') or 0,
+            )
+            for pk in Department.objects.using(using).values_list('pk', flat=True)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0006_employee_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentSummary',
+            fields=[
+                ('department', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='employee.department')),
+                ('headcount', models.PositiveIntegerField(default=0)),
+                ('managers', models.PositiveIntegerField(default=0)),
+                ('salary_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0007_department_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0008_employee_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='departmentsummary',
+            name='last_updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
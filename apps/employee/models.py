@@ -2,6 +2,7 @@ from django.db import models
 
 from .abstract_models import (
     AbstractDepartment,
+    AbstractDepartmentSummary,
     AbstractEmployee,
     AbstractPosition,
     AbstractStatus,
@@ -18,3 +19,6 @@ class Position(AbstractPosition):
 
 class Status(AbstractStatus):
     pass
+
+class DepartmentSummary(AbstractDepartmentSummary):
+    pass
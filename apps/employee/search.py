@@ -0,0 +1,8 @@
+from core.search import SearchIndex
+from .models import Employee
+
+
+EMPLOYEE_SEARCH_FIELDS = ('name', 'address', 'position__name', 'department__name', 'status__name')
+EMPLOYEE_SEARCH_WEIGHTS = (4, 1, 2, 2, 1)
+
+employee_search = SearchIndex(Employee, EMPLOYEE_SEARCH_FIELDS, EMPLOYEE_SEARCH_WEIGHTS)
@@ -0,0 +1,218 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+import django
+from django.db import connections, transaction
+from faker import Faker
+
+from core.cache import invalidate_models
+from core.search import get_search_backend
+from . import summary
+from .models import Department, Employee, Position, Status
+from .search import employee_search
+
+
+STATUS_NAMES = ('Active', 'On leave', 'Probation', 'Remote', 'Contractor', 'Notice period', 'Retired', 'Suspended')
+
+
+def unique_values(make, count):
+    """
+    Returns ``count`` distinct values of ``make()``, numbering repeats.
+    """
+    values, seen = [], set()
+    while len(values) < count:
+        value = make()
+        if value in seen:
+            value = f'{value} {len(values)}'
+        if value not in seen:
+            seen.add(value)
+            values.append(value)
+    return values
+
+
+def build_lookups(seed, positions, departments, statuses):
+    """
+    Returns the deterministic lookup pools for ``seed``: unsaved Position,
+    Department and Status instances.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    return (
+        [
+            Position(name=name, salary=Decimal(rng.randrange(30000, 200000, 500)))
+            for name in unique_values(lambda: fake.job()[:90], positions)
+        ],
+        [Department(name=name) for name in unique_values(lambda: fake.company()[:90], departments)],
+        [
+            Status(name=name)
+            for name in (STATUS_NAMES[:statuses] if statuses <= len(STATUS_NAMES) else unique_values(fake.word, statuses))
+        ],
+    )
+
+
+def build_words(seed, size=500):
+    """
+    Returns pools of first names, last names, street addresses and city
+    lines to build employees from; Faker is too slow to call per row.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    return (
+        [fake.first_name() for _ in range(size)],
+        [fake.last_name() for _ in range(size * 2)],
+        [fake.street_address() for _ in range(size * 4)],
+        [f'{fake.city()}, {fake.state_abbr()} {fake.postcode()}' for _ in range(size)],
+    )
+
+
+def build_rows(seed, start, count, pools):
+    """
+    Returns ``count`` employee rows (dicts of column values) starting at
+    employee number ``start``. Each row depends only on the seed and its
+    number, so rows don't change with the batch size or process count.
+    """
+    (position_ids, department_ids, status_ids), (first_names, last_names, streets, cities) = pools
+    rng = random.Random()
+    choice, chance = rng.choice, rng.random
+    rows = []
+    for number in range(start, start + count):
+        rng.seed(f'{seed}:{number}')
+        rows.append({
+            # The number keeps names unique and makes reruns skip existing rows.
+            'name': f'{choice(first_names)} {choice(last_names)} #{number}',
+            'address': f'{choice(streets)}\n{choice(cities)}',
+            'is_manager': chance() < 0.1,
+            'position_id': choice(position_ids) if chance() < 0.97 else None,
+            'department_id': choice(department_ids) if chance() < 0.98 else None,
+            'status_id': choice(status_ids),
+        })
+    return rows
+
+
+def insert_rows(rows, using):
+    with transaction.atomic(using=using):
+        Employee.objects.using(using).bulk_create(
+            [Employee(**row) for row in rows],
+            ignore_conflicts=True,
+        )
+    return len(rows)
+
+
+def _init_process():
+    # Forked children mustn't share the parent's database connections.
+    django.setup()
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+
+
+def _build_and_insert(seed, start, count, pools, using):
+    try:
+        return insert_rows(build_rows(seed, start, count, pools), using)
+    finally:
+        connections.close_all()
+
+
+class EmployeeSeeder:
+    """
+    Adds ``count`` synthetic employees spread over shared pools of
+    positions, departments and statuses, in ``batch_size`` row
+    transactions of bulk_create.
+
+    The same seed gives the same rows, and rows that already exist (by
+    name) are skipped, so rerunning a seed is harmless. Chunks are built
+    by ``processes`` processes; they also insert them where the database
+    takes concurrent writers, while SQLite's chunks are inserted by this
+    process.
+    """
+
+    def __init__(self, count, seed=0, batch_size=5000, processes=1,
+                 positions=50, departments=20, statuses=5, using='default'):
+        self.count = count
+        self.seed = seed
+        self.batch_size = batch_size
+        self.processes = processes
+        self.positions = positions
+        self.departments = departments
+        self.statuses = statuses
+        self.using = using
+
+    @property
+    def parallel_writes(self):
+        connection = connections[self.using]
+        return self.processes > 1 and connection.vendor != 'sqlite'
+
+    def seed_lookups(self):
+        """
+        Creates the lookup pools that don't exist yet and returns the ids
+        of each pool.
+        """
+        pools = build_lookups(self.seed, self.positions, self.departments, self.statuses)
+        ids = []
+        for model, objs, fields in zip((Position, Department, Status), pools, (('name', 'salary'), ('name',), ('name',))):
+            manager = model.objects.using(self.using)
+            manager.bulk_create(objs, ignore_conflicts=True)
+            # Positions are unique by name and salary, the others by name.
+            existing = {
+                tuple(row[:-1]): row[-1]
+                for row in manager.filter(name__in=[obj.name for obj in objs]).values_list(*fields, 'pk')
+            }
+            ids.append([existing[tuple(getattr(obj, field) for field in fields)] for obj in objs])
+        return tuple(ids)
+
+    def chunks(self):
+        for start in range(0, self.count, self.batch_size):
+            yield start, min(self.batch_size, self.count - start)
+
+    def run(self, progress=None):
+        """
+        Seeds the rows and returns the number of employees inserted, which
+        is less than ``count`` when some already existed;
+        ``progress(done, total)`` is called after every chunk processed.
+        """
+        employees = Employee.objects.using(self.using)
+        existing = employees.count()
+        pools = self.seed_lookups(), build_words(self.seed)
+        done = 0
+        if self.processes <= 1:
+            for start, size in self.chunks():
+                done += insert_rows(build_rows(self.seed, start, size, pools), self.using)
+                self.report(progress, done)
+        else:
+            if self.parallel_writes:
+                # Connections can't cross a fork; the pool's processes open their own.
+                connections.close_all()
+            with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_process) as pool:
+                if self.parallel_writes:
+                    futures = [
+                        pool.submit(_build_and_insert, self.seed, start, size, pools, self.using)
+                        for start, size in self.chunks()
+                    ]
+                    for future in futures:
+                        done += future.result()
+                        self.report(progress, done)
+                else:
+                    futures = [
+                        pool.submit(build_rows, self.seed, start, size, pools)
+                        for start, size in self.chunks()
+                    ]
+                    for future in futures:
+                        done += insert_rows(future.result(), self.using)
+                        self.report(progress, done)
+        self.finish()
+        return employees.count() - existing
+
+    def report(self, progress, done):
+        if progress is not None:
+            progress(done, self.count)
+
+    def finish(self):
+        # bulk_create sends no signals: refresh what the handlers maintain.
+        backend = get_search_backend(self.using)
+        with transaction.atomic(using=self.using):
+            backend.install(employee_search)
+            backend.rebuild(employee_search)
+        summary.refresh(using=self.using)
+        invalidate_models(Employee, Position, Department, Status)
+
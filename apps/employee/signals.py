@@ -0,0 +1,124 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from core.cache import invalidate_instance
+from core.search import get_search_backend
+from . import images, summary
+from .cache import lookup_cache
+from .models import Department, DepartmentSummary, Employee, Position, Status
+from .search import employee_search
+
+
+def invalidate_lookup(sender, instance, **kwargs):
+    lookup_cache.invalidate(sender, instance.pk)
+
+
+for model in (Status, Position, Department):
+    post_save.connect(invalidate_lookup, sender=model, dispatch_uid=f'invalidate_lookup_{model.__name__}')
+    post_delete.connect(invalidate_lookup, sender=model, dispatch_uid=f'invalidate_lookup_{model.__name__}')
+
+
+def invalidate_responses(sender, instance, **kwargs):
+    invalidate_instance(instance)
+
+
+for model in (Employee, Status, Position, Department):
+    post_save.connect(invalidate_responses, sender=model, dispatch_uid=f'invalidate_responses_{model.__name__}')
+    post_delete.connect(invalidate_responses, sender=model, dispatch_uid=f'invalidate_responses_{model.__name__}')
+
+
+def index_employee(sender, instance, using, **kwargs):
+    get_search_backend(using).update(employee_search, [instance.pk])
+
+
+def remove_employee(sender, instance, using, **kwargs):
+    get_search_backend(using).remove(employee_search, [instance.pk])
+
+
+def reindex_dependents(sender, instance, using, **kwargs):
+    pks = getattr(instance, '_search_dependents', None)
+    if pks is None:
+        pks = employee_search.dependents(instance)
+    get_search_backend(using).update(employee_search, pks)
+
+
+def collect_dependents(sender, instance, **kwargs):
+    # Deleting nulls the employees' foreign keys, so find them beforehand.
+    instance._search_dependents = employee_search.dependents(instance)
+
+
+post_save.connect(index_employee, sender=Employee, dispatch_uid='index_employee')
+post_delete.connect(remove_employee, sender=Employee, dispatch_uid='remove_employee')
+
+for model in (Status, Position, Department):
+    pre_delete.connect(collect_dependents, sender=model, dispatch_uid=f'collect_dependents_{model.__name__}')
+    post_save.connect(reindex_dependents, sender=model, dispatch_uid=f'reindex_dependents_{model.__name__}')
+    post_delete.connect(reindex_dependents, sender=model, dispatch_uid=f'reindex_dependents_{model.__name__}')
+
+
+def tracks(update_fields, fields):
+    return update_fields is None or not set(update_fields).isdisjoint(fields)
+
+
+def collect_employee_summary(sender, instance, update_fields=None, **kwargs):
+    if not tracks(update_fields, summary.SUMMARY_FIELDS):
+        return
+    previous = None if instance._state.adding else summary.stored_employee_state(instance.pk)
+    instance._summary_previous = (previous,)
+
+
+def update_employee_summary(sender, instance, **kwargs):
+    tracked = instance.__dict__.pop('_summary_previous', None)
+    if tracked is not None:
+        summary.move_employee(tracked[0], summary.employee_state(instance))
+
+
+def remove_employee_summary(sender, instance, **kwargs):
+    summary.move_employee(summary.employee_state(instance), None)
+
+
+def collect_position_salary(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or not tracks(update_fields, ('salary',)):
+        return
+    instance._summary_salary = Position.objects.filter(pk=instance.pk).values_list('salary', flat=True).first()
+
+
+def update_position_salary(sender, instance, **kwargs):
+    previous = instance.__dict__.pop('_summary_salary', None)
+    if previous is None:
+        return
+    salary = Position._meta.get_field('salary').to_python(instance.salary)
+    if salary != previous:
+        summary.change_salary(summary.position_headcounts(instance), salary - previous)
+
+
+def collect_position_headcounts(sender, instance, **kwargs):
+    # Deleting nulls the employees' positions, so count them beforehand.
+    instance._summary_headcounts = summary.position_headcounts(instance)
+
+
+def remove_position_salary(sender, instance, **kwargs):
+    headcounts = instance.__dict__.pop('_summary_headcounts', {})
+    summary.change_salary(headcounts, -Position._meta.get_field('salary').to_python(instance.salary))
+
+
+def create_department_summary(sender, instance, created, **kwargs):
+    if created:
+        DepartmentSummary.objects.get_or_create(department=instance)
+
+
+pre_save.connect(collect_employee_summary, sender=Employee, dispatch_uid='collect_employee_summary')
+post_save.connect(update_employee_summary, sender=Employee, dispatch_uid='update_employee_summary')
+post_delete.connect(remove_employee_summary, sender=Employee, dispatch_uid='remove_employee_summary')
+pre_save.connect(collect_position_salary, sender=Position, dispatch_uid='collect_position_salary')
+post_save.connect(update_position_salary, sender=Position, dispatch_uid='update_position_salary')
+pre_delete.connect(collect_position_headcounts, sender=Position, dispatch_uid='collect_position_headcounts')
+post_delete.connect(remove_position_salary, sender=Position, dispatch_uid='remove_position_salary')
+post_save.connect(create_department_summary, sender=Department, dispatch_uid='create_department_summary')
+
+
+def schedule_employee_image(sender, instance, update_fields=None, **kwargs):
+    if tracks(update_fields, ('image',)):
+        images.schedule_image(instance)
+
+
+post_save.connect(schedule_employee_image, sender=Employee, dispatch_uid='schedule_employee_image')
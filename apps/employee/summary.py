@@ -0,0 +1,146 @@
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from core.cache import invalidate_models
+from .models import Department, DepartmentSummary, Employee
+
+
+SUMMARY_FIELDS = ('department', 'is_manager', 'position')
+
+
+def compute(department_ids=None, using=DEFAULT_DB_ALIAS):
+    """
+    Returns ``{department_id: (headcount, managers, salary_total)}`` computed
+    from the employee table, for every department or just the given ones.
+    """
+    departments = Department.objects.using(using)
+    if department_ids is not None:
+        departments = departments.filter(pk__in=department_ids)
+    totals = {pk: (0, 0, Decimal('0.00')) for pk in departments.values_list('pk', flat=True)}
+    rows = (
+        Employee.objects.using(using).filter(department__in=list(totals)).order_by()
+        .values('department')
+        .annotate(
+            headcount=Count('pk'),
+            managers=Count('pk', filter=Q(is_manager=True)),
+            salary_total=Sum('position__salary'),
+        )
+    )
+    for row in rows:
+        totals[row['department']] = (row['headcount'], row['managers'], row['salary_total'] or Decimal('0.00'))
+    return totals
+
+
+def refresh(department_ids=None, using=DEFAULT_DB_ALIAS):
+    """
+    Recomputes the summaries of the given departments (all by default),
+    creating missing rows. Returns the number of summaries written.
+    """
+    totals = compute(department_ids, using)
+    now = timezone.now()
+    DepartmentSummary.objects.using(using).bulk_create(
+        [
+            DepartmentSummary(
+                department_id=pk, headcount=headcount, managers=managers, salary_total=salary_total, last_updated=now,
+            )
+            for pk, (headcount, managers, salary_total) in totals.items()
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['department'],
+        update_fields=['headcount', 'managers', 'salary_total', 'last_updated'],
+    )
+    invalidate_models(DepartmentSummary)
+    return len(totals)
+
+
+def check():
+    """
+    Returns ``(department_id, stored, expected)`` for every summary that
+    doesn't match the employee table; ``stored`` is None for missing rows.
+    """
+    stored = {
+        pk: (headcount, managers, salary_total)
+        for pk, headcount, managers, salary_total in DepartmentSummary.objects.values_list(
+            'department', 'headcount', 'managers', 'salary_total'
+        )
+    }
+    return [
+        (pk, stored.get(pk), expected)
+        for pk, expected in sorted(compute().items())
+        if stored.get(pk) != expected
+    ]
+
+
+def apply(department_id, headcount=0, managers=0, salary_total=0):
+    """
+    Adds the given deltas to a department's summary in one UPDATE, so
+    concurrent writers don't lose each other's changes.
+    """
+    if department_id is None or not (headcount or managers or salary_total):
+        return
+    updated = DepartmentSummary.objects.filter(department_id=department_id).update(
+        headcount=F('headcount') + headcount,
+        managers=F('managers') + managers,
+        salary_total=F('salary_total') + salary_total,
+        last_updated=timezone.now(),
+    )
+    if updated:
+        invalidate_models(DepartmentSummary)
+    else:
+        # No row yet (e.g. a department made by bulk_create); the employee
+        # table already reflects this change.
+        refresh([department_id])
+
+
+def employee_state(employee):
+    """
+    Returns what ``employee`` contributes to its department's summary.
+    """
+    salary = employee.position.salary if employee.position_id else Decimal('0.00')
+    return employee.department_id, employee.is_manager, salary
+
+
+def stored_employee_state(pk):
+    return Employee.objects.filter(pk=pk).values_list('department', 'is_manager', 'position__salary').first()
+
+
+def move_employee(previous, current):
+    """
+    Moves an employee's contribution from state ``previous`` to
+    ``current``; either may be None for a created or deleted employee.
+    """
+    if previous == current:
+        return
+    deltas = {}
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is None:
+            continue
+        department_id, is_manager, salary = state
+        headcount, managers, salary_total = deltas.get(department_id, (0, 0, 0))
+        deltas[department_id] = (
+            headcount + sign,
+            managers + sign * bool(is_manager),
+            salary_total + sign * (salary or 0),
+        )
+    for department_id, (headcount, managers, salary_total) in deltas.items():
+        apply(department_id, headcount, managers, salary_total)
+
+
+def position_headcounts(position):
+    """
+    Returns ``{department_id: employees}`` for the holders of ``position``.
+    """
+    rows = (
+        Employee.objects.filter(position=position, department__isnull=False).order_by()
+        .values_list('department').annotate(count=Count('pk'))
+    )
+    return dict(rows)
+
+
+def change_salary(headcounts, difference):
+    for department_id, count in headcounts.items():
+        apply(department_id, salary_total=count * difference)
@@ -0,0 +1,85 @@
+from django.test import TestCase
+from apps.employee.cache import lookup_cache
+from apps.employee.models import Position, Status
+from services.employee.serializers import StatusSerializer
+from .factories import DepartmentFactory, PositionFactory, StatusFactory
+
+
+class LookupCacheTestCase(TestCase):
+
+    def setUp(self):
+        lookup_cache.clear()
+        self.position = PositionFactory(name="Developer", salary=100000)
+        self.status = StatusFactory(name="Active")
+
+    def test_get_is_served_from_cache(self):
+        self.assertEqual(lookup_cache.get(Status, self.status.id), self.status)
+        with self.assertNumQueries(0):
+            self.assertEqual(lookup_cache.get(Status, str(self.status.id)), self.status)
+
+    def test_get_falls_back_to_shared_tier(self):
+        lookup_cache.get(Status, self.status.id)
+        lookup_cache.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(lookup_cache.get(Status, self.status.id), self.status)
+
+    def test_get_many(self):
+        other = StatusFactory(name="Inactive")
+        lookup_cache.get(Status, self.status.id)
+        with self.assertNumQueries(1):
+            found = lookup_cache.get_many(Status, [self.status.id, other.id, 99999])
+        self.assertEqual(found, {self.status.id: self.status, other.id: other})
+
+    def test_invalid_id(self):
+        self.assertIsNone(lookup_cache.get(Status, 'abc'))
+        self.assertIsNone(lookup_cache.get(Status, 99999))
+
+    def test_save_and_delete_invalidate(self):
+        lookup_cache.get(Status, self.status.id)
+        Status.objects.get(id=self.status.id).update(save=True, name="Archived")
+        self.assertEqual(lookup_cache.get(Status, self.status.id).name, "Archived")
+        Status.objects.get(id=self.status.id).delete()
+        self.assertIsNone(lookup_cache.get(Status, self.status.id))
+
+    def test_find_by_natural_key(self):
+        found = lookup_cache.find(Position, {"name": "Developer", "salary": 100000})
+        self.assertEqual(found, self.position)
+        with self.assertNumQueries(0):
+            found = lookup_cache.find(Position, {"name": "Developer", "salary": "100000.00"})
+        self.assertEqual(found, self.position)
+        self.assertIsNone(lookup_cache.find(Position, {"name": "Developer", "salary": 1}))
+
+    def test_find_misses_after_rename(self):
+        lookup_cache.find(Status, {"name": "Active"})
+        self.status.update(save=True, name="Retired")
+        self.assertIsNone(lookup_cache.find(Status, {"name": "Active"}))
+        self.assertEqual(lookup_cache.find(Status, {"name": "Retired"}), self.status)
+
+    def test_find_with_other_fields_uses_database(self):
+        department = DepartmentFactory(name="IT")
+        self.assertEqual(lookup_cache.find(type(department), {"name": "IT", "manager": None}), department)
+
+    def test_representation_is_reused_until_row_changes(self):
+        data = lookup_cache.representation(StatusSerializer, self.status)
+        self.assertEqual(data, StatusSerializer(self.status).data)
+        self.assertEqual(lookup_cache.representation(StatusSerializer, self.status), data)
+
+        status = Status.objects.get(id=self.status.id)
+        status.update(save=True, name="Paused")
+        self.assertEqual(lookup_cache.representation(StatusSerializer, status)['name'], "Paused")
+
+    def test_clear_only_drops_lookup_entries(self):
+        lookup_cache.shared.set('other', 'kept')
+        lookup_cache.get(Status, self.status.id)
+        lookup_cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(lookup_cache.get(Status, self.status.id), self.status)
+        self.assertEqual(lookup_cache.shared.get('other'), 'kept')
+
+    def test_stats(self):
+        lookup_cache.local.reset_stats()
+        lookup_cache.get(Status, self.status.id)
+        lookup_cache.get(Status, self.status.id)
+        stats = lookup_cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
@@ -0,0 +1,83 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.employee.images import process_image
+from apps.employee.models import Employee
+from apps.task.models import Task
+from core import images
+from .factories import EmployeeFactory
+
+
+def make_image(size=(1200, 600), format='JPEG', color=(200, 30, 30), orientation=6):
+    image = Image.new('RGB', size, color)
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class ImageVariantsTestCase(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings = override_settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_VARIANTS={'SIZES': {'thumbnail': 64, 'medium': 300}, 'PREFIX': 'variants'},
+            TASKS={'EAGER': True},
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_build_variants_resizes_and_strips_metadata(self):
+        variants = images.build_variants(io.BytesIO(make_image()), default_storage)
+        self.assertEqual(set(variants), {'thumbnail', 'medium'})
+        # Orientation 6 turns the 1200x600 image upright.
+        self.assertEqual((variants['medium']['width'], variants['medium']['height']), (150, 300))
+        self.assertEqual((variants['thumbnail']['width'], variants['thumbnail']['height']), (32, 64))
+        for format, name in variants['medium']['files'].items():
+            self.assertTrue(name.startswith('variants/'))
+            with default_storage.open(name) as file, Image.open(file) as variant:
+                self.assertEqual(variant.format, images.FORMATS[format][0])
+                self.assertEqual(dict(variant.getexif()), {})
+
+        again = images.build_variants(io.BytesIO(make_image()), default_storage)
+        self.assertEqual(again, variants)
+
+    def test_small_images_are_not_enlarged(self):
+        variants = images.build_variants(io.BytesIO(make_image(size=(40, 20), format='PNG', orientation=1)), default_storage)
+        self.assertEqual((variants['medium']['width'], variants['medium']['height']), (40, 20))
+
+    def test_upload_builds_variants_after_commit(self):
+        employee = EmployeeFactory()
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.update(save=True, image=ContentFile(make_image(), name='photo.jpg'))
+            self.assertEqual(Employee.objects.get(pk=employee.pk).image_variants, {})
+        employee.refresh_from_db()
+        self.assertEqual(employee.image_variants['source'], employee.image.name)
+        self.assertEqual(set(employee.image_variants['sizes']), {'thumbnail', 'medium'})
+
+        with mock.patch.object(process_image, 'enqueue') as enqueue:
+            employee.update(save=True, address="Elsewhere")
+        enqueue.assert_not_called()
+
+        employee.update(save=True, image=None)
+        self.assertEqual(Employee.objects.get(pk=employee.pk).image_variants, {})
+
+    def test_undecodable_upload_fails_without_retries(self):
+        employee = EmployeeFactory()
+        with self.assertLogs('apps.task', 'WARNING'), self.captureOnCommitCallbacks(execute=True):
+            employee.update(save=True, image=ContentFile(b'not an image', name='photo.jpg'))
+        queued = Task.objects.get(name=process_image.name)
+        self.assertEqual((queued.status, queued.attempts), (Task.FAILED, 1))
+        self.assertIn('cannot identify image file', queued.result['error'])
+        self.assertEqual(Employee.objects.get(pk=employee.pk).image_variants, {})
@@ -0,0 +1,44 @@
+from django.test import TestCase
+
+from apps.employee.models import Employee
+from apps.employee.search import employee_search
+from core.search import InMemoryBackend, parse_query
+from .factories import EmployeeFactory, PositionFactory
+
+
+class InMemoryBackendTestCase(TestCase):
+
+    def setUp(self):
+        self.backend = InMemoryBackend(max_results=10)
+        position = PositionFactory(name="Developer")
+        self.john = EmployeeFactory(name="John Doe", address="Oak Street", position=position)
+        self.jane = EmployeeFactory(name="Jane Oakley", address="Developer Lane", position=None)
+
+    def search(self, query):
+        return [pk for pk, _ in self.backend.search(employee_search, query)]
+
+    def test_parse_query(self):
+        self.assertEqual(parse_query('Oak* street, "x"'), [('oak', True), ('street', False), ('x', False)])
+
+    def test_builds_from_database_and_ranks(self):
+        self.assertEqual(self.search('developer'), [self.john.pk, self.jane.pk])
+        self.assertEqual(self.search('oak'), [self.john.pk])
+        self.assertEqual(self.search('oak*'), [self.jane.pk, self.john.pk])
+        self.assertEqual(self.search('oak* lane'), [self.jane.pk])
+        self.assertEqual(self.search('nobody'), [])
+
+    def test_follows_updates_and_removals(self):
+        self.search('oak')
+        Employee.objects.filter(pk=self.john.pk).update(address="Pine Street")
+        self.assertEqual(self.search('pine'), [])
+        self.backend.update(employee_search, [self.john.pk])
+        self.assertEqual(self.search('pine'), [self.john.pk])
+        self.backend.remove(employee_search, [self.john.pk])
+        self.assertEqual(self.search('pine'), [])
+
+    def test_filter_annotates_rank(self):
+        queryset = self.backend.filter(employee_search, Employee.objects.all(), 'developer')
+        rows = list(queryset.order_by('search_rank').values_list('pk', 'search_rank'))
+        self.assertEqual([pk for pk, _ in rows], [self.john.pk, self.jane.pk])
+        self.assertLess(rows[0][1], rows[1][1])
+        self.assertFalse(self.backend.filter(employee_search, Employee.objects.all(), 'nobody').exists())
@@ -0,0 +1,47 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.employee import summary
+from apps.employee.models import Department, Employee, Position, Status
+from apps.employee.seeding import EmployeeSeeder, build_rows, build_words
+
+
+class EmployeeSeederTestCase(TestCase):
+
+    def seed(self, count, inserted=None, **kwargs):
+        result = EmployeeSeeder(count, positions=5, departments=3, statuses=2, **kwargs).run()
+        if inserted is not None:
+            self.assertEqual(result, inserted)
+        return list(Employee.objects.order_by('name').values_list(
+            'name', 'address', 'is_manager', 'position__name', 'department__name', 'status__name',
+        ))
+
+    def test_rows_depend_only_on_seed(self):
+        pools = ([1, 2], [3], [4]), build_words(7, size=20)
+        rows = build_rows(7, 0, 10, pools)
+        self.assertEqual(rows, build_rows(7, 0, 10, pools))
+        self.assertNotEqual(rows, build_rows(8, 0, 10, pools))
+        self.assertEqual(len({row['name'] for row in rows}), 10)
+
+    def test_deterministic_and_idempotent(self):
+        employees = self.seed(25, inserted=25, seed=1, batch_size=10)
+        self.assertEqual(len(employees), 25)
+        self.assertEqual((Position.objects.count(), Department.objects.count(), Status.objects.count()), (5, 3, 2))
+        # The same rows whatever the batch size or process count; reruns add nothing.
+        self.assertEqual(self.seed(25, inserted=0, seed=1, batch_size=7, processes=2), employees)
+        Employee.objects.all().delete()
+        self.assertEqual(self.seed(25, seed=1, batch_size=25), employees)
+        self.assertEqual(summary.check(), [])
+
+    def test_command(self):
+        out = StringIO()
+        call_command('seed_employees', 30, '--seed', '2', '--batch-size', '8', stdout=out)
+        self.assertIn('Inserted 30 employees', out.getvalue())
+        self.assertEqual(Employee.objects.count(), 30)
+
+        out = StringIO()
+        call_command('seed_employees', 40, '--seed', '2', stdout=out)
+        self.assertIn('Inserted 10 employees', out.getvalue())
+        self.assertIn('30 already existed', out.getvalue())
@@ -0,0 +1,69 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.employee import summary
+from apps.employee.models import DepartmentSummary, Employee
+from .factories import DepartmentFactory, EmployeeFactory, PositionFactory
+
+
+class DepartmentSummaryTestCase(TestCase):
+
+    def setUp(self):
+        self.developer = PositionFactory(name="Developer", salary=1000)
+        self.it = DepartmentFactory(name="IT")
+        self.hr = DepartmentFactory(name="HR")
+        self.john = EmployeeFactory(name="John Doe", position=self.developer, department=self.it, is_manager=True)
+
+    def assertSummary(self, department, headcount, managers, salary_total):
+        stored = DepartmentSummary.objects.get(department=department)
+        self.assertEqual((stored.headcount, stored.managers, stored.salary_total), (headcount, managers, Decimal(salary_total)))
+
+    def test_follows_employee_writes(self):
+        self.assertSummary(self.hr, 0, 0, 0)
+        self.assertSummary(self.it, 1, 1, 1000)
+        jane = EmployeeFactory(position=PositionFactory(salary=500), department=self.it)
+        self.assertSummary(self.it, 2, 1, 1500)
+
+        jane.update(save=True, department=self.hr, is_manager=True)
+        self.assertSummary(self.it, 1, 1, 1000)
+        self.assertSummary(self.hr, 1, 1, 500)
+
+        self.john.update(save=True, position=None)
+        self.assertSummary(self.it, 1, 1, 0)
+        jane.address = "Elsewhere"
+        with CaptureQueriesContext(connection) as queries:
+            jane.save(update_fields=['address', 'last_updated'])
+        self.assertFalse([query for query in queries if 'departmentsummary' in query['sql']])
+
+        jane.delete()
+        self.assertSummary(self.hr, 0, 0, 0)
+        self.assertEqual(summary.check(), [])
+
+    def test_follows_position_writes(self):
+        EmployeeFactory(position=self.developer, department=self.hr)
+        self.developer.update(save=True, salary=1200)
+        self.assertSummary(self.it, 1, 1, 1200)
+        self.assertSummary(self.hr, 1, 0, 1200)
+        self.developer.delete()
+        self.assertSummary(self.it, 1, 1, 0)
+        self.assertEqual(summary.check(), [])
+
+    def test_rebuild_and_check_commands(self):
+        Employee.objects.filter(pk=self.john.pk).update(department=self.hr)
+        DepartmentSummary.objects.filter(department=self.hr).delete()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_department_summaries', '--check', stdout=StringIO())
+        self.assertEqual([pk for pk, _, _ in summary.check()], sorted([self.it.pk, self.hr.pk]))
+
+        call_command('rebuild_department_summaries', stdout=StringIO())
+        self.assertSummary(self.it, 0, 0, 0)
+        self.assertSummary(self.hr, 1, 1, 1000)
+        out = StringIO()
+        call_command('rebuild_department_summaries', '--check', stdout=out)
+        self.assertIn('consistent', out.getvalue())
@@ -0,0 +1,10 @@
+from .models import Task
+from django.contrib import admin
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_at', 'created_by', 'last_updated')
+    search_fields = ('name', 'idempotency_key')
+    list_filter = ('status', 'name')
+
+
+admin.site.register(Task, TaskAdmin)
@@ -0,0 +1,28 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from apps.task.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued background tasks with a pool of worker processes until "
+        "stopped with SIGINT/SIGTERM, letting running tasks finish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            help="Worker processes (TASKS['PROCESSES'] by default); 0 runs tasks in this process.",
+        )
+        parser.add_argument('--poll-interval', type=float, help="Seconds between polls when idle.")
+        parser.add_argument('--once', action='store_true', help="Exit once no task is due.")
+
+    def handle(self, *args, **options):
+        worker = Worker(processes=options['processes'], poll_interval=options['poll_interval'])
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+        processed = worker.run(once=options['once'])
+        self.stdout.write(f'Processed {processed} tasks.')
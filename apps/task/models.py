@@ -0,0 +1,5 @@
+from .abstract_models import AbstractTask
+
+
+class Task(AbstractTask):
+    pass
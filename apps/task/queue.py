@@ -0,0 +1,185 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+
+_registry = {}
+# (pk, locked_by, lease) of the task this worker is running.
+_current_run = ContextVar('current_run', default=None)
+
+
+class TaskNotRegistered(LookupError):
+    pass
+
+
+class PermanentError(Exception):
+    """
+    Raised by a task to fail without being retried. ``result`` is stored as
+    the task's result, e.g. to report what was wrong with its input.
+    """
+
+    def __init__(self, result=None):
+        super().__init__(result)
+        self.result = result
+
+
+class LeaseLost(Exception):
+    """
+    Raised by heartbeat() when another worker took the running task over,
+    so this run stops instead of repeating the other's work.
+    """
+
+
+def get_options():
+    options = {
+        'EAGER': False,
+        'PROCESSES': 2,
+        'POLL_INTERVAL': 1.0,
+        'LEASE': 300,
+    }
+    options.update(getattr(settings, 'TASKS', {}))
+    return options
+
+
+class TaskDefinition:
+    """
+    A function the worker may run. Failed runs are retried up to
+    ``max_attempts`` times in all, ``retry_delay`` seconds apart, doubling
+    each time. ``on_failure`` is called with the task's kwargs once it
+    failed for good, e.g. to remove files it was meant to consume.
+
+    A task runs in one transaction unless ``atomic`` is False; such a task
+    commits its own work, e.g. in chunks it records as done, which an outer
+    transaction would roll back together on a failure.
+
+    A run holds its task for ``lease`` seconds (the LEASE option by
+    default); after that another worker takes it for dead and runs it
+    again. Tasks that may run longer ask for more, or call heartbeat().
+    """
+
+    def __init__(self, func, name, max_attempts, retry_delay, on_failure=None, atomic=True, lease=None):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.on_failure = on_failure
+        self.atomic = atomic
+        self.lease = lease
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def __repr__(self):
+        return f'<TaskDefinition {self.name}>'
+
+    def enqueue(self, key=None, delay=0, created_by=None, **kwargs):
+        return enqueue(self.name, kwargs, key=key, delay=delay, created_by=created_by)
+
+    def retry_at(self, attempts):
+        return timezone.now() + timedelta(seconds=self.retry_delay * 2 ** max(attempts - 1, 0))
+
+    def get_lease(self):
+        return get_options()['LEASE'] if self.lease is None else self.lease
+
+
+def task(func=None, *, max_attempts=3, retry_delay=30, on_failure=None, atomic=True, lease=None):
+    """
+    Registers a module level function as a task, named by its dotted path.
+    The function takes JSON serializable keyword arguments; its return
+    value, if any, is stored as the task's result.
+    """
+    def register(func):
+        definition = TaskDefinition(
+            func, f'{func.__module__}.{func.__qualname__}', max_attempts, retry_delay, on_failure, atomic, lease,
+        )
+        _registry[definition.name] = definition
+        return definition
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    """
+    Returns the TaskDefinition named ``name``, importing its module if this
+    process hasn't yet. Only functions registered with @task are returned.
+    """
+    if name not in _registry:
+        try:
+            import_string(name)
+        except ImportError:
+            pass
+    try:
+        return _registry[name]
+    except KeyError:
+        raise TaskNotRegistered(name)
+
+
+def enqueue(name, kwargs=None, key=None, delay=0, created_by=None):
+    """
+    Adds a run of task ``name`` and returns its Task row. ``created_by`` is
+    the user it's queued for, if any.
+
+    The row is written in the current transaction, so the task only runs
+    if the surrounding write commits. Enqueuing a ``key`` that was used
+    before returns the existing task instead of adding another.
+    """
+    definition = get_task(name)
+    values = {
+        'name': definition.name,
+        'kwargs': kwargs or {},
+        'max_attempts': definition.max_attempts,
+        'run_at': timezone.now() + timedelta(seconds=delay),
+        'created_by': created_by,
+    }
+    if key is None:
+        created = Task.objects.create(**values)
+    else:
+        try:
+            with transaction.atomic():
+                created = Task.objects.create(idempotency_key=key, **values)
+        except IntegrityError:
+            return Task.objects.get(idempotency_key=key)
+    if get_options()['EAGER']:
+        from .worker import run_task
+        transaction.on_commit(lambda: run_task(created.pk))
+    return created
+
+
+@contextmanager
+def running(pk, locked_by, lease):
+    """
+    Marks task ``pk``, claimed as ``locked_by``, as the one heartbeat()
+    renews while the block runs.
+    """
+    token = _current_run.set((pk, locked_by, lease))
+    try:
+        yield
+    finally:
+        _current_run.reset(token)
+
+
+def heartbeat():
+    """
+    Renews the lease of the task being run, for tasks that can outlast it.
+    Call it from time to time outside the task's transaction (so from
+    tasks with ``atomic=False``); elsewhere it does nothing. Raises
+    LeaseLost when the lease lapsed and another worker took the task.
+    """
+    run = _current_run.get()
+    if run is None:
+        return
+    pk, locked_by, lease = run
+    now = timezone.now()
+    renewed = Task.objects.filter(pk=pk, status=Task.RUNNING, locked_by=locked_by).update(
+        locked_until=now + timedelta(seconds=lease),
+        last_updated=now,
+    )
+    if not renewed:
+        raise LeaseLost(pk)
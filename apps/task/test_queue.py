@@ -0,0 +1,132 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.task.models import Task
+from apps.task.queue import PermanentError, TaskNotRegistered, enqueue, get_task, heartbeat, task
+from apps.task.worker import Worker, claim, execute
+
+
+calls = []
+failures = []
+leases = []
+
+
+@task(max_attempts=2, retry_delay=0)
+def record(value):
+    calls.append(value)
+    return {'value': value}
+
+
+@task(max_attempts=2, retry_delay=60, on_failure=lambda fail: failures.append(fail))
+def flaky(fail):
+    calls.append(fail)
+    if fail == 'permanent':
+        raise PermanentError({'reason': fail})
+    raise ValueError(fail)
+
+
+@task(max_attempts=2, atomic=False, lease=3600, on_failure=lambda take_over: failures.append(take_over))
+def long_running(take_over):
+    leases.append(Task.objects.get(status=Task.RUNNING).locked_until)
+    heartbeat()
+    if take_over:
+        # Another worker claims the task as if this run's lease had lapsed.
+        Task.objects.filter(status=Task.RUNNING).update(locked_by='other')
+        heartbeat()
+    return {'done': True}
+
+
+class TaskQueueTestCase(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        failures.clear()
+        leases.clear()
+
+    def test_enqueue_and_run(self):
+        queued = record.enqueue(value=1)
+        self.assertEqual((queued.name, queued.status, queued.kwargs), (record.name, Task.PENDING, {'value': 1}))
+        record.enqueue(value=2, delay=3600)
+        self.assertEqual(Worker(processes=0).run(once=True), 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.result), (Task.SUCCEEDED, 1, {'value': 1}))
+        self.assertEqual(calls, [1])
+
+    def test_idempotency_key_queues_once(self):
+        first = record.enqueue(key='report:1', value=1)
+        second = record.enqueue(key='report:1', value=2)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_retries_then_fails(self):
+        queued = flaky.enqueue(fail='once')
+        [pk] = claim(10, 300, 'worker')
+        with self.assertLogs('apps.task', 'WARNING'):
+            self.assertEqual(execute(pk), Task.PENDING)
+        queued.refresh_from_db()
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.run_at, timezone.now() + timedelta(seconds=50))
+        self.assertIn('ValueError: once', queued.last_error)
+        self.assertEqual(claim(10, 300, 'worker'), [])
+        self.assertEqual(failures, [])
+
+        Task.objects.filter(pk=pk).update(run_at=timezone.now())
+        [pk] = claim(10, 300, 'worker')
+        with self.assertLogs('apps.task', 'WARNING'):
+            self.assertEqual(execute(pk), Task.FAILED)
+        self.assertEqual(failures, ['once'])
+
+    def test_permanent_errors_and_unknown_tasks_are_not_retried(self):
+        queued = flaky.enqueue(fail='permanent')
+        unknown = Task.objects.create(name='apps.task.test_queue.missing')
+        with self.assertLogs('apps.task', 'WARNING'):
+            Worker(processes=0).run(once=True)
+        queued.refresh_from_db()
+        unknown.refresh_from_db()
+        self.assertEqual((queued.status, queued.result), (Task.FAILED, {'reason': 'permanent'}))
+        self.assertEqual((unknown.status, unknown.attempts), (Task.FAILED, 1))
+        with self.assertRaises(TaskNotRegistered):
+            get_task('os.path.join')
+
+    def test_lapsed_lease_is_claimed_again(self):
+        queued = record.enqueue(value=1)
+        self.assertEqual(claim(10, 300, 'first'), [queued.pk])
+        self.assertEqual(claim(10, 300, 'second'), [])
+        Task.objects.filter(pk=queued.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(claim(10, 300, 'second'), [queued.pk])
+        self.assertEqual(execute(queued.pk), Task.SUCCEEDED)
+        self.assertEqual(Task.objects.get(pk=queued.pk).attempts, 2)
+
+    def test_long_tasks_keep_their_lease(self):
+        queued = long_running.enqueue(take_over=False)
+        [pk] = claim(10, 300, 'worker')
+        self.assertEqual(execute(pk), Task.SUCCEEDED)
+        self.assertGreater(leases[0], timezone.now() + timedelta(seconds=3000))
+
+        queued = long_running.enqueue(take_over=True)
+        Task.objects.filter(pk=queued.pk).update(attempts=queued.max_attempts - 1)
+        [pk] = claim(10, 300, 'worker')
+        with self.assertLogs('apps.task', 'WARNING') as logs:
+            self.assertIsNone(execute(pk))
+        self.assertIn('taken over by another worker', logs.output[-1])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.locked_by, queued.result), (Task.RUNNING, 'other', None))
+        self.assertEqual(failures, [])
+
+    @override_settings(TASKS={'EAGER': True})
+    def test_eager_tasks_run_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queued = enqueue(record.name, {'value': 3})
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, [3])
+        self.assertEqual(Task.objects.get(pk=queued.pk).status, Task.SUCCEEDED)
+
+    def test_run_tasks_command(self):
+        record.enqueue(value=1)
+        out = StringIO()
+        call_command('run_tasks', '--processes', '0', '--once', stdout=out)
+        self.assertIn('Processed 1 tasks.', out.getvalue())
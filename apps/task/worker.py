@@ -0,0 +1,184 @@
+import logging
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+
+import django
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+from .queue import PermanentError, TaskNotRegistered, get_options, get_task, running
+
+
+logger = logging.getLogger('apps.task')
+
+
+def claim(limit, lease, worker_id):
+    """
+    Marks up to ``limit`` due tasks as running under ``worker_id`` and
+    returns their ids. Tasks whose lease lapsed (their worker died) are due
+    again. The conditional UPDATE keeps two workers from claiming the same
+    row on any database.
+    """
+    now = timezone.now()
+    due = Q(status=Task.PENDING, run_at__lte=now) | Q(status=Task.RUNNING, locked_until__lt=now)
+    with transaction.atomic():
+        ids = list(Task.objects.filter(due).order_by('run_at', 'id').values_list('pk', flat=True)[:limit])
+        if not ids:
+            return []
+        Task.objects.filter(due, pk__in=ids).update(
+            status=Task.RUNNING,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=lease),
+            attempts=F('attempts') + 1,
+            last_updated=now,
+        )
+        return list(Task.objects.filter(pk__in=ids, locked_by=worker_id, status=Task.RUNNING).values_list('pk', flat=True))
+
+
+def execute(pk):
+    """
+    Runs the claimed task ``pk``, in a transaction unless it manages its
+    own, and records the outcome: succeeded, pending again for a retry, or
+    failed. Returns the status, or None when another worker took the task
+    over after the lease lapsed; that run's outcome is the one kept.
+    """
+    task = Task.objects.get(pk=pk)
+    values = {'locked_until': None}
+    definition = None
+    try:
+        definition = get_task(task.name)
+        lease = definition.get_lease()
+        if definition.lease is not None:
+            Task.objects.filter(pk=pk, locked_by=task.locked_by).update(
+                locked_until=timezone.now() + timedelta(seconds=lease),
+            )
+        with running(pk, task.locked_by, lease):
+            if definition.atomic:
+                with transaction.atomic():
+                    values['result'] = definition(**task.kwargs)
+            else:
+                values['result'] = definition(**task.kwargs)
+    except Exception as exc:
+        values['last_error'] = traceback.format_exc()
+        if isinstance(exc, PermanentError):
+            values['result'] = exc.result
+        retry = not isinstance(exc, (PermanentError, TaskNotRegistered)) and task.attempts < task.max_attempts
+        if retry:
+            values.update(status=Task.PENDING, run_at=definition.retry_at(task.attempts))
+        else:
+            values['status'] = Task.FAILED
+        logger.warning('Task %s (%s) failed on attempt %s: %r', task.pk, task.name, task.attempts, exc)
+    else:
+        values.update(status=Task.SUCCEEDED, last_error='')
+    values['last_updated'] = timezone.now()
+    recorded = Task.objects.filter(pk=pk, status=Task.RUNNING, locked_by=task.locked_by).update(**values)
+    if not recorded:
+        logger.warning('Task %s (%s) was taken over by another worker; dropped the outcome of attempt %s.',
+                       task.pk, task.name, task.attempts)
+        return None
+    if values['status'] == Task.FAILED and definition is not None and definition.on_failure is not None:
+        try:
+            definition.on_failure(**task.kwargs)
+        except Exception:
+            logger.exception('The failure handler of task %s (%s) failed.', task.pk, task.name)
+    return values['status']
+
+
+def run_task(pk):
+    """
+    Claims and runs task ``pk`` in this process, if it's due.
+    """
+    now = timezone.now()
+    updated = Task.objects.filter(pk=pk, status=Task.PENDING, run_at__lte=now).update(
+        status=Task.RUNNING,
+        locked_by=uuid.uuid4().hex,
+        locked_until=now + timedelta(seconds=get_options()['LEASE']),
+        attempts=F('attempts') + 1,
+        last_updated=now,
+    )
+    return execute(pk) if updated else None
+
+
+def _init_process():
+    # Forked children mustn't share the parent's database connections.
+    django.setup()
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+
+
+def _execute_in_process(pk):
+    try:
+        return execute(pk)
+    finally:
+        connections.close_all()
+
+
+class Worker:
+    """
+    Polls the task table and runs due tasks in a pool of ``processes``
+    processes, or in this process when ``processes`` is 0.
+    """
+
+    def __init__(self, processes=None, poll_interval=None, lease=None):
+        options = get_options()
+        self.processes = options['PROCESSES'] if processes is None else processes
+        self.poll_interval = options['POLL_INTERVAL'] if poll_interval is None else poll_interval
+        self.lease = options['LEASE'] if lease is None else lease
+        self.worker_id = uuid.uuid4().hex
+        self.stopping = False
+        self.processed = 0
+
+    def stop(self):
+        self.stopping = True
+
+    def run_once(self):
+        """
+        Runs the tasks due now in this process; returns how many ran.
+        """
+        count = 0
+        while not self.stopping:
+            ids = claim(1, self.lease, self.worker_id)
+            if not ids:
+                break
+            execute(ids[0])
+            count += 1
+        self.processed += count
+        return count
+
+    def run(self, once=False):
+        if self.processes == 0:
+            while not self.stopping:
+                if not self.run_once() and once:
+                    break
+                if not once:
+                    self.sleep()
+            return self.processed
+        # Connections can't cross a fork; the pool's processes open their own.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_process) as pool:
+            running = set()
+            while not self.stopping:
+                free = self.processes - len(running)
+                ids = claim(free, self.lease, self.worker_id) if free else []
+                running.update(pool.submit(_execute_in_process, pk) for pk in ids)
+                if not running:
+                    if once:
+                        break
+                    self.sleep()
+                    continue
+                done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.processed += 1
+                    if future.exception() is not None:
+                        logger.error('Task worker process failed.', exc_info=future.exception())
+            wait(running)
+            self.processed += len(running)
+        return self.processed
+
+    def sleep(self):
+        time.sleep(self.poll_interval)
@@ -1,9 +1,22 @@
-# from django.dispatch import receiver
-# from django.db.models.signals import post_save
-# from apps.user.models import User
-# from rest_framework.authtoken.models import Token
+from django.dispatch import receiver
+from django.db.models.signals import post_delete, post_save
+from apps.user.models import User
+from rest_framework.authtoken.models import Token
+from services.auth.authentication import token_cache
 
 # @receiver(post_save, sender=User)
 # def create_auth_token(sender, instance=None, created=False, **kwargs):
 #     if created:
-#         Token.objects.create(user=instance)
\ No newline at end of file
+#         Token.objects.create(user=instance)
+
+
+@receiver(post_delete, sender=Token)
+def evict_cached_token(sender, instance, **kwargs):
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user_tokens(sender, instance, **kwargs):
+    # Covers deactivation as well as password or permission changes.
+    token_cache.delete_where(lambda key, credentials: credentials[0].pk == instance.pk)
@@ -0,0 +1,18 @@
+"""
+ASGI config for employee_management project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+List and detail requests of the API viewsets are served by their async
+versions (see ``services.core.middleware.AsyncViewMiddleware``).
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+application = get_asgi_application()
@@ -0,0 +1,294 @@
+"""
+Latency (p50/p95/p99), throughput and queries per request of the employee
+API's list, filter, search, retrieve, create and update requests.
+
+In-process (the default), each scale is seeded into a throwaway test
+database with the apps.employee factories and requests go through DRF's
+test client. The response cache is off unless --cache is given, so reads
+measure the real path.
+
+With --url, requests go to a running server (over keep-alive connections,
+--concurrency at a time) whose database is already seeded; the employee
+count there is the scale. Query counts aren't available then.
+
+--save-baseline writes the results as JSON. --baseline compares against
+such a file and exits with status 1 when a p95 got slower by more than
+--tolerance (and --min-delta ms), a request makes clearly more queries or
+more requests fail. Baselines are machine specific; make them on the
+machine that runs the comparison.
+
+    python benchmarks/bench_api.py [--scales 1000,10000,100000] [--requests 200]
+    python benchmarks/bench_api.py --url http://127.0.0.1:8000 --token KEY [--concurrency 8]
+    python benchmarks/bench_api.py --save-baseline baseline.json
+    python benchmarks/bench_api.py --baseline baseline.json
+"""
+import argparse
+import http.client
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from common import seed_with_factories, setup
+
+
+SCENARIOS = ('list', 'filter', 'search', 'retrieve', 'create', 'update')
+
+
+class InProcessClient:
+    name = 'in-process'
+
+    def __init__(self):
+        from django.db import connection
+        from rest_framework.test import APIClient
+        from apps.user.factories import TokenFactory, UserFactory
+
+        self.connection = connection
+        self.client = APIClient()
+        token = TokenFactory(user=UserFactory())
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def request(self, method, path, data=None):
+        """
+        Returns ``(status, body, queries)``.
+        """
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(self.connection) as queries:
+            response = getattr(self.client, method.lower())(path, data, format='json')
+        body = json.loads(response.content) if response.content else None
+        return response.status_code, body, len(queries)
+
+
+class ServerClient:
+    name = 'server'
+
+    def __init__(self, url, token):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.headers = {'Authorization': f'Token {token}', 'Content-Type': 'application/json'}
+        self.local = threading.local()
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return connection
+
+    def request(self, method, path, data=None):
+        body = None
+        if method == 'GET' and data:
+            path = f'{path}?{urlencode(data)}'
+        elif data is not None:
+            body = json.dumps(data)
+        connection = self.connection()
+        try:
+            connection.request(method, self.prefix + path, body=body, headers=self.headers)
+            response = connection.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self.local.connection = None
+            raise
+        return response.status, json.loads(content) if content else None, None
+
+
+class Workload:
+    """
+    Builds the requests of each scenario from ids and names looked up
+    through the API, so both clients see the same kind of traffic.
+    """
+
+    def __init__(self, client, seed=0):
+        self.random = random.Random(seed)
+        self.counter = 0
+        _, body, _ = client.request('GET', '/api/employee/', {'page_size': 1000})
+        employees = body['results']
+        self.ids = [row['id'] for row in employees]
+        self.words = sorted({row['name'].split()[0] for row in employees})
+        self.lookups = {}
+        for name in ('position', 'department', 'status'):
+            _, body, _ = client.request('GET', f'/api/{name}/', {'page_size': 1000})
+            self.lookups[name] = [row['id'] for row in body['results']]
+
+    def references(self):
+        return {name: self.random.choice(ids) for name, ids in self.lookups.items()}
+
+    def next(self, scenario):
+        """
+        Returns ``(method, path, data)`` for the next request of ``scenario``.
+        """
+        if scenario == 'list':
+            return 'GET', '/api/employee/', {'page_size': 50}
+        if scenario == 'filter':
+            return 'GET', '/api/employee/', {'department': self.random.choice(self.lookups['department'])}
+        if scenario == 'search':
+            return 'GET', '/api/employee/', {'search': self.random.choice(self.words)}
+        if scenario == 'retrieve':
+            return 'GET', f'/api/employee/{self.random.choice(self.ids)}/', None
+        self.counter += 1
+        if scenario == 'create':
+            data = {'name': f'Benchmark {time.time_ns()} {self.counter}', 'address': 'Benchmark Street 1'}
+            return 'POST', '/api/employee/', {**data, **self.references()}
+        if scenario == 'update':
+            data = {'address': f'Benchmark Street {self.counter}', **self.references()}
+            return 'PATCH', f'/api/employee/{self.random.choice(self.ids)}/', data
+        raise ValueError(scenario)
+
+
+def percentile(cuts, p):
+    return cuts[p - 1] if cuts else 0.0
+
+
+def run_scenario(client, workload, scenario, requests, concurrency=1):
+    plans = [workload.next(scenario) for _ in range(requests)]
+
+    def send(plan):
+        started = time.perf_counter()
+        status, _, queries = client.request(*plan)
+        return time.perf_counter() - started, status, queries
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(send, plans))
+    else:
+        outcomes = [send(plan) for plan in plans]
+    elapsed = time.perf_counter() - started
+
+    timings = [timing * 1000 for timing, _, _ in outcomes]
+    cuts = statistics.quantiles(timings, n=100, method='inclusive') if len(timings) > 1 else timings * 99
+    queries = [count for _, _, count in outcomes if count is not None]
+    return {
+        'requests': requests,
+        'p50': percentile(cuts, 50),
+        'p95': percentile(cuts, 95),
+        'p99': percentile(cuts, 99),
+        'throughput': requests / elapsed,
+        'queries': statistics.mean(queries) if queries else None,
+        'errors': sum(1 for _, status, _ in outcomes if status >= 400),
+    }
+
+
+def print_results(scale, target, results):
+    print(f'\n{scale:,} employees ({target})')
+    print(f'{"scenario":<10} {"requests":>8} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"req/s":>9} {"queries":>8} {"errors":>7}')
+    for scenario, result in results.items():
+        queries = '-' if result['queries'] is None else f'{result["queries"]:.1f}'
+        print(
+            f'{scenario:<10} {result["requests"]:>8} {result["p50"]:>9.2f} {result["p95"]:>9.2f} '
+            f'{result["p99"]:>9.2f} {result["throughput"]:>9.1f} {queries:>8} {result["errors"]:>7}'
+        )
+
+
+def compare(baseline, results, tolerance, min_delta):
+    """
+    Returns descriptions of the results that regressed against ``baseline``.
+    """
+    regressions = []
+    for scale, scenarios in results.items():
+        for scenario, result in scenarios.items():
+            base = baseline.get(scale, {}).get(scenario)
+            if base is None:
+                continue
+            limit = max(base['p95'] * (1 + tolerance), base['p95'] + min_delta)
+            if result['p95'] > limit:
+                regressions.append(f'{scale} {scenario}: p95 {result["p95"]:.2f} ms > {limit:.2f} ms')
+            if result['queries'] is not None and base['queries'] is not None:
+                # Cache warm-up moves the mean a little; N+1 queries move it a lot.
+                allowed = max(base['queries'] * 1.1, base['queries'] + 0.5)
+                if result['queries'] > allowed:
+                    regressions.append(f'{scale} {scenario}: {result["queries"]:.2f} queries > {allowed:.2f}')
+            if result['errors'] > base['errors']:
+                regressions.append(f'{scale} {scenario}: {result["errors"]} errors > {base["errors"]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='1000', help="Comma separated employee counts to seed and measure.")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+    parser.add_argument('--cache', action='store_true', help="Keep the response cache on (in-process).")
+    parser.add_argument('--url', help="Benchmark a running server instead.")
+    parser.add_argument('--token', help="API token for --url.")
+    parser.add_argument('--concurrency', type=int, default=1, help="Requests in flight at once (--url only).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help="Fail on regressions against this file.")
+    parser.add_argument('--save-baseline', help="Write the results to this file.")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed relative p95 slowdown.")
+    parser.add_argument('--min-delta', type=float, default=2.0, help="Allowed absolute p95 slowdown in ms.")
+    args = parser.parse_args()
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+
+    if args.url:
+        if not args.token:
+            parser.error('--url needs --token')
+        client = ServerClient(args.url, args.token)
+        workload = Workload(client, args.seed)
+        _, body, _ = client.request('GET', '/api/employee/stats/')
+        results = {str(body['headcount']): measure_all(client, workload, scenarios, args)}
+        for scale, scale_results in results.items():
+            print_results(int(scale), client.name, scale_results)
+    else:
+        teardown = setup()
+        try:
+            results = run_in_process(args, scenarios)
+        finally:
+            teardown()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f'\nSaved baseline to {args.save_baseline}.')
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(json.load(file), results, args.tolerance, args.min_delta)
+        if regressions:
+            print('\nRegressions:\n  ' + '\n  '.join(regressions))
+            sys.exit(1)
+        print('\nNo regressions against the baseline.')
+
+
+def run_in_process(args, scenarios):
+    from django.test.utils import override_settings
+    from apps.employee.models import Employee
+
+    results = {}
+    seeded = 0
+    with override_settings(RESPONSE_CACHE={'ENABLED': args.cache}, TASKS={'EAGER': False}):
+        client = InProcessClient()
+        for scale in sorted(int(value) for value in args.scales.split(',')):
+            started = time.perf_counter()
+            seed_with_factories(scale - seeded)
+            print(f'\nSeeded {scale - seeded:,} employees in {time.perf_counter() - started:.1f}s.')
+            seeded = scale
+            workload = Workload(client, args.seed)
+            results[str(scale)] = measure_all(client, workload, scenarios, args)
+            print_results(scale, client.name, results[str(scale)])
+            # Drop what create added so the next scale starts where it says.
+            Employee.objects.filter(name__startswith='Benchmark ').delete()
+    return results
+
+
+def measure_all(client, workload, scenarios, args):
+    concurrency = args.concurrency if isinstance(client, ServerClient) else 1
+    results = {}
+    for scenario in scenarios:
+        # Warm up connections and caches first.
+        run_scenario(client, workload, scenario, min(10, args.requests), concurrency)
+        results[scenario] = run_scenario(client, workload, scenario, args.requests, concurrency)
+    return results
+
+
+if __name__ == '__main__':
+    main()
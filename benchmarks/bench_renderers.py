@@ -0,0 +1,77 @@
+"""
+Renders and parses an employee list page with DRF's JSONRenderer/JSONParser
+and the orjson (and, if installed, MessagePack) ones configured in
+settings.
+
+    python benchmarks/bench_renderers.py [--rows 1000] [--repeat 20]
+"""
+import argparse
+import datetime
+import io
+from decimal import Decimal
+
+from common import configure, measure, report
+
+
+def salary(i, raw):
+    value = Decimal('1000.50') * (i % 20 + 1)
+    return value if raw else str(value)
+
+
+def build_page(rows, raw=False):
+    """
+    An employee list page as serializers return it, or with raw Decimal
+    and datetime values (as aggregates return them) if ``raw``.
+    """
+    created = datetime.datetime(2024, 5, 1, 12, 30, 1, 123456, tzinfo=datetime.timezone.utc)
+    if not raw:
+        created = created.isoformat()[:-6] + 'Z'
+    results = []
+    for i in range(rows):
+        nested = {'id': i % 20, 'created': created, 'last_updated': created}
+        results.append({
+            'id': i,
+            'name': f'Employee {i}',
+            'address': f'{i} Example Street\nSpringfield',
+            'is_manager': i % 7 == 0,
+            'position': {**nested, 'name': f'Position {i % 20}', 'salary': salary(i, raw)},
+            'department': {**nested, 'name': f'Department {i % 20}', 'manager': None},
+            'status': {**nested, 'name': f'Status {i % 20}'},
+        })
+    return {'next': 'http://testserver/api/employee/?cursor=abc', 'previous': None, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    configure()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from services.core.parsers import FastJSONParser, MessagePackParser
+    from services.core.renderers import FastJSONRenderer, MessagePackRenderer, msgpack
+
+    context = {'encoding': 'utf-8'}
+    for raw in (False, True):
+        page = build_page(args.rows, raw)
+        body = JSONRenderer().render(page)
+        assert FastJSONRenderer().render(page) == body, 'Outputs differ.'
+        kind = 'raw Decimal/datetime values' if raw else 'serializer output'
+        print(f'{args.rows} rows of {kind}, {len(body):,} bytes of JSON')
+        report('JSONRenderer', measure(lambda: JSONRenderer().render(page), args.repeat), args.rows)
+        report('FastJSONRenderer', measure(lambda: FastJSONRenderer().render(page), args.repeat), args.rows)
+        if msgpack is not None:
+            report('MessagePackRenderer', measure(lambda: MessagePackRenderer().render(page), args.repeat), args.rows)
+        print()
+    report('JSONParser', measure(lambda: JSONParser().parse(io.BytesIO(body), parser_context=context), args.repeat), args.rows)
+    report('FastJSONParser', measure(lambda: FastJSONParser().parse(io.BytesIO(body), parser_context=context), args.repeat), args.rows)
+    if msgpack is not None:
+        packed = MessagePackRenderer().render(page)
+        report('MessagePackParser', measure(lambda: MessagePackParser().parse(io.BytesIO(packed)), args.repeat), args.rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Rows per second of EmployeeSerializer against the ValuesSerializer compiled
+from it, serializing alone and including the query.
+
+    python benchmarks/bench_serializers.py [--rows 5000] [--repeat 5]
+"""
+import argparse
+import json
+
+from common import create_employees, measure, report, setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    teardown = setup()
+    try:
+        run(args.rows, args.repeat)
+    finally:
+        teardown()
+
+
+def run(rows, repeat):
+    from rest_framework.utils.encoders import JSONEncoder
+
+    from apps.employee.models import Employee
+    from services.core.query import get_query_plan
+    from services.core.serializers import get_values_serializer
+    from services.employee.serializers import EmployeeSerializer
+
+    create_employees(rows)
+    queryset = Employee.objects.order_by('created', 'id')
+    planned = get_query_plan(Employee, EmployeeSerializer).apply(queryset)
+    values_serializer = get_values_serializer(EmployeeSerializer)
+    values = values_serializer.values(queryset)
+
+    instances = list(planned)
+    value_rows = list(values)
+    expected = EmployeeSerializer(instances, many=True).data
+    actual = values_serializer.many(value_rows)
+    assert json.dumps(expected, cls=JSONEncoder) == json.dumps(actual, cls=JSONEncoder), 'Outputs differ.'
+
+    print(f'{rows} employees\n')
+    report('EmployeeSerializer', measure(lambda: EmployeeSerializer(instances, many=True).data, repeat), rows)
+    report('ValuesSerializer', measure(lambda: values_serializer.many(value_rows), repeat), rows)
+    print()
+    report('query + EmployeeSerializer', measure(lambda: EmployeeSerializer(list(planned.all()), many=True).data, repeat), rows)
+    report('values() + ValuesSerializer', measure(lambda: values_serializer.many(list(values.all())), repeat), rows)
+
+
+if __name__ == '__main__':
+    main()
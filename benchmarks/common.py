@@ -0,0 +1,128 @@
+"""
+Shared setup for the benchmark scripts. They run against a throwaway
+in-memory test database, never the configured one.
+"""
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure():
+    """
+    Configures Django with the development settings.
+    """
+    sys.path.insert(0, BASE_DIR)
+    import dotenv
+    dotenv.load_dotenv(os.path.join(BASE_DIR, 'dev.env'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+    import django
+    django.setup()
+
+
+def setup():
+    """
+    Configures Django and creates a migrated test database. Returns a
+    function tearing it down again.
+    """
+    configure()
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return teardown
+
+
+def create_employees(count, lookups=20):
+    """
+    Bulk inserts ``count`` employees spread over ``lookups`` positions,
+    departments and statuses; every tenth one has no relations.
+    """
+    from decimal import Decimal
+    from apps.employee.models import Department, Employee, Position, Status
+
+    positions = Position.objects.bulk_create(
+        Position(name=f'Position {i}', salary=Decimal('1000.50') * (i + 1)) for i in range(lookups)
+    )
+    departments = Department.objects.bulk_create(Department(name=f'Department {i}') for i in range(lookups))
+    statuses = Status.objects.bulk_create(Status(name=f'Status {i}') for i in range(lookups))
+    employees = []
+    for i in range(count):
+        related = {} if i % 10 == 0 else {
+            'position': positions[i % lookups],
+            'department': departments[i % lookups],
+            'status': statuses[i % lookups],
+        }
+        employees.append(Employee(
+            name=f'Employee {i}',
+            address=f'{i} Example Street\nSpringfield',
+            is_manager=i % 7 == 0,
+            **related,
+        ))
+    Employee.objects.bulk_create(employees, batch_size=1000)
+
+
+def measure(func, repeat=5):
+    """
+    Calls ``func`` ``repeat`` times after a warm-up call and returns the
+    timings in seconds.
+    """
+    func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name, timings, items):
+    best = min(timings)
+    median = statistics.median(timings)
+    print(f'{name:<40} best {best * 1000:9.2f} ms  median {median * 1000:9.2f} ms  {items / best:12,.0f} /s')
+
+
+def seed_with_factories(count, lookups=50):
+    """
+    Adds ``count`` employees built with the apps.employee factories, spread
+    over ``lookups`` positions, departments and statuses (created with the
+    factories on the first call). Employees are built in memory and
+    written with bulk_create, so the search index and the department
+    summaries, which bulk_create skips, are rebuilt afterwards.
+    """
+    import random
+    from django.db import transaction
+    from apps.employee import summary
+    from apps.employee.factories import DepartmentFactory, EmployeeFactory, PositionFactory, StatusFactory
+    from apps.employee.models import Department, Employee, Position, Status
+    from apps.employee.search import employee_search
+    from core.search import get_search_backend
+
+    pools = []
+    for model, model_factory in ((Position, PositionFactory), (Department, DepartmentFactory), (Status, StatusFactory)):
+        existing = list(model.objects.all()[:lookups])
+        pools.append(existing + model_factory.create_batch(lookups - len(existing)))
+    positions, departments, statuses = pools
+    pick = random.Random(count).choice
+    with transaction.atomic():
+        for start in range(0, count, 1000):
+            Employee.objects.bulk_create([
+                EmployeeFactory.build(
+                    position=pick(positions),
+                    department=pick(departments),
+                    status=pick(statuses),
+                    is_manager=pick((True, False, False, False, False)),
+                )
+                for _ in range(start, min(start + 1000, count))
+            ])
+        get_search_backend('default').rebuild(employee_search)
+        summary.refresh()
@@ -0,0 +1,218 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+_missing = object()
+
+
+class LRUCache:
+    """
+    Thread safe in-process LRU cache with an optional per entry TTL (seconds)
+    and hit/miss counters.
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _missing, count=False) is not _missing
+
+    def get(self, key, default=None, count=True):
+        with self._lock:
+            entry = self._data.get(key, _missing)
+            if entry is not _missing:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return value
+                del self._data[key]
+            if count:
+                self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=_missing):
+        ttl = self.ttl if ttl is _missing else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, _missing) is not _missing
+
+    def delete_where(self, predicate):
+        """
+        Deletes every entry for which ``predicate(key, value)`` is true and
+        returns how many were removed.
+        """
+        with self._lock:
+            keys = [key for key, (value, _) in self._data.items() if predicate(key, value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / requests if requests else 0.0,
+        }
+
+
+class TaggedCache:
+    """
+    Stores values in a Django cache alias together with the versions of the
+    tags they depend on. ``invalidate(tag)`` gives the tag a new version, so
+    every entry stamped with an older one reads as a miss; nothing has to
+    track which keys carry which tag. Invalidations only reach processes
+    that use the same cache, so the alias must be a shared backend
+    (memcached, redis, file based) when several workers serve requests.
+
+    Versions are random tokens rather than counters so an evicted tag can't
+    come back with a version an old entry still carries.
+    """
+
+    def __init__(self, alias='default', timeout=300, prefix='tagged'):
+        self.alias = alias
+        self.timeout = timeout
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _tag_key(self, tag):
+        return f'{self.prefix}:tag:{tag}'
+
+    def _key(self, key):
+        return f'{self.prefix}:entry:{key}'
+
+    def get_versions(self, tags):
+        keys = {self._tag_key(tag): tag for tag in tags}
+        found = self.cache.get_many(keys)
+        missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+        if missing:
+            self.cache.set_many(missing, timeout=None)
+            found.update(missing)
+        return {keys[key]: version for key, version in found.items()}
+
+    def get(self, key):
+        return self.get_with_versions(key)[0]
+
+    def get_with_versions(self, key):
+        """
+        Returns ``(value, versions)``, or ``(None, None)`` on a miss. Pass the
+        versions back to ``set`` to update an entry without resetting them.
+        """
+        entry = self.cache.get(self._key(key))
+        if entry is not None:
+            if self.get_versions(entry['versions']) == entry['versions']:
+                self.hits += 1
+                return entry['value'], entry['versions']
+        self.misses += 1
+        return None, None
+
+    def set(self, key, value, versions, timeout=None):
+        """
+        ``versions`` must be read with ``get_versions`` *before* the value
+        was computed, otherwise a write in between could go unnoticed.
+        """
+        entry = {'value': value, 'versions': versions}
+        self.cache.set(self._key(key), entry, self.timeout if timeout is None else timeout)
+
+    def invalidate(self, *tags):
+        self.cache.set_many({self._tag_key(tag): uuid.uuid4().hex for tag in tags}, timeout=None)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / requests if requests else 0.0,
+        }
+
+
+def model_tag(model):
+    return f'{model._meta.label_lower}:*'
+
+
+def instance_tag(model, pk):
+    return f'{model._meta.label_lower}:{pk}'
+
+
+def get_response_cache():
+    options = getattr(settings, 'RESPONSE_CACHE', {})
+    return TaggedCache(
+        alias=options.get('ALIAS', 'default'),
+        timeout=options.get('TIMEOUT', 300),
+        prefix='response',
+    )
+
+
+response_cache = get_response_cache()
+
+
+def invalidate_instance(instance):
+    """
+    Evicts cached responses built from ``instance`` or any list of its
+    model. Runs right away and again on commit, so a response cached from
+    the pre-commit state in between is evicted as well.
+    """
+    model = type(instance)
+    _invalidate(model_tag(model), instance_tag(model, instance.pk))
+
+
+def invalidate_models(*models):
+    _invalidate(*[model_tag(model) for model in models])
+
+
+def invalidate_instances(model, pks):
+    """
+    Evicts the cached responses of the ``model`` rows ``pks``, for writes
+    that skip the signals, e.g. bulk updates.
+    """
+    _invalidate(*[instance_tag(model, pk) for pk in pks])
+
+
+def _invalidate(*tags):
+    response_cache.invalidate(*tags)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: response_cache.invalidate(*tags))
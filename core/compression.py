@@ -0,0 +1,176 @@
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class GzipCodec:
+    """
+    A content coding. ``compressor()`` returns an object whose
+    ``compress(chunk)`` returns the compressed chunk flushed to a block
+    boundary, so streamed chunks reach the client right away, and whose
+    ``finish()`` returns the end of the stream.
+    """
+    name = 'gzip'
+    default_level = 6
+
+    def __init__(self, level=None):
+        self.level = self.default_level if level is None else level
+
+    def compress(self, data):
+        compressor = self.compressobj()
+        return compressor.compress(data) + compressor.flush()
+
+    def compressobj(self):
+        # wbits=31 writes a gzip header and trailer.
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def compressor(self):
+        return GzipCompressor(self.compressobj())
+
+
+class GzipCompressor:
+    def __init__(self, compressobj):
+        self.compressobj = compressobj
+
+    def compress(self, chunk):
+        return self.compressobj.compress(chunk) + self.compressobj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressobj.flush()
+
+
+class BrotliCodec(GzipCodec):
+    name = 'br'
+    default_level = 5
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def compressor(self):
+        return BrotliCompressor(brotli.Compressor(quality=self.level))
+
+
+class BrotliCompressor(GzipCompressor):
+
+    def compress(self, chunk):
+        return self.compressobj.process(chunk) + self.compressobj.flush()
+
+    def finish(self):
+        return self.compressobj.finish()
+
+
+class ZstdCodec(GzipCodec):
+    name = 'zstd'
+    default_level = 3
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compressor(self):
+        return ZstdCompressor(zstandard.ZstdCompressor(level=self.level).compressobj())
+
+
+class ZstdCompressor(GzipCompressor):
+
+    def compress(self, chunk):
+        return self.compressobj.compress(chunk) + self.compressobj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+def compress_stream(codec, chunks):
+    compressor = codec.compressor()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(codec, chunks):
+    compressor = codec.compressor()
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+CODECS = {
+    GzipCodec.name: (GzipCodec, True),
+    BrotliCodec.name: (BrotliCodec, brotli is not None),
+    ZstdCodec.name: (ZstdCodec, zstandard is not None),
+}
+
+
+def get_options():
+    options = {
+        'ENABLED': True,
+        'MIN_SIZE': 1024,
+        'ENCODINGS': ['zstd', 'br', 'gzip'],
+        'LEVELS': {},
+    }
+    options.update(getattr(settings, 'RESPONSE_COMPRESSION', {}))
+    return options
+
+
+def get_codecs():
+    """
+    Returns the usable codecs by encoding name, in order of preference.
+    Encodings whose library isn't installed are left out.
+    """
+    options = get_options()
+    codecs = {}
+    for name in options['ENCODINGS']:
+        codec_class, available = CODECS[name]
+        if available:
+            codecs[name] = codec_class(options['LEVELS'].get(name))
+    return codecs
+
+
+def parse_accept_encoding(header):
+    """
+    Returns ``{coding: q}`` for an Accept-Encoding header.
+    """
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header):
+    """
+    Returns the codec to encode a response with for a request's
+    Accept-Encoding header, or None to send it as is. The client's q-values
+    win; ties go to the order of ``RESPONSE_COMPRESSION['ENCODINGS']``.
+    """
+    accepted = parse_accept_encoding(header or '')
+    if not accepted:
+        return None
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for name, codec in get_codecs().items():
+        q = accepted.get(name, wildcard)
+        if q > best_q:
+            best, best_q = codec, q
+    return best
@@ -0,0 +1,64 @@
+from ..pool import get_pool
+
+
+POOL_DEFAULTS = {
+    'max_size': 10,
+    'timeout': 30,
+    'max_idle': 300,
+    'max_lifetime': 3600,
+    'check_interval': 30,
+}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Takes raw connections from a per-process ``ConnectionPool`` and gives
+    them back on close instead of disconnecting, when the database's
+    ``OPTIONS['pool']`` is set (``True`` or a dict overriding
+    ``POOL_DEFAULTS``). Without it the backend behaves like Django's.
+
+    With a pool, leave ``CONN_MAX_AGE`` at 0: Django then closes the
+    connection after every request, which returns it to the pool, and the
+    pool keeps it open.
+    """
+
+    @property
+    def pool_options(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if not options:
+            return None
+        return {**POOL_DEFAULTS, **(options if isinstance(options, dict) else {})}
+
+    @property
+    def pool(self):
+        options = self.pool_options
+        return get_pool(self.alias, options) if options is not None else None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connect = super().get_new_connection
+        return pool.acquire(lambda: connect(conn_params), self.check_connection)
+
+    def check_connection(self, connection):
+        raise NotImplementedError
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        # A connection closed inside atomic() or after errors may hold an
+        # open transaction or be broken; don't hand it to another request.
+        reusable = (
+            not self.in_atomic_block
+            and not self.errors_occurred
+            and self.get_autocommit() == self.settings_dict['AUTOCOMMIT']
+        )
+        with self.wrap_database_errors:
+            pool.release(self.connection, reusable)
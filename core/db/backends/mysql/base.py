@@ -0,0 +1,13 @@
+from django.db.backends.mysql import base
+
+from ..base import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    def check_connection(self, connection):
+        try:
+            connection.ping()
+        except base.Database.Error:
+            return False
+        return True
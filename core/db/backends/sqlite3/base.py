@@ -0,0 +1,20 @@
+from django.db.backends.sqlite3 import base
+
+from ..base import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    @property
+    def pool_options(self):
+        # Every connection to an in-memory database is a database of its own.
+        if self.is_in_memory_db():
+            return None
+        return super().pool_options
+
+    def check_connection(self, connection):
+        try:
+            connection.execute('SELECT 1')
+        except base.Database.Error:
+            return False
+        return True
@@ -0,0 +1,68 @@
+import os
+
+
+def _flag(value):
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+
+def database_settings(engine, prefix='DB_', environ=None):
+    """
+    Builds a ``DATABASES`` entry for ``core.db.backends.<engine>`` from
+    ``<prefix>*`` environment variables:
+
+    - ``NAME``, ``USER``, ``PASSWORD``, ``HOST``, ``PORT``;
+    - ``POOL_SIZE``: connections per worker process, 0 (the default)
+      disables the pool. ``POOL_TIMEOUT``, ``POOL_MAX_IDLE``,
+      ``POOL_MAX_LIFETIME`` and ``POOL_CHECK_INTERVAL`` tune it (seconds);
+    - ``CONN_MAX_AGE``: seconds to keep a connection per thread without a
+      pool, 60 by default; the pool keeps connections open instead, so it
+      defaults to 0 with one;
+    - ``HEALTH_CHECKS``: check persistent connections before reuse, on by
+      default.
+    """
+    environ = os.environ if environ is None else environ
+
+    def get(name, default=None):
+        return environ.get(prefix + name, default)
+
+    pool_size = int(get('POOL_SIZE', 0))
+    options = {}
+    if pool_size:
+        options['pool'] = {
+            'max_size': pool_size,
+            'timeout': float(get('POOL_TIMEOUT', 30)),
+            'max_idle': float(get('POOL_MAX_IDLE', 300)),
+            'max_lifetime': float(get('POOL_MAX_LIFETIME', 3600)),
+            'check_interval': float(get('POOL_CHECK_INTERVAL', 30)),
+        }
+    return {
+        'ENGINE': f'core.db.backends.{engine}',
+        'NAME': get('NAME'),
+        'USER': get('USER', ''),
+        'PASSWORD': get('PASSWORD', ''),
+        'HOST': get('HOST', ''),
+        'PORT': get('PORT', ''),
+        'CONN_MAX_AGE': int(get('CONN_MAX_AGE', 0 if pool_size else 60)),
+        'CONN_HEALTH_CHECKS': _flag(get('HEALTH_CHECKS', '1')),
+        'OPTIONS': options,
+    }
+
+
+def replica_settings(primary, prefix='DB_', environ=None):
+    """
+    Returns ``DATABASES`` entries named ``replica_1``, ``replica_2``, ... for
+    the comma separated ``host[:port]`` list in ``<prefix>REPLICA_HOSTS``.
+    Replicas share the primary's other settings and mirror it in tests.
+    """
+    environ = os.environ if environ is None else environ
+    hosts = [host.strip() for host in environ.get(prefix + 'REPLICA_HOSTS', '').split(',') if host.strip()]
+    replicas = {}
+    for number, host in enumerate(hosts, 1):
+        host, _, port = host.partition(':')
+        replicas[f'replica_{number}'] = {
+            **primary,
+            'HOST': host,
+            'PORT': port or primary['PORT'],
+            'TEST': {'MIRROR': 'default'},
+        }
+    return replicas
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+
+class ConnectionPool:
+    """
+    Bounded, thread safe pool of raw DB-API connections for one process.
+
+    At most ``max_size`` connections exist at a time; ``acquire`` waits up to
+    ``timeout`` seconds for one to be released and raises OperationalError
+    after that. Idle connections are reused newest first. They are closed
+    once idle for ``max_idle`` or open for ``max_lifetime`` seconds, and
+    pinged before reuse when idle for over ``check_interval`` seconds.
+    """
+
+    def __init__(self, max_size=10, timeout=30, max_idle=300, max_lifetime=3600, check_interval=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+        self._cond = threading.Condition()
+        # (connection, opened, released) for idle connections.
+        self._idle = deque()
+        self._opened = {}
+        self._size = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.created = 0
+        self.closed = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+        self.health_check_failures = 0
+
+    def acquire(self, connect, check=None):
+        """
+        Returns an idle connection, or a new one from ``connect()`` if the
+        pool isn't full. ``check(connection)`` tells whether an idle
+        connection still works.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise OperationalError(
+                            f'No database connection available within {self.timeout}s '
+                            f'(pool size {self.max_size}).'
+                        )
+                    if not waited:
+                        waited = True
+                        self.waits += 1
+                    self._cond.wait(remaining)
+                if waited:
+                    self.wait_time += time.monotonic() - started
+                    waited = False
+                if self._idle:
+                    connection, opened, released = self._idle.pop()
+                else:
+                    connection = None
+                    self._size += 1
+                self._checked_out()
+
+            if connection is None:
+                try:
+                    connection = connect()
+                except BaseException:
+                    self._forget()
+                    raise
+                with self._cond:
+                    self.created += 1
+                    self._opened[id(connection)] = time.monotonic()
+                return connection
+
+            now = time.monotonic()
+            if now - opened >= self.max_lifetime or now - released >= self.max_idle:
+                self._discard(connection)
+                continue
+            if check is not None and now - released >= self.check_interval and not check(connection):
+                with self._cond:
+                    self.health_check_failures += 1
+                self._discard(connection)
+                continue
+            return connection
+
+    def release(self, connection, reusable=True):
+        with self._cond:
+            opened = self._opened.get(id(connection))
+            if reusable and opened is not None and time.monotonic() - opened < self.max_lifetime:
+                self._idle.append((connection, opened, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(connection)
+
+    def close_idle(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            for connection, _, _ in idle:
+                self._opened.pop(id(connection), None)
+            self._cond.notify_all()
+        for connection, _, _ in idle:
+            self._close(connection)
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._size - idle,
+                'idle': idle,
+                'peak_in_use': self.peak_in_use,
+                'checkouts': self.checkouts,
+                'created': self.created,
+                'closed': self.closed,
+                'waits': self.waits,
+                'wait_ms': self.wait_time * 1000,
+                'timeouts': self.timeouts,
+                'health_check_failures': self.health_check_failures,
+            }
+
+    def _checked_out(self):
+        self.checkouts += 1
+        self.peak_in_use = max(self.peak_in_use, self._size - len(self._idle))
+
+    def _forget(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _discard(self, connection):
+        with self._cond:
+            self._opened.pop(id(connection), None)
+        self._close(connection)
+        self._forget()
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self.closed += 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    """
+    Returns this process's pool for a database alias. Pools aren't shared
+    with forked children, which start their own.
+    """
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(**options)
+        return pool
+
+
+def pool_stats():
+    """
+    Returns the usage counters of this process's pools by database alias.
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        pools = {alias: pool for (owner, alias), pool in _pools.items() if owner == pid}
+    return {alias: pool.stats() for alias, pool in pools.items()}
@@ -0,0 +1,78 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+PRIMARY = 'primary'
+REPLICA = 'replica'
+
+# Where reads go in the current request/task. Outside of
+# ReplicaRoutingMiddleware everything reads from the primary.
+_read_from = ContextVar('read_from', default=PRIMARY)
+
+
+def get_options():
+    options = {
+        'REPLICAS': [],
+        'STICKY_SECONDS': 10,
+        'CACHE': 'default',
+        'PRIMARY_HEADER': 'X-Read-Primary',
+    }
+    options.update(getattr(settings, 'REPLICA_ROUTING', {}))
+    return options
+
+
+def get_replicas():
+    return get_options()['REPLICAS']
+
+
+@contextmanager
+def read_from(target):
+    token = _read_from.set(target)
+    try:
+        yield
+    finally:
+        _read_from.reset(token)
+
+
+def use_primary():
+    return read_from(PRIMARY)
+
+
+def use_replicas():
+    return read_from(REPLICA)
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a random replica from ``REPLICA_ROUTING['REPLICAS']``
+    while ``use_replicas()`` is in effect (ReplicaRoutingMiddleware turns it
+    on for safe requests) and there is no open transaction on the primary.
+    Everything else, including all writes, goes to the primary. Replicas
+    are never migrated; they copy the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_from.get() != REPLICA:
+            return DEFAULT_DB_ALIAS
+        replicas = get_replicas()
+        if not replicas or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
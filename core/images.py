@@ -0,0 +1,108 @@
+import hashlib
+import io
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils.encoding import filepath_to_uri
+from PIL import Image, ImageOps
+
+
+# Pillow format and file extension by variant format.
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+
+def get_options():
+    options = {
+        'SIZES': {'thumbnail': 128, 'small': 320, 'medium': 800},
+        'FORMATS': ['webp', 'jpeg'],
+        'QUALITY': 80,
+        'PREFIX': 'variants',
+    }
+    options.update(getattr(settings, 'IMAGE_VARIANTS', {}))
+    return options
+
+
+def encode(image, format, quality):
+    pil_format = FORMATS[format][0]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode in ('RGBA', 'LA'):
+            background.paste(image, mask=image.getchannel('A'))
+        else:
+            background.paste(image.convert('RGB'))
+        image = background
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    buffer = io.BytesIO()
+    # Nothing from the upload's info (EXIF, ICC, XMP) is passed on.
+    image.save(buffer, pil_format, quality=quality, optimize=pil_format == 'JPEG')
+    return buffer.getvalue()
+
+
+def store(storage, prefix, data, extension):
+    """
+    Saves ``data`` under a name derived from its SHA-256, so identical
+    variants are stored once and a name never changes content.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    name = f'{prefix}/{digest[:2]}/{digest}.{extension}'
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(data))
+    return name
+
+
+def build_variants(source, storage, options=None):
+    """
+    Resizes the image in the file ``source`` to fit each of the configured
+    sizes (never enlarging it), encodes every size in every configured
+    format and stores the files. Returns
+    ``{size_name: {'width': ..., 'height': ..., 'files': {format: name}}}``.
+
+    The EXIF orientation is applied first; metadata isn't copied to the
+    variants. Sizes are made largest first, each from the previous one.
+    """
+    options = options or get_options()
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    image.info = {}
+    variants = {}
+    for name, edge in sorted(options['SIZES'].items(), key=lambda item: -item[1]):
+        image = image.copy()
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        variants[name] = {
+            'width': image.width,
+            'height': image.height,
+            'files': {
+                format: store(storage, options['PREFIX'], encode(image, format, options['QUALITY']), FORMATS[format][1])
+                for format in options['FORMATS']
+            },
+        }
+    return variants
+
+
+def media_url(name):
+    """
+    Returns the URL of a file in the default file system storage, without
+    asking the storage.
+    """
+    return urljoin(settings.MEDIA_URL, filepath_to_uri(name))
+
+
+def variant_urls(variants):
+    """
+    Turns ``build_variants()`` output into
+    ``{size_name: {'width': ..., 'height': ..., format: url}}``.
+    """
+    return {
+        name: {
+            'width': variant['width'],
+            'height': variant['height'],
+            **{format: media_url(file_name) for format, file_name in variant['files'].items()},
+        }
+        for name, variant in variants.items()
+    }
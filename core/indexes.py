@@ -0,0 +1,200 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.migrations.loader import MigrationLoader
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+# SearchFilter lookup prefixes a B-tree index can serve.
+INDEXABLE_SEARCH_PREFIXES = {'^': 'istartswith', '=': 'iexact'}
+
+
+class IndexNeed:
+    def __init__(self, model, fields, reason):
+        self.model = model
+        self.fields = tuple(fields)
+        self.reason = reason
+
+    def __repr__(self):
+        return f'<IndexNeed {self.model._meta.label} {self.fields}>'
+
+
+class IndexAdvisor:
+    """
+    Compares what the API queries by with the indexes the migrations create.
+
+    For every viewset whose list is routed in the URLconf (and allowed by
+    its ``http_method_names``) it derives the column lists its list queries
+    want an index on:
+
+    - each keyset ordering, e.g. ``(created, id)``;
+    - each ``filterset_fields`` entry followed by the default ordering, so a
+      filtered page is one index range scan instead of filter-then-sort;
+    - ``last_updated`` when the view answers conditional requests;
+    - the target column of ``^``/``=`` search fields. Plain ``icontains``
+      search can't use a B-tree index and is only reported.
+
+    A need is covered by an index whose leading columns match it, or by a
+    unique index on a prefix of it.
+    """
+
+    def __init__(self, app_labels=None, urlconf=None):
+        self.app_labels = set(app_labels or ())
+        self.urlconf = urlconf
+        self.loader = MigrationLoader(None, ignore_no_migrations=True)
+        self.state = self.loader.project_state()
+
+    def get_viewsets(self):
+        """
+        Returns the routed views that list their queryset.
+        """
+        viewsets = []
+
+        def walk(patterns):
+            for pattern in patterns:
+                if isinstance(pattern, URLResolver):
+                    walk(pattern.url_patterns)
+                elif isinstance(pattern, URLPattern):
+                    cls = getattr(pattern.callback, 'cls', None)
+                    if cls is None or cls in viewsets or getattr(cls, 'queryset', None) is None:
+                        continue
+                    if self.routes_list(cls, getattr(pattern.callback, 'actions', None)):
+                        viewsets.append(cls)
+
+        walk(get_resolver(self.urlconf).url_patterns)
+        return viewsets
+
+    def routes_list(self, cls, actions):
+        # Viewsets route methods to actions, plain views handle GET as list.
+        if actions is None:
+            actions = {'get': 'list'} if hasattr(cls, 'list') else {}
+        allowed = getattr(cls, 'http_method_names', ())
+        return any(action == 'list' and method in allowed for method, action in actions.items())
+
+    def get_model(self, model):
+        # The migration state's copy, so we see what the migrations create.
+        return self.state.apps.get_model(model._meta.label)
+
+    def get_orderings(self, view):
+        pagination_class = getattr(view, 'pagination_class', None)
+        orderings = getattr(view, 'keyset_orderings', None) or getattr(pagination_class, 'orderings', {})
+        default = getattr(view, 'default_keyset_ordering', None) or getattr(pagination_class, 'default_ordering', None)
+        return orderings, orderings.get(default)
+
+    def get_needs(self, view):
+        model = self.get_model(view.queryset.model)
+        pk_name = model._meta.pk.name
+        needs = []
+
+        def need(fields, reason):
+            fields = [pk_name if field in ('pk', 'id') else field for field in fields]
+            needs.append(IndexNeed(model, fields, reason))
+
+        orderings, default_ordering = self.get_orderings(view)
+        for name, fields in orderings.items():
+            if all(self.has_field(model, field) for field in fields):
+                need(fields, f"ordering '{name}'")
+        for field in getattr(view, 'filterset_fields', None) or ():
+            if not self.has_field(model, field):
+                continue
+            if default_ordering:
+                need([field, *default_ordering], f"filter '{field}' + default ordering")
+            else:
+                need([field], f"filter '{field}'")
+        validator_field = getattr(view, 'validator_field', None)
+        if validator_field and self.has_field(model, validator_field):
+            need([validator_field], 'conditional request validator')
+        return needs
+
+    def get_search_needs(self, view):
+        """
+        Returns ``(needs, unindexable)`` for the view's ``search_fields``.
+        """
+        needs, unindexable = [], []
+        for search_field in getattr(view, 'search_fields', None) or ():
+            prefix = search_field[0] if search_field[0] in '^=@$' else ''
+            path = search_field[len(prefix):].split('__')
+            model = self.get_model(view.queryset.model)
+            for name in path[:-1]:
+                model = model._meta.get_field(name).related_model
+            if prefix in INDEXABLE_SEARCH_PREFIXES:
+                lookup = INDEXABLE_SEARCH_PREFIXES[prefix]
+                needs.append(IndexNeed(model, [path[-1]], f"search '{search_field}' ({lookup})"))
+            else:
+                unindexable.append(search_field)
+        return needs, unindexable
+
+    def has_field(self, model, name):
+        try:
+            model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    def existing_indexes(self, model):
+        """
+        Returns ``(fields, unique)`` for every index on ``model``'s table.
+        """
+        opts = model._meta
+        indexes = [((opts.pk.name,), True)]
+        for field in opts.local_fields:
+            if field.primary_key:
+                continue
+            if field.unique:
+                indexes.append(((field.name,), True))
+            elif field.db_index:
+                indexes.append(((field.name,), False))
+        for fields in opts.unique_together:
+            indexes.append((tuple(fields), True))
+        for constraint in opts.constraints:
+            if isinstance(constraint, models.UniqueConstraint) and constraint.fields and not constraint.condition:
+                indexes.append((tuple(constraint.fields), True))
+        for index in opts.indexes:
+            if index.fields and not index.condition:
+                indexes.append((tuple(field.lstrip('-') for field in index.fields), False))
+        return indexes
+
+    def is_covered(self, need):
+        for fields, unique in self.existing_indexes(need.model):
+            if fields[:len(need.fields)] == need.fields:
+                return True
+            if unique and need.fields[:len(fields)] == fields:
+                return True
+        return False
+
+    def advise(self):
+        """
+        Returns a list of ``(viewset, needs, unindexable search fields)``.
+        """
+        report = []
+        for view in self.get_viewsets():
+            if self.app_labels and view.queryset.model._meta.app_label not in self.app_labels:
+                continue
+            needs = self.get_needs(view)
+            search_needs, unindexable = self.get_search_needs(view)
+            report.append((view, needs + search_needs, unindexable))
+        return report
+
+    def missing(self, report=None):
+        missing, seen = [], set()
+        for view, needs, _ in self.advise() if report is None else report:
+            for need in needs:
+                key = (need.model._meta.label, need.fields)
+                if key not in seen and not self.is_covered(need):
+                    seen.add(key)
+                    missing.append(need)
+        return missing
+
+    def build_index(self, need):
+        index = models.Index(fields=list(need.fields), name='')
+        index.set_name_with_model(need.model)
+        return index
+
+    def meta_indexes(self, needs):
+        """
+        Returns ``{model label: [Index, ...]}`` for ``needs``, the entries to
+        add to each model's ``Meta.indexes`` before running makemigrations.
+        """
+        by_model = {}
+        for need in needs:
+            by_model.setdefault(need.model._meta.label, []).append(self.build_index(need))
+        return by_model
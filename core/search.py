@@ -0,0 +1,418 @@
+import bisect
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def parse_query(query):
+    """
+    Splits a search string into ``(term, prefix)`` pairs. A trailing ``*``
+    makes a term match every word it starts.
+    """
+    terms = []
+    for match in re.finditer(r'(\w+)(\*?)', str(query).lower(), re.UNICODE):
+        terms.append((match.group(1), bool(match.group(2))))
+    return terms
+
+
+class SearchIndex:
+    """
+    Describes the document indexed for each row of ``model``: the text of
+    ``fields``, which may follow foreign keys (``position__name``).
+
+    Rows whose documents include a related row are found again with
+    ``dependents`` when that row changes.
+    """
+
+    def __init__(self, model, fields, weights=None):
+        self.model = model
+        self.fields = tuple(fields)
+        self.weights = tuple(weights or (1.0,) * len(self.fields))
+        self.table = f'{model._meta.db_table}_search'
+
+    def documents(self, queryset, chunk_size=2000):
+        """
+        Yields ``(pk, texts)`` for the rows of ``queryset``.
+        """
+        rows = queryset.order_by().values_list('pk', *self.fields)
+        for pk, *values in rows.iterator(chunk_size=chunk_size):
+            yield pk, ['' if value is None else str(value) for value in values]
+
+    def related_models(self):
+        related = {}
+        for field in self.fields:
+            if '__' in field:
+                name = field.split('__', 1)[0]
+                related[name] = self.model._meta.get_field(name).related_model
+        return related
+
+    def dependents(self, instance):
+        """
+        Returns the pks of rows whose document includes ``instance``.
+        """
+        condition = Q()
+        for name, related_model in self.related_models().items():
+            if isinstance(instance, related_model):
+                condition |= Q(**{name: instance.pk})
+        if not condition:
+            return []
+        return list(self.model._default_manager.filter(condition).values_list('pk', flat=True))
+
+
+class BaseSearchBackend:
+    """
+    Keeps search documents for ``SearchIndex`` models and filters querysets
+    by them. ``filter`` annotates the rows with ``search_rank``, where lower
+    is more relevant, so the best matches sort first in ascending order.
+    """
+    batch_size = 500
+    # Whether documents live in the database and survive restarts.
+    persistent = True
+
+    def __init__(self, alias='default', max_results=1000):
+        self.alias = alias
+        self.max_results = max_results
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def install(self, index):
+        pass
+
+    def uninstall(self, index):
+        pass
+
+    def update(self, index, pks):
+        """
+        Re-reads the documents of ``pks``. Rows that are gone are removed.
+        """
+        pks = list(pks)
+        for start in range(0, len(pks), self.batch_size):
+            batch = pks[start:start + self.batch_size]
+            self.remove(index, batch)
+            queryset = index.model._default_manager.using(self.alias).filter(pk__in=batch)
+            self.add(index, index.documents(queryset))
+
+    def rebuild(self, index):
+        self.clear(index)
+        documents = index.documents(index.model._default_manager.using(self.alias).all())
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                self.add(index, batch)
+                batch = []
+        self.add(index, batch)
+
+    def add(self, index, documents):
+        raise NotImplementedError
+
+    def remove(self, index, pks):
+        raise NotImplementedError
+
+    def clear(self, index):
+        raise NotImplementedError
+
+    def filter(self, index, queryset, query):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 table per index, ranked with ``bm25()``.
+    """
+
+    def quote(self, name):
+        return self.connection.ops.quote_name(name)
+
+    def install(self, index):
+        columns = ', '.join(self.quote(field) for field in index.fields)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.quote(index.table)} '
+                f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def uninstall(self, index):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.quote(index.table)}')
+
+    def add(self, index, documents):
+        documents = [[pk, *texts] for pk, texts in documents]
+        if not documents:
+            return
+        columns = ', '.join(self.quote(field) for field in index.fields)
+        placeholders = ', '.join(['%s'] * (len(index.fields) + 1))
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.quote(index.table)} (rowid, {columns}) VALUES ({placeholders})',
+                documents,
+            )
+
+    def remove(self, index, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        placeholders = ', '.join(['%s'] * len(pks))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.quote(index.table)} WHERE rowid IN ({placeholders})', pks)
+
+    def clear(self, index):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.quote(index.table)}')
+
+    def match_expression(self, terms):
+        return ' '.join(f'"{term}"*' if prefix else f'"{term}"' for term, prefix in terms)
+
+    def filter(self, index, queryset, query):
+        terms = parse_query(query)
+        if not terms:
+            return queryset.none()
+        table = self.quote(index.table)
+        pk = f'{self.quote(index.model._meta.db_table)}.{self.quote(index.model._meta.pk.column)}'
+        weights = ', '.join(str(float(weight)) for weight in index.weights)
+        expression = self.match_expression(terms)
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [expression]),
+        ).annotate(search_rank=RawSQL(
+            f'SELECT bm25({table}, {weights}) FROM {table} WHERE {table} MATCH %s AND rowid = {pk}',
+            [expression],
+            output_field=FloatField(),
+        ))
+
+
+class MySQLFullTextBackend(BaseSearchBackend):
+    """
+    InnoDB table per index with a FULLTEXT key over the document, searched
+    in boolean mode. Relevance is negated so lower still ranks first.
+
+    InnoDB only indexes words of ``innodb_ft_min_token_size`` (3) letters
+    or more and makes writes visible to searches on commit.
+    """
+
+    def quote(self, name):
+        return self.connection.ops.quote_name(name)
+
+    def install(self, index):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.quote(index.table)} ('
+                f'id BIGINT NOT NULL PRIMARY KEY, document LONGTEXT NOT NULL, '
+                f'FULLTEXT KEY {self.quote(index.table + "_document")} (document)'
+                f') ENGINE=InnoDB DEFAULT CHARSET=utf8mb4'
+            )
+
+    def uninstall(self, index):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.quote(index.table)}')
+
+    def document(self, index, texts):
+        # Repeat fields to weigh them, as a single FULLTEXT column has no weights.
+        return '\n'.join(
+            ' '.join([text] * max(1, round(weight)))
+            for text, weight in zip(texts, index.weights)
+        )
+
+    def add(self, index, documents):
+        documents = [[pk, self.document(index, texts)] for pk, texts in documents]
+        if not documents:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'REPLACE INTO {self.quote(index.table)} (id, document) VALUES (%s, %s)',
+                documents,
+            )
+
+    def remove(self, index, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        placeholders = ', '.join(['%s'] * len(pks))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.quote(index.table)} WHERE id IN ({placeholders})', pks)
+
+    def clear(self, index):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.quote(index.table)}')
+
+    def match_expression(self, terms):
+        return ' '.join(f'+{term}*' if prefix else f'+{term}' for term, prefix in terms)
+
+    def filter(self, index, queryset, query):
+        terms = parse_query(query)
+        if not terms:
+            return queryset.none()
+        table = self.quote(index.table)
+        pk = f'{self.quote(index.model._meta.db_table)}.{self.quote(index.model._meta.pk.column)}'
+        expression = self.match_expression(terms)
+        match = 'MATCH(document) AGAINST(%s IN BOOLEAN MODE)'
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT id FROM {table} WHERE {match}', [expression]),
+        ).annotate(search_rank=RawSQL(
+            f'SELECT -{match} FROM {table} WHERE id = {pk}',
+            [expression],
+            output_field=FloatField(),
+        ))
+
+
+class InMemoryBackend(BaseSearchBackend):
+    """
+    Per-process inverted index ranked with BM25, for databases without a
+    full-text engine. Each process builds it from the database on first use
+    and then follows the writes it sees itself, so other processes' writes
+    show up only after ``rebuild``. At most ``max_results`` rows match.
+    """
+    persistent = False
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, alias='default', max_results=1000):
+        super().__init__(alias, max_results)
+        self._lock = threading.RLock()
+        self._indexes = {}
+
+    def _get(self, index):
+        with self._lock:
+            if index.table not in self._indexes:
+                self.rebuild(index)
+            return self._indexes[index.table]
+
+    def add(self, index, documents):
+        with self._lock:
+            data = self._indexes.get(index.table)
+            if data is None:
+                # Not built yet; the first search reads the database.
+                return
+            for pk, texts in documents:
+                counts = Counter()
+                for text, weight in zip(texts, index.weights):
+                    for token in tokenize(text):
+                        counts[token] += weight
+                for token, count in counts.items():
+                    data['postings'][token][pk] = count
+                data['lengths'][pk] = sum(counts.values())
+            data['vocabulary'] = None
+
+    def remove(self, index, pks):
+        with self._lock:
+            data = self._indexes.get(index.table)
+            if data is None:
+                return
+            pks = set(pks) & data['lengths'].keys()
+            if not pks:
+                return
+            for token in list(data['postings']):
+                postings = data['postings'][token]
+                for pk in pks & postings.keys():
+                    del postings[pk]
+                if not postings:
+                    del data['postings'][token]
+            for pk in pks:
+                del data['lengths'][pk]
+            data['vocabulary'] = None
+
+    def clear(self, index):
+        with self._lock:
+            self._indexes[index.table] = {
+                'postings': defaultdict(dict),
+                'lengths': {},
+                'vocabulary': None,
+            }
+
+    def rebuild(self, index):
+        with self._lock:
+            super().rebuild(index)
+
+    def expand(self, data, term, prefix):
+        if not prefix:
+            return [term] if term in data['postings'] else []
+        if data['vocabulary'] is None:
+            data['vocabulary'] = sorted(data['postings'])
+        vocabulary = data['vocabulary']
+        tokens = []
+        for position in range(bisect.bisect_left(vocabulary, term), len(vocabulary)):
+            if not vocabulary[position].startswith(term):
+                break
+            tokens.append(vocabulary[position])
+        return tokens
+
+    def search(self, index, query):
+        """
+        Returns ``[(pk, rank)]`` for the documents holding every term.
+        """
+        with self._lock:
+            data = self._get(index)
+            count = len(data['lengths'])
+            if not count:
+                return []
+            average = sum(data['lengths'].values()) / count
+            scores = None
+            for term, prefix in parse_query(query):
+                term_scores = defaultdict(float)
+                for token in self.expand(data, term, prefix):
+                    postings = data['postings'][token]
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for pk, frequency in postings.items():
+                        norm = self.k1 * (1 - self.b + self.b * data['lengths'][pk] / average)
+                        term_scores[pk] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+                if scores is None:
+                    scores = dict(term_scores)
+                else:
+                    scores = {pk: score + term_scores[pk] for pk, score in scores.items() if pk in term_scores}
+                if not scores:
+                    return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:self.max_results]
+        return [(pk, -score) for pk, score in ranked]
+
+    def filter(self, index, queryset, query):
+        results = self.search(index, query)
+        if not results:
+            return queryset.none()
+        return queryset.filter(pk__in=[pk for pk, _ in results]).annotate(search_rank=Case(
+            *[When(pk=pk, then=Value(rank)) for pk, rank in results],
+            output_field=FloatField(),
+        ))
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'mysql': MySQLFullTextBackend,
+}
+
+_backends = {}
+
+
+def get_search_backend(alias='default'):
+    """
+    Returns the search backend for a database alias, from
+    ``settings.SEARCH_BACKEND``. ``'auto'`` picks the full-text engine of
+    the database and falls back to the in-process index.
+    """
+    backend = _backends.get(alias)
+    if backend is None:
+        options = getattr(settings, 'SEARCH_BACKEND', {})
+        path = options.get('BACKEND', 'auto')
+        if path == 'auto':
+            backend_class = VENDOR_BACKENDS.get(connections[alias].vendor, InMemoryBackend)
+        else:
+            backend_class = import_string(path)
+        backend = _backends[alias] = backend_class(
+            alias=alias,
+            max_results=options.get('MAX_RESULTS', 1000),
+        )
+    return backend
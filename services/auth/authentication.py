@@ -0,0 +1,70 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+from core.cache import LRUCache
+
+
+def get_token_cache():
+    options = getattr(settings, 'AUTH_TOKEN_CACHE', {})
+    return LRUCache(
+        max_size=options.get('MAX_SIZE', 10000),
+        ttl=options.get('TTL', 60),
+    )
+
+
+token_cache = get_token_cache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers token -> (user, token) in a bounded,
+    per-process TTL cache instead of querying on every request.
+
+    Entries are evicted in this process when the token is deleted or its
+    user is saved or deleted (see ``apps.user.signals``); other workers pick
+    the change up within the TTL. Invalid tokens are never cached.
+
+    ``aauthenticate`` serves async views; cache hits don't leave the event
+    loop.
+    """
+    cache = token_cache
+
+    def authenticate_credentials(self, key):
+        credentials = self.cache.get(key)
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            self.cache.set(key, credentials)
+        return credentials
+
+    async def aauthenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+        credentials = self.cache.get(key)
+        if credentials is None:
+            credentials = await sync_to_async(super().authenticate_credentials)(key)
+            self.cache.set(key, credentials)
+        return credentials
+
+    def get_key(self, request):
+        # The header parsing of TokenAuthentication.authenticate().
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            msg = _('Invalid token header. No credentials provided.')
+            raise exceptions.AuthenticationFailed(msg)
+        elif len(auth) > 2:
+            msg = _('Invalid token header. Token string should not contain spaces.')
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            msg = _('Invalid token header. Token string should not contain invalid characters.')
+            raise exceptions.AuthenticationFailed(msg)
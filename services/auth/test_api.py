@@ -1,10 +1,14 @@
 import json
 
-from django.test import TestCase
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from rest_framework import status
 from apps.user.models import User
-from apps.user.factories import UserFactory  
+from apps.user.factories import UserFactory, TokenFactory
+from services.auth.authentication import CachedTokenAuthentication, token_cache
 
 class AuthTokenTests(APITestCase):
     def setUp(self):
@@ -37,4 +41,51 @@ class AuthTokenTests(APITestCase):
         data = {'username': 'testuser'}
         response = self.client.post('/api/auth/token/', data=json.dumps(data), content_type='application/json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.data, {"error": "Username and password are required"})
\ No newline at end of file
+        self.assertEqual(response.data, {"error": "Username and password are required"})
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        token_cache.reset_stats()
+        self.user = UserFactory(username='testuser', password='password123')
+        self.token = TokenFactory(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def test_001_token_lookup_is_cached(self):
+        response = self.client.get('/api/status/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/status/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('authtoken_token' in query['sql'] for query in queries.captured_queries))
+        stats = token_cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_002_deleted_token_is_evicted(self):
+        self.client.get('/api/status/')
+        self.token.delete()
+        response = self.client.get('/api/status/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_003_deactivated_user_is_evicted(self):
+        self.client.get('/api/status/')
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/api/status/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_004_invalid_token_is_not_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        response = self.client.get('/api/status/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(token_cache), 0)
+
+    def test_005_async_lookup_counts_one_miss(self):
+        request = RequestFactory().get('/api/status/', HTTP_AUTHORIZATION='Token ' + self.token.key)
+        authenticate = async_to_sync(CachedTokenAuthentication().aauthenticate)
+        with self.assertNumQueries(1):
+            self.assertEqual(authenticate(request), (self.user, self.token))
+        self.assertEqual(authenticate(request), (self.user, self.token))
+        stats = token_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
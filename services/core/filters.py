@@ -0,0 +1,22 @@
+from rest_framework.filters import SearchFilter
+
+from core.search import get_search_backend, parse_query
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Searches the ``search_index`` of the view with the configured search
+    backend instead of ``icontains`` lookups. Rows are annotated with
+    ``search_rank``; ``KeysetPagination`` orders by it unless told
+    otherwise. Views without a ``search_index`` use ``search_fields`` as
+    SearchFilter does.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        index = getattr(view, 'search_index', None)
+        if index is None:
+            return super().filter_queryset(request, queryset, view)
+        query = request.query_params.get(self.search_param, '')
+        if not parse_query(query):
+            return queryset
+        return get_search_backend(queryset.db).filter(index, queryset, query)
@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('services.instrumentation')
+
+
+def get_options():
+    options = {
+        'ENABLED': False,
+        'BUFFER_SIZE': 1000,
+        'LOG': False,
+    }
+    options.update(getattr(settings, 'API_INSTRUMENTATION', {}))
+    return options
+
+
+class RequestMetrics:
+    """
+    Timings (in milliseconds) and query counts collected for one request.
+    """
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.view = None
+        self.status_code = None
+        self.timings = {}
+        self.query_count = 0
+        self.query_time = 0.0
+        self._marks = {}
+
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds * 1000
+
+    def mark(self, name):
+        self._marks[name] = (time.perf_counter(), self.query_time)
+
+    def since(self, name):
+        """
+        Returns ``(seconds, query_seconds)`` elapsed since ``mark(name)``.
+        """
+        started, query_time = self._marks.get(name, (None, None))
+        if started is None:
+            return None, None
+        return time.perf_counter() - started, self.query_time - query_time
+
+    def as_dict(self):
+        return {
+            'method': self.method,
+            'path': self.path,
+            'view': self.view,
+            'status': self.status_code,
+            'query_count': self.query_count,
+            'query_ms': self.query_time * 1000,
+            **{f'{name}_ms': value for name, value in self.timings.items()},
+        }
+
+
+class RingBuffer:
+    def __init__(self, size):
+        self._items = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def append(self, item):
+        with self._lock:
+            self._items.append(item)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+recent_requests = RingBuffer(get_options()['BUFFER_SIZE'])
+
+
+def get_metrics(request):
+    return getattr(request, '_metrics', None)
+
+
+@contextmanager
+def timer(request, name):
+    metrics = get_metrics(request)
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(name, time.perf_counter() - started)
+
+
+@contextmanager
+def count_queries(metrics):
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.query_count += 1
+            metrics.query_time += time.perf_counter() - started
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def record(metrics):
+    data = metrics.as_dict()
+    recent_requests.append(data)
+    if get_options()['LOG']:
+        logger.info('%(method)s %(path)s %(status)s', data, extra={'metrics': data})
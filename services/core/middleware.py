@@ -0,0 +1,181 @@
+import hashlib
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+from core import compression
+from core.db import routers
+from . import instrumentation
+
+
+class InstrumentationMiddleware:
+    """
+    Records per request timings and query counts into
+    ``instrumentation.recent_requests`` (and optionally the
+    ``services.instrumentation`` logger). Views using
+    ``InstrumentedViewMixin`` add auth, permission, serialization and render
+    timings. Disabled unless ``API_INSTRUMENTATION['ENABLED']`` is set, in
+    which case it is dropped from the middleware chain entirely.
+    """
+
+    def __init__(self, get_response):
+        if not instrumentation.get_options()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request._metrics = instrumentation.RequestMetrics(request.method, request.path)
+        started = time.perf_counter()
+        with instrumentation.count_queries(metrics):
+            response = self.get_response(request)
+        metrics.add('total', time.perf_counter() - started)
+        metrics.status_code = response.status_code
+        instrumentation.record(metrics)
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses responses of at least ``RESPONSE_COMPRESSION['MIN_SIZE']``
+    bytes, and streamed ones, with the best encoding the client accepts
+    (see ``core.compression.negotiate``). Responses that already have a
+    Content-Encoding, like precompressed ones from the response cache, are
+    left alone. Not used when ``RESPONSE_COMPRESSION['ENABLED']`` is off.
+    """
+
+    def __init__(self, get_response):
+        if not compression.get_options()['ENABLED']:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return response
+        if not response.streaming and len(response.content) < compression.get_options()['MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = compression.negotiate(request.headers.get('Accept-Encoding'))
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.acompress_stream(codec, response.streaming_content)
+            else:
+                response.streaming_content = compression.compress_stream(codec, response.streaming_content)
+            # The compressed size isn't known until it has been streamed.
+            del response.headers['Content-Length']
+        else:
+            compressed = codec.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag must differ between encodings, a weak one needn't.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codec.name
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets ``core.db.routers.ReplicaRouter`` send the reads of safe (GET,
+    HEAD, OPTIONS) requests to the replicas in
+    ``REPLICA_ROUTING['REPLICAS']``. Reads stay on the primary when:
+
+    - the request sends the ``REPLICA_ROUTING['PRIMARY_HEADER']`` header
+      (``X-Read-Primary: 1``);
+    - the same client, identified by its Authorization header or session
+      cookie, made a successful write in the last ``STICKY_SECONDS``, so it
+      reads its own writes while the replicas catch up. The marker lives
+      in the ``REPLICA_ROUTING['CACHE']`` cache, which must be shared
+      between workers for stickiness to hold across them.
+
+    Not used when no replicas are configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not routers.get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with routers.read_from(self.get_read_target(request)):
+            response = self.get_response(request)
+        self.process_response(request, response)
+        return response
+
+    async def __acall__(self, request):
+        target = await sync_to_async(self.get_read_target)(request)
+        with routers.read_from(target):
+            response = await self.get_response(request)
+        await sync_to_async(self.process_response)(request, response)
+        return response
+
+    def get_read_target(self, request):
+        if request.method not in SAFE_METHODS:
+            return routers.PRIMARY
+        options = routers.get_options()
+        if request.headers.get(options['PRIMARY_HEADER'], '').lower() in ('1', 'true', 'yes'):
+            return routers.PRIMARY
+        key = self.get_sticky_key(request)
+        if key is not None and caches[options['CACHE']].get(key):
+            return routers.PRIMARY
+        return routers.REPLICA
+
+    def process_response(self, request, response):
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return
+        key = self.get_sticky_key(request)
+        if key is not None:
+            options = routers.get_options()
+            caches[options['CACHE']].set(key, True, options['STICKY_SECONDS'])
+
+    def get_sticky_key(self, request):
+        client = request.headers.get('Authorization') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if not client:
+            return None
+        return 'replica-sticky:' + hashlib.sha256(client.encode()).hexdigest()
+
+
+class AsyncViewMiddleware:
+    """
+    Under ASGI, hands requests for views that have an ``async_view`` (see
+    ``AsyncViewSetMixin``) to that coroutine instead of running the sync
+    view in a thread. Must come last so the other middleware's
+    ``process_view`` hooks run first. Not used under WSGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not iscoroutinefunction(get_response):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        markcoroutinefunction(self)
+
+    async def __call__(self, request):
+        return await self.get_response(request)
+
+    async def process_view(self, request, view_func, view_args, view_kwargs):
+        async_view = getattr(view_func, 'async_view', None)
+        if async_view is None or request.method.lower() not in view_func.async_methods:
+            return None
+        return await async_view(request, *view_args, **view_kwargs)
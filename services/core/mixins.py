@@ -1,6 +1,706 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max
+from django.conf import settings
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import exceptions, status
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from core import compression
+from core.cache import instance_tag, model_tag, response_cache
+from services.task.serializers import TaskSerializer
+from .instrumentation import get_metrics, timer
+from .query import get_query_plan
+from .renderers import NDJSONRenderer, StreamingJSONRenderer
+from .serializers import get_values_serializer, parse_field_paths, shape_serializer
+
+
 class ActionSerializersViewSetMixin:
     ACTION_SERIALIZERS = {}
     
     def get_serializer_class(self):
         return self.ACTION_SERIALIZERS.get(self.action, self.serializer_class)
-    
\ No newline at end of file
+    
+
+class SparseFieldsetsMixin:
+    """
+    Response shaping for the read actions:
+
+    - ``?fields=id,name,position.name`` renders only the listed fields,
+      dotted names pick fields of nested relations;
+    - ``?expand=position`` renders only the listed relations nested and the
+      others as their primary key. Without it relations render as the
+      serializer declares them.
+
+    The shaped serializer is what ``get_serializer_class`` returns, so the
+    query plan and the values() columns follow it: relations that aren't
+    expanded aren't joined and unselected columns aren't loaded.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    sparse_fieldsets_actions = ('list', 'retrieve', 'export')
+
+    def get_serializer_class(self):
+        serializer_class = super().get_serializer_class()
+        request = getattr(self, 'request', None)
+        if request is None or self.action not in self.sparse_fieldsets_actions:
+            return serializer_class
+        fields = request.query_params.get(self.fields_query_param)
+        expand = request.query_params.get(self.expand_query_param)
+        if not fields and expand is None:
+            return serializer_class
+        return shape_serializer(
+            serializer_class,
+            parse_field_paths(fields) if fields else None,
+            set(parse_field_paths(expand)) if expand is not None else None,
+        )
+
+
+class QueryPlanViewSetMixin:
+    query_plan_actions = ('list', 'retrieve', 'export')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.query_plan_actions:
+            plan = get_query_plan(queryset.model, self.get_serializer_class())
+            queryset = plan.apply(queryset)
+        return queryset
+
+
+class AsyncViewSetMixin:
+    """
+    Async dispatch for the actions a viewset also implements as ``a<action>``
+    coroutines (``alist``, ``aretrieve``). ``as_view`` still returns the sync
+    view; the coroutine version hangs off it as ``async_view`` and is only
+    used by ``AsyncViewMiddleware`` when serving over ASGI.
+
+    Authentication and permissions are awaited: authenticators and
+    permissions may provide ``aauthenticate``/``ahas_permission``/
+    ``ahas_object_permission``, anything else runs in a worker thread.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        async_methods = {
+            method for method, action_name in view.actions.items()
+            if hasattr(cls, f'a{action_name}')
+        }
+        if not async_methods:
+            return view
+        if 'get' in async_methods:
+            async_methods.add('head')
+
+        async def async_view(request, *args, **kwargs):
+            self = cls(**initkwargs)
+            actions = view.actions
+            if 'get' in actions and 'head' not in actions:
+                actions['head'] = actions['get']
+            self.action_map = actions
+            for method, action_name in actions.items():
+                setattr(self, method, getattr(self, action_name))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        view.async_view = async_view
+        view.async_methods = frozenset(async_methods)
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            handler = getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+        await self.aperform_authentication(request)
+        await self.acheck_permissions(request)
+        self.check_throttles(request)
+
+    async def aperform_authentication(self, request):
+        # Request._authenticate(), awaiting each authenticator.
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, 'aauthenticate', None)
+            if authenticate is None:
+                authenticate = sync_to_async(authenticator.authenticate)
+            try:
+                user_auth_tuple = await authenticate(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            check = getattr(permission, 'ahas_permission', None)
+            if check is None:
+                check = sync_to_async(permission.has_permission)
+            if not await check(request, self):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+
+    async def acheck_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            check = getattr(permission, 'ahas_object_permission', None)
+            if check is None:
+                check = sync_to_async(permission.has_object_permission)
+            if not await check(request, self, obj):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+
+    async def aget_object(self):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        await self.acheck_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        if hasattr(paginator, 'get_page_queryset'):
+            page_queryset = paginator.get_page_queryset(queryset, self.request, view=self)
+            if page_queryset is None:
+                return None
+            return paginator.paginate_rows([obj async for obj in page_queryset])
+        return await sync_to_async(self.paginate_queryset)(queryset)
+
+
+class AsyncListModelMixin:
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+
+class AsyncRetrieveModelMixin:
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+
+class ValuesSerializerMixin:
+    """
+    Serves the ``values_serializer_actions`` from ``.values()`` rows rendered
+    by a ValuesSerializer compiled from the action's serializer, skipping
+    model instances and per-row serializers. Falls back to the serializer
+    when it can't be compiled.
+
+    Object permissions are checked against the row dict, so only opt in
+    views whose permissions don't inspect the object.
+    """
+    values_serializer_actions = ()
+
+    def get_values_serializer(self):
+        if self.action not in self.values_serializer_actions:
+            return None
+        return get_values_serializer(self.get_serializer_class())
+
+    def get_values_lookup(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_values_serializer()
+        if serializer is None:
+            return super().list(request, *args, **kwargs)
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.many(page))
+        return Response(serializer.many(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_values_serializer()
+        if serializer is None:
+            return super().retrieve(request, *args, **kwargs)
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        row = get_object_or_404(queryset, **self.get_values_lookup())
+        self.check_object_permissions(request, row)
+        return Response(serializer.to_representation(row))
+
+    async def alist(self, request, *args, **kwargs):
+        serializer = self.get_values_serializer()
+        if serializer is None:
+            return await super().alist(request, *args, **kwargs)
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        queryset = serializer.values(queryset)
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.many(page))
+        return Response(serializer.many([row async for row in queryset]))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        serializer = self.get_values_serializer()
+        if serializer is None:
+            return await super().aretrieve(request, *args, **kwargs)
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        try:
+            row = await serializer.values(queryset).aget(**self.get_values_lookup())
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        await self.acheck_object_permissions(request, row)
+        return Response(serializer.to_representation(row))
+
+
+class ResponseCacheMixin:
+    """
+    Serves list/retrieve from the rendered bytes of an earlier identical
+    request.
+
+    Entries are keyed on the view, path, query parameters, negotiated media
+    type and ``get_cache_scope()``, and tagged with the models they were
+    built from: the whole model for lists, the one row for details, plus
+    every related model the serializer renders. Writes evict the matching
+    tags (see ``core.cache.invalidate_instance``).
+
+    Entries also keep the body compressed with each encoding clients asked
+    for, so hits skip CompressionMiddleware's work.
+
+    Only ``response_cache_formats`` are cached: the browsable API's HTML
+    shows the requesting user, so it's rendered for every request.
+    Authentication and permissions still run on every request; override
+    ``get_cache_scope`` when the output depends on who is asking.
+    """
+    response_cache_actions = ('list', 'retrieve')
+    response_cache_formats = ('json', 'msgpack')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(request, super().alist, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(request, super().aretrieve, *args, **kwargs)
+
+    def response_cache_enabled(self):
+        options = getattr(settings, 'RESPONSE_CACHE', {})
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return (
+            options.get('ENABLED', True)
+            and self.action in self.response_cache_actions
+            and getattr(renderer, 'format', None) in self.response_cache_formats
+        )
+
+    def get_cache_scope(self):
+        return None
+
+    def get_cache_key(self, request):
+        key = repr((
+            type(self).__module__,
+            type(self).__qualname__,
+            self.action,
+            request.path,
+            sorted(request.query_params.lists()),
+            getattr(request, 'accepted_media_type', None),
+            self.get_cache_scope(),
+        ))
+        return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+    def get_cache_tags(self):
+        model = self.get_queryset().model
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if self.action == 'retrieve' and self.lookup_field in ('pk', model._meta.pk.name):
+            tags = [instance_tag(model, self.kwargs[lookup_url_kwarg])]
+        else:
+            tags = [model_tag(model)]
+        plan = get_query_plan(model, self.get_serializer_class())
+        tags.extend(model_tag(related_model) for related_model in plan.related_models)
+        return tags
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if not self.response_cache_enabled():
+            return handler(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        entry, versions = response_cache.get_with_versions(key)
+        if entry is not None:
+            return self.cached_hit(request, key, entry, versions)
+        versions = response_cache.get_versions(self.get_cache_tags())
+        response = handler(request, *args, **kwargs)
+        return self.cache_response(request, key, versions, response)
+
+    async def acached_response(self, request, handler, *args, **kwargs):
+        if not self.response_cache_enabled():
+            return await handler(request, *args, **kwargs)
+        # The cache (possibly a network one) and the compression of hits
+        # block, so they run in a worker thread. Misses are stored at render
+        # time, which Django's async handler already runs in a thread.
+        key = self.get_cache_key(request)
+        entry, versions = await sync_to_async(response_cache.get_with_versions)(key)
+        if entry is not None:
+            return await sync_to_async(self.cached_hit)(request, key, entry, versions)
+        versions = await sync_to_async(response_cache.get_versions)(self.get_cache_tags())
+        response = await handler(request, *args, **kwargs)
+        return self.cache_response(request, key, versions, response)
+
+    def cache_response(self, request, key, versions, response):
+        response['X-Cache'] = 'MISS'
+        if response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+            def store(rendered):
+                entry = {
+                    'content': rendered.content,
+                    'content_type': rendered['Content-Type'],
+                    'etag': rendered.get('ETag'),
+                    'last_modified': parse_http_date_safe(rendered.get('Last-Modified', '')),
+                    'encodings': {},
+                }
+                content, encoding = self.encode_cached(request, entry)
+                response_cache.set(key, entry, versions)
+                if encoding is not None:
+                    rendered.content = content
+                    rendered['Content-Encoding'] = encoding
+                    patch_vary_headers(rendered, ('Accept-Encoding',))
+            response.add_post_render_callback(store)
+        return response
+
+    def cached_hit(self, request, key, entry, versions):
+        etag, last_modified = entry['etag'], entry['last_modified']
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            known = len(entry['encodings'])
+            content, encoding = self.encode_cached(request, entry)
+            if len(entry['encodings']) != known:
+                response_cache.set(key, entry, versions)
+            response = HttpResponse(content, content_type=entry['content_type'])
+            if encoding is not None:
+                response['Content-Encoding'] = encoding
+                patch_vary_headers(response, ('Accept-Encoding',))
+        if etag:
+            response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def encode_cached(self, request, entry):
+        """
+        Returns ``(content, encoding)`` of a cache entry for ``request``,
+        compressing it the first time an encoding is asked for and keeping
+        the result in ``entry['encodings']`` (None when it didn't shrink).
+        """
+        options = compression.get_options()
+        content = entry['content']
+        if not options['ENABLED'] or len(content) < options['MIN_SIZE']:
+            return content, None
+        codec = compression.negotiate(request.headers.get('Accept-Encoding'))
+        if codec is None:
+            return content, None
+        if codec.name not in entry['encodings']:
+            compressed = codec.compress(content)
+            entry['encodings'][codec.name] = compressed if len(compressed) < len(content) else None
+        compressed = entry['encodings'][codec.name]
+        if compressed is None:
+            return content, None
+        return compressed, codec.name
+
+
+class ConditionalGetMixin:
+    """
+    Answers list/retrieve with 304 Not Modified from cheap validators,
+    before anything is serialized.
+
+    The validators are ``last_updated`` of the rows plus that of every
+    related row the serializer renders: ``MAX()`` of each and a count for
+    lists (so deletes and cleared relations show), the timestamps of the one
+    row for details.
+
+    Lists only get an ETag: deleting a row doesn't move ``MAX()``, so a
+    Last-Modified date would answer If-Modified-Since with a stale 304.
+    """
+    validator_field = 'last_updated'
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_list_validators()
+        return self.conditional_response(request, validators, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_detail_validators()
+        return self.conditional_response(request, validators, super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        validators = await self.aget_list_validators()
+        return await self.aconditional_response(request, validators, super().alist, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        validators = await self.aget_detail_validators()
+        return await self.aconditional_response(request, validators, super().aretrieve, *args, **kwargs)
+
+    def get_validator_paths(self, model):
+        if not self._has_field(model, self.validator_field):
+            return []
+        paths = [self.validator_field]
+        plan = get_query_plan(model, self.get_serializer_class())
+        for path in plan.select_related:
+            related_model = model
+            for name in path.split('__'):
+                related_model = related_model._meta.get_field(name).related_model
+            if self._has_field(related_model, self.validator_field):
+                paths.append(f'{path}__{self.validator_field}')
+        return paths
+
+    def _has_field(self, model, name):
+        try:
+            model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    def get_list_validators(self):
+        query = self.get_list_validator_query(self.filter_queryset(self.get_queryset()))
+        if query is None:
+            return None
+        queryset, paths, aggregates = query
+        return self.build_list_validators(paths, queryset.aggregate(**aggregates))
+
+    async def aget_list_validators(self):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        query = self.get_list_validator_query(queryset)
+        if query is None:
+            return None
+        queryset, paths, aggregates = query
+        return self.build_list_validators(paths, await queryset.aaggregate(**aggregates))
+
+    def get_list_validator_query(self, queryset):
+        paths = self.get_validator_paths(queryset.model)
+        if not paths:
+            return None
+        aggregates = {f'max_{index}': Max(path) for index, path in enumerate(paths)}
+        aggregates['count'] = Count('pk')
+        for index, path in enumerate(paths[1:]):
+            aggregates[f'count_{index}'] = Count(path.rsplit('__', 1)[0])
+        return queryset.order_by(), paths, aggregates
+
+    def build_list_validators(self, paths, values):
+        timestamps = [values[f'max_{index}'] for index in range(len(paths))]
+        etag, _ = self.build_validators(timestamps, values)
+        return etag, None
+
+    def get_detail_validators(self):
+        queryset = self.get_detail_validator_query(self.filter_queryset(self.get_queryset()))
+        row = queryset.first() if queryset is not None else None
+        return self.build_validators(row, row) if row is not None else None
+
+    async def aget_detail_validators(self):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        queryset = self.get_detail_validator_query(queryset)
+        row = await queryset.afirst() if queryset is not None else None
+        return self.build_validators(row, row) if row is not None else None
+
+    def get_detail_validator_query(self, queryset):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        paths = self.get_validator_paths(queryset.model)
+        if not paths or lookup_url_kwarg not in self.kwargs:
+            return None
+        try:
+            return queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values_list(*paths)
+        except (TypeError, ValueError):
+            return None
+
+    def build_validators(self, timestamps, state):
+        timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+        request = self.request
+        key = repr((
+            request.get_full_path(),
+            getattr(request, 'accepted_media_type', None),
+            sorted(state.items()) if isinstance(state, dict) else state,
+        ))
+        etag = 'W/"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+        return etag, last_modified
+
+    def conditional_response(self, request, validators, handler, *args, **kwargs):
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        response = self.get_not_modified_response(request, validators)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.add_validators(response, validators)
+
+    async def aconditional_response(self, request, validators, handler, *args, **kwargs):
+        if validators is None:
+            return await handler(request, *args, **kwargs)
+        response = self.get_not_modified_response(request, validators)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        return self.add_validators(response, validators)
+
+    def get_not_modified_response(self, request, validators):
+        etag, last_modified = validators
+        return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    def add_validators(self, response, validators):
+        etag, last_modified = validators
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class StreamingExportMixin:
+    """
+    Adds an ``export`` list action that streams every row instead of
+    building the whole page in memory. ``?format=ndjson`` (the default) or
+    ``?format=json`` pick the output format.
+    """
+    export_chunk_size = 2000
+    export_ordering = ('pk',)
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, StreamingJSONRenderer])
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by(*self.export_ordering)
+        serializer = self.get_serializer()
+        rows = (
+            serializer.to_representation(instance)
+            for instance in queryset.iterator(chunk_size=self.export_chunk_size)
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.render_stream(rows),
+            content_type=renderer.media_type,
+        )
+        filename = f'{queryset.model._meta.model_name}.{renderer.format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class BackgroundTaskMixin:
+    """
+    Lets actions hand slow work to the task queue. A client opts in with
+    ``Prefer: respond-async`` and gets ``202 Accepted`` pointing at the
+    task; an ``Idempotency-Key`` header makes retried requests return the
+    first request's task instead of queueing the work again.
+    """
+
+    def prefers_async(self, request):
+        preferences = request.headers.get('Prefer', '')
+        return any(item.strip().lower() == 'respond-async' for item in preferences.split(','))
+
+    def get_idempotency_key(self, request):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return None
+        digest = hashlib.sha256(f'{request.user.pk}:{key}'.encode()).hexdigest()
+        return f'{type(self).__name__}.{self.action}:{digest}'
+
+    def enqueue_response(self, request, definition, **kwargs):
+        task = definition.enqueue(key=self.get_idempotency_key(request), created_by=request.user, **kwargs)
+        location = reverse('task-detail', args=[task.pk], request=request)
+        return Response(TaskSerializer(task).data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+
+class InstrumentedViewMixin:
+    """
+    Adds auth, permission, handler/serialization and render timings to the
+    request's metrics when InstrumentationMiddleware is active. A no-op
+    otherwise.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        metrics = get_metrics(request)
+        if metrics is not None:
+            metrics.view = f'{type(self).__name__}.{getattr(self, "action", None) or request.method.lower()}'
+        super().initial(request, *args, **kwargs)
+        if metrics is not None:
+            metrics.mark('handler')
+
+    async def ainitial(self, request, *args, **kwargs):
+        metrics = get_metrics(request)
+        if metrics is not None:
+            metrics.view = f'{type(self).__name__}.{self.action}'
+        await super().ainitial(request, *args, **kwargs)
+        if metrics is not None:
+            metrics.mark('handler')
+
+    def perform_authentication(self, request):
+        with timer(request, 'auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with timer(request, 'permission'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with timer(request, 'permission'):
+            super().check_object_permissions(request, obj)
+
+    async def aperform_authentication(self, request):
+        with timer(request, 'auth'):
+            await super().aperform_authentication(request)
+
+    async def acheck_permissions(self, request):
+        with timer(request, 'permission'):
+            await super().acheck_permissions(request)
+
+    async def acheck_object_permissions(self, request, obj):
+        with timer(request, 'permission'):
+            await super().acheck_object_permissions(request, obj)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        metrics = get_metrics(request)
+        if metrics is not None:
+            elapsed, query_elapsed = metrics.since('handler')
+            if elapsed is not None:
+                metrics.add('handler', elapsed)
+                # Handler time not spent in the database is dominated by
+                # building the serializer output.
+                metrics.add('serialization', max(elapsed - query_elapsed, 0.0))
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if metrics is not None and hasattr(response, 'add_post_render_callback'):
+            metrics.mark('render')
+            response.add_post_render_callback(
+                lambda rendered: metrics.add('render', metrics.since('render')[0])
+            )
+        return response
@@ -0,0 +1,219 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek pagination over a unique ordering, e.g. ``(created, id)``.
+
+    Each page is fetched with ``WHERE (created, id) > (:created, :id)`` and a
+    LIMIT, so it costs the same at any depth as long as the ordering is
+    backed by an index. Cursors are opaque base64 tokens holding the boundary
+    row's ordering values.
+
+    Views can override ``keyset_orderings``, ``default_keyset_ordering``,
+    ``page_size`` and ``max_page_size``.
+
+    Querysets annotated with ``search_rank`` by a search backend also get
+    the ``rank`` ordering, which is their default.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 500
+    orderings = {
+        'created': ('created', 'id'),
+        'name': ('name', 'id'),
+    }
+    default_ordering = 'created'
+    rank_ordering = 'rank'
+    rank_fields = ('search_rank', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+    invalid_ordering_message = 'Invalid ordering'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.paginate_rows(list(queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Returns the unevaluated queryset for the requested page, one row
+        longer than the page so ``paginate_rows`` can tell if there is more.
+        """
+        self.request = request
+        self.view = view
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.ordering_name, self.fields, self.descending = self.get_ordering(request, view, queryset)
+        self.cursor = self.decode_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor['r'])
+
+        descending = self.descending != self.reverse
+        if self.cursor:
+            values = self.cursor['v']
+            if len(values) != len(self.fields):
+                raise NotFound(self.invalid_cursor_message)
+            values = [
+                self.to_python(queryset.model, field, value)
+                for field, value in zip(self.fields, values)
+            ]
+            queryset = queryset.filter(self.seek_filter(values, descending))
+
+        order_by = [('-' if descending else '') + field for field in self.fields]
+        queryset = self.load_ordering_fields(queryset)
+        return queryset.order_by(*order_by)[:self.page_size + 1]
+
+    def load_ordering_fields(self, queryset):
+        # Cursors are built from the ordering fields; don't let only()/defer()
+        # leave them to be fetched row by row, or values() leave them out.
+        if queryset._fields is not None:
+            missing = [field for field in self.fields if field not in queryset._fields]
+            return queryset.values(*queryset._fields, *missing) if missing else queryset
+        fields = {field for field in self.fields if field not in queryset.query.annotations}
+        names, defer = queryset.query.deferred_loading
+        if not names:
+            return queryset
+        if defer:
+            return queryset.defer(None).defer(*(set(names) - fields))
+        return queryset.only(*(set(names) | fields))
+
+    def paginate_rows(self, rows):
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+        self.rows = rows
+        return rows
+
+    def get_page_size(self, request):
+        max_page_size = getattr(self.view, 'max_page_size', None) or self.max_page_size
+        page_size = getattr(self.view, 'page_size', None) or self.page_size
+        if self.page_size_query_param:
+            try:
+                page_size = _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                )
+            except (KeyError, ValueError):
+                pass
+        if page_size and max_page_size:
+            page_size = min(page_size, max_page_size)
+        return page_size
+
+    def get_ordering(self, request, view, queryset=None):
+        orderings = getattr(view, 'keyset_orderings', None) or self.orderings
+        default = getattr(view, 'default_keyset_ordering', None) or self.default_ordering
+        if queryset is not None and self.rank_fields[0] in queryset.query.annotations:
+            orderings = {**orderings, self.rank_ordering: self.rank_fields}
+            default = self.rank_ordering
+        name = request.query_params.get(self.ordering_query_param) or default
+        descending = name.startswith('-')
+        fields = orderings.get(name.lstrip('-'))
+        if fields is None:
+            raise NotFound(self.invalid_ordering_message)
+        return name, fields, descending
+
+    def seek_filter(self, values, descending):
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        for index in reversed(range(len(self.fields))):
+            field, value = self.fields[index], values[index]
+            step = Q(**{f'{field}__{lookup}': value})
+            if index < len(self.fields) - 1:
+                step |= Q(**{field: value}) & condition
+            condition = step
+        return condition
+
+    def to_python(self, model, field_name, value):
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            if field_name == 'id':
+                field = model._meta.pk
+            else:
+                return value
+        try:
+            return field.to_python(value)
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_position(self, row):
+        values = []
+        for field in self.fields:
+            value = row[field] if isinstance(row, dict) else getattr(row, field)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            elif not isinstance(value, (int, float, str, bool, type(None))):
+                value = str(value)
+            values.append(value)
+        return values
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            cursor = json.loads(urlsafe_b64decode(padded.encode('ascii')))
+            if cursor['o'] != self.ordering_name or not isinstance(cursor['v'], list):
+                raise ValueError
+            return {'v': cursor['v'], 'r': bool(cursor.get('r'))}
+        except (binascii.Error, ValueError, TypeError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        cursor = {'o': self.ordering_name, 'v': self.get_position(row)}
+        if reverse:
+            cursor['r'] = 1
+        data = json.dumps(cursor, separators=(',', ':')).encode('utf-8')
+        encoded = urlsafe_b64encode(data).decode('ascii').rstrip('=')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        has_next = self.has_more if not self.reverse else self.cursor is not None
+        if not has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        has_previous = self.has_more if self.reverse else self.cursor is not None
+        if not has_previous:
+            return None
+        if not self.rows:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.rows[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
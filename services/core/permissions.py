@@ -8,7 +8,13 @@ from django.contrib.auth.models import AnonymousUser
 class IsAuthenticated(BasePermission):
 
     def has_permission(self, request, view):
-        print(request.user)
         return request.user and not isinstance(request.user, AnonymousUser)
+
+    # Only looks at the request, so it is safe to call from async views.
+    async def ahas_permission(self, request, view):
+        return self.has_permission(request, view)
+
+    async def ahas_object_permission(self, request, view, obj):
+        return self.has_object_permission(request, view, obj)
     
-AllowAny=AllowAny
\ No newline at end of file
+AllowAny=AllowAny
@@ -0,0 +1,146 @@
+import weakref
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ForeignObjectRel
+from rest_framework import serializers
+
+
+class QueryPlan:
+    def __init__(self, select_related=(), prefetch_related=(), only=(), related_models=()):
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        self.only = tuple(only)
+        # Every other model the serializer output is built from.
+        self.related_models = tuple(related_models)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+    def __repr__(self):
+        return (
+            f'QueryPlan(select_related={self.select_related}, '
+            f'prefetch_related={self.prefetch_related}, only={self.only})'
+        )
+
+
+class QueryPlanner:
+    """
+    Works out select_related/prefetch_related/only() for a model from the
+    fields a serializer declares.
+
+    SerializerMethodFields named after a model relation are assumed to render
+    the whole related object, which is how EmployeeSerializer nests
+    position/department/status. Any other method field may read arbitrary
+    attributes, so only() is skipped for that serializer.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.select_related = []
+        self.prefetch_related = []
+        self.only = []
+        self.related_models = []
+        self.restrict_columns = True
+
+    def plan(self, serializer):
+        self._walk(self.model, serializer, prefix='')
+        only = self.only if self.restrict_columns else ()
+        return QueryPlan(self.select_related, self.prefetch_related, only, self.related_models)
+
+    def _add(self, collection, path):
+        if path not in collection:
+            collection.append(path)
+
+    def _walk(self, model, serializer, prefix):
+        self._add(self.only, prefix + model._meta.pk.name)
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                self._walk_method_field(model, field, prefix)
+            elif field.source == '*':
+                self.restrict_columns = False
+            else:
+                self._walk_source(model, field, field.source_attrs, prefix)
+
+    def _walk_method_field(self, model, field, prefix):
+        model_field = self._get_model_field(model, field.field_name)
+        if model_field is None or not model_field.is_relation:
+            self.restrict_columns = False
+            return
+        self._walk_relation(model_field, None, prefix)
+
+    def _walk_source(self, model, field, attrs, prefix):
+        model_field = self._get_model_field(model, attrs[0])
+        if model_field is None:
+            # Properties and methods on the model can touch anything.
+            self.restrict_columns = False
+            return
+        if not model_field.is_relation:
+            self._add(self.only, prefix + model_field.name)
+            return
+        if len(attrs) > 1:
+            related_model = model_field.related_model
+            path = self._walk_relation(model_field, False, prefix)
+            if path is not None:
+                self._walk_source(related_model, field, attrs[1:], path + '__')
+            return
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.BaseSerializer):
+            self._walk_relation(model_field, nested, prefix)
+        elif model_field.many_to_many or model_field.one_to_many:
+            self._add(self.prefetch_related, prefix + model_field.name)
+            self._add(self.related_models, model_field.related_model)
+        elif isinstance(model_field, ForeignObjectRel):
+            self._walk_relation(model_field, False, prefix)
+        else:
+            # A primary key relation only needs the local column.
+            self._add(self.only, prefix + model_field.name)
+
+    def _walk_relation(self, model_field, nested, prefix):
+        """
+        ``nested`` is the serializer rendering the related object, None when
+        the whole object is rendered and False when only some attributes are.
+        """
+        path = prefix + model_field.name
+        related_model = model_field.related_model
+        self._add(self.related_models, related_model)
+        if model_field.many_to_many or model_field.one_to_many:
+            # Prefetched querysets are planned separately, keep them whole.
+            self._add(self.prefetch_related, path)
+            return None
+        if not isinstance(model_field, ForeignObjectRel):
+            self._add(self.only, path)
+        self._add(self.select_related, path)
+        if nested is None:
+            for related_field in related_model._meta.concrete_fields:
+                self._add(self.only, f'{path}__{related_field.name}')
+        elif nested:
+            self._walk(related_model, nested, path + '__')
+        else:
+            self._add(self.only, f'{path}__{related_model._meta.pk.name}')
+        return path
+
+    def _get_model_field(self, model, name):
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+
+# By serializer class, weakly so shaped serializers can be dropped.
+_plans = weakref.WeakKeyDictionary()
+
+
+def get_query_plan(model, serializer_class):
+    plans = _plans.setdefault(serializer_class, {})
+    plan = plans.get(model)
+    if plan is None:
+        plan = plans[model] = QueryPlanner(model).plan(serializer_class())
+    return plan
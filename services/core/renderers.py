@@ -0,0 +1,120 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer with orjson. Values orjson doesn't handle the same way as
+    DRF's encoder (Decimal, dates, lazy strings, querysets...) go through
+    ``JSONEncoder.default``. Indented or ASCII-only output, and anything
+    orjson can't encode, is left to JSONRenderer, as is everything when
+    orjson isn't installed.
+
+    The output parses to the same data, and is byte for byte the same
+    except for floats: orjson writes ``1e16``/``1e-7`` where DRF writes
+    ``1e+16``/``1e-07``, and renders NaN and infinities as ``null`` where
+    DRF refuses them.
+    """
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, to stay a strict javascript subset.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack, for clients that send ``Accept: application/msgpack``.
+    Values without a MessagePack type are encoded like JSONRenderer encodes
+    them. Needs the msgpack package.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default, datetime=False)
+
+
+class StreamingRendererMixin:
+    # Rows are coalesced into chunks of about this many bytes so the server
+    # doesn't write one tiny chunk per row.
+    chunk_size = 64 * 1024
+
+    def render_row(self, row):
+        return FastJSONRenderer.render(self, row)
+
+    def render_stream(self, rows):
+        buffer = bytearray(self.stream_start())
+        separator = b''
+        for row in rows:
+            buffer += separator
+            buffer += self.render_row(row)
+            separator = self.stream_separator
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += self.stream_end(bool(separator))
+        if buffer:
+            yield bytes(buffer)
+
+
+class StreamingJSONRenderer(StreamingRendererMixin, FastJSONRenderer):
+    stream_separator = b','
+
+    def stream_start(self):
+        return b'['
+
+    def stream_end(self, has_rows):
+        return b']'
+
+
+class NDJSONRenderer(StreamingRendererMixin, FastJSONRenderer):
+    """
+    Newline delimited JSON, one object per line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    stream_separator = b'\n'
+
+    def stream_start(self):
+        return b''
+
+    def stream_end(self, has_rows):
+        return b'\n' if has_rows else b''
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, list):
+            return b''.join(self.render_stream(data))
+        return self.render_row(data) + b'\n'
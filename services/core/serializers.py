@@ -0,0 +1,245 @@
+import weakref
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from core.cache import LRUCache
+
+
+# Serializer fields whose to_representation() returns database values of
+# the paired model fields unchanged.
+PASSTHROUGH_FIELDS = (
+    (serializers.CharField, (models.CharField, models.TextField)),
+    (serializers.IntegerField, (models.IntegerField, models.AutoField)),
+    (serializers.BooleanField, (models.BooleanField,)),
+)
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+class ValuesSerializer:
+    """
+    Read-only stand-in for a ModelSerializer that renders ``.values()`` rows
+    instead of model instances, with the same output.
+
+    The serializer's fields are resolved once into column accessors, so a
+    row costs a dict lookup and at most one conversion per field instead of
+    instantiating serializers. Method fields named in the serializer's
+    ``Meta.nested_serializers`` render the related row with that
+    serializer, read from the joined columns.
+
+    Raises UnsupportedField for fields it can't render from a column
+    (other method fields, files, dotted sources, hyperlinks...).
+    """
+
+    def __init__(self, serializer_class, model=None, prefix=''):
+        self.serializer_class = serializer_class
+        self.model = model or serializer_class.Meta.model
+        self.prefix = prefix
+        self.accessors = []
+        self.columns = []
+        nested_serializers = getattr(serializer_class.Meta, 'nested_serializers', {})
+        for field in serializer_class().fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                nested_class = nested_serializers.get(field.field_name)
+                if nested_class is None:
+                    raise UnsupportedField(field.field_name)
+                self.add_nested(field.field_name, nested_class)
+            else:
+                self.add_field(field)
+
+    def get_model_field(self, name):
+        try:
+            return self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise UnsupportedField(name)
+
+    def add_column(self, name):
+        column = self.prefix + name
+        if column not in self.columns:
+            self.columns.append(column)
+        return column
+
+    def add_field(self, field):
+        if len(field.source_attrs) != 1:
+            raise UnsupportedField(field.field_name)
+        model_field = self.get_model_field(field.source_attrs[0])
+        if model_field.many_to_many or model_field.one_to_many or not model_field.concrete:
+            raise UnsupportedField(field.field_name)
+        if isinstance(model_field, models.FileField):
+            # Rendered as URLs, which needs the FieldFile and the request.
+            raise UnsupportedField(field.field_name)
+        if model_field.is_relation:
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                raise UnsupportedField(field.field_name)
+            # values() gives the related pk, which is what the field renders.
+            convert = None
+        elif any(
+            type(field) is field_class and isinstance(model_field, model_fields)
+            for field_class, model_fields in PASSTHROUGH_FIELDS
+        ):
+            convert = None
+        else:
+            convert = field.to_representation
+        self.accessors.append((field.field_name, self.add_column(model_field.name), convert, None))
+
+    def add_nested(self, name, nested_class):
+        model_field = self.get_model_field(name)
+        if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+            raise UnsupportedField(name)
+        nested = ValuesSerializer(nested_class, model_field.related_model, f'{self.prefix}{name}__')
+        self.columns.extend(column for column in nested.columns if column not in self.columns)
+        # The foreign key column tells an empty relation from a related row.
+        self.accessors.append((name, self.add_column(name), None, nested))
+
+    def values(self, queryset):
+        # Keep annotations (e.g. search_rank) selectable for pagination.
+        annotations = [name for name in queryset.query.annotation_select if name not in self.columns]
+        return queryset.values(*self.columns, *annotations)
+
+    def to_representation(self, row, memo=None):
+        data = {}
+        for key, column, convert, nested in self.accessors:
+            value = row[column]
+            if value is None:
+                data[key] = None
+            elif nested is not None:
+                data[key] = self.nested_representation(nested, row, memo)
+            elif convert is None:
+                data[key] = value
+            else:
+                data[key] = convert(value)
+        return data
+
+    def nested_representation(self, nested, row, memo):
+        # Related rows repeat across a page; render each distinct one once.
+        if memo is None:
+            return nested.to_representation(row)
+        key = (nested.prefix, *(row[column] for column in nested.columns))
+        data = memo.get(key)
+        if data is None:
+            data = memo[key] = nested.to_representation(row, memo)
+        return dict(data)
+
+    def many(self, rows):
+        memo = {}
+        to_representation = self.to_representation
+        return [to_representation(row, memo) for row in rows]
+
+# Weak, so shaped serializers (see shape_serializer) can be dropped.
+_values_serializers = weakref.WeakKeyDictionary()
+
+
+def get_values_serializer(serializer_class):
+    """
+    Returns the ValuesSerializer for ``serializer_class``, or None when it
+    can't be compiled and the serializer has to be used.
+    """
+    try:
+        return _values_serializers[serializer_class]
+    except KeyError:
+        pass
+    try:
+        values_serializer = ValuesSerializer(serializer_class)
+    except UnsupportedField:
+        values_serializer = None
+    _values_serializers[serializer_class] = values_serializer
+    return values_serializer
+
+
+def parse_field_paths(value):
+    """
+    Parses ``'id,position.name'`` into ``{'id': {}, 'position': {'name': {}}}``.
+    An empty dict stands for all fields.
+    """
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def _freeze(tree):
+    return tuple(sorted((name, _freeze(children)) for name, children in tree.items()))
+
+
+def get_nested_serializer(serializer_class, field):
+    """
+    Returns the serializer class rendering ``field`` as a nested object, or
+    None if it doesn't.
+    """
+    if isinstance(field, serializers.SerializerMethodField):
+        return getattr(serializer_class.Meta, 'nested_serializers', {}).get(field.field_name)
+    if isinstance(field, serializers.BaseSerializer) and not isinstance(field, serializers.ListSerializer):
+        return type(field)
+    return None
+
+
+_shaped_serializers = LRUCache(max_size=256)
+
+
+def shape_serializer(serializer_class, fields=None, expand=None):
+    """
+    Returns a subclass of ``serializer_class`` rendering only ``fields`` (a
+    tree from ``parse_field_paths``; None for all). Nested relations not in
+    ``expand`` render as their primary key, unless ``fields`` picks some of
+    their fields; ``expand=None`` leaves them nested. Raises ValidationError
+    for names the serializer doesn't have.
+    """
+    key = (serializer_class, _freeze(fields) if fields else None, frozenset(expand) if expand is not None else None)
+    shaped = _shaped_serializers.get(key)
+    if shaped is None:
+        shaped = _build_shaped_serializer(serializer_class, fields or None, expand)
+        _shaped_serializers.set(key, shaped)
+    return shaped
+
+
+def _build_shaped_serializer(serializer_class, fields, expand):
+    available = serializer_class().fields
+    names = list(available) if fields is None else list(fields)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValidationError({'fields': [f"Unknown field '{name}'." for name in unknown]})
+
+    attrs = {name: None for name in serializer_class._declared_fields if name not in names}
+    nested_serializers = dict(getattr(serializer_class.Meta, 'nested_serializers', {}))
+    expandable = set()
+    for name in names:
+        field = available[name]
+        subfields = fields.get(name) if fields else None
+        nested_class = get_nested_serializer(serializer_class, field)
+        if nested_class is None:
+            if subfields:
+                raise ValidationError({'fields': [f"'{name}' has no fields to select."]})
+            continue
+        expandable.add(name)
+        if not subfields and expand is not None and name not in expand:
+            source = name if isinstance(field, serializers.SerializerMethodField) else field.source
+            kwargs = {'source': source} if source != name else {}
+            attrs[name] = serializers.PrimaryKeyRelatedField(read_only=True, **kwargs)
+            nested_serializers.pop(name, None)
+        elif subfields:
+            shaped_nested = shape_serializer(nested_class, subfields)
+            if name in nested_serializers:
+                nested_serializers[name] = shaped_nested
+            else:
+                attrs[name] = shaped_nested(**field._kwargs)
+    if expand:
+        unknown = sorted(set(expand) - expandable - (set(available) - set(names)))
+        if unknown:
+            raise ValidationError({'expand': [f"'{name}' can't be expanded." for name in unknown]})
+
+    attrs['Meta'] = type('Meta', (serializer_class.Meta,), {
+        'fields': names,
+        'exclude': None,
+        'nested_serializers': nested_serializers,
+    })
+    return type(serializer_class.__name__, (serializer_class,), attrs)
@@ -0,0 +1,102 @@
+import asyncio
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.employee.cache import lookup_cache
+from apps.employee.factories import EmployeeFactory, StatusFactory
+from apps.user.factories import UserFactory, TokenFactory
+from core.cache import response_cache
+from services.employee.api import EmployeeViewSet, StatusViewSet
+
+
+def fail_sync(*args, **kwargs):
+    raise AssertionError('The sync view ran.')
+
+
+class AsyncViewTestCase(APITestCase):
+
+    def setUp(self):
+        lookup_cache.clear()
+        response_cache.clear()
+        self.token = TokenFactory(user=UserFactory())
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.auth = {'Authorization': 'Token ' + self.token.key}
+        self.employees = EmployeeFactory.create_batch(3)
+
+    async def test_001_list_matches_sync_response(self):
+        expected = await self.sync_get('/api/employee/', {'page_size': 2})
+        response_cache.clear()
+        with mock.patch.object(EmployeeViewSet, 'list', fail_sync):
+            response = await self.async_client.get('/api/employee/', {'page_size': 2}, headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response['ETag'], expected['ETag'])
+
+        response = await self.async_client.get(response.json()['next'], headers=self.auth)
+        self.assertEqual(len(response.json()['results']), 1)
+
+    async def test_002_detail_and_conditional_requests(self):
+        employee = self.employees[0]
+        with mock.patch.object(EmployeeViewSet, 'retrieve', fail_sync):
+            response = await self.async_client.get(f'/api/employee/{employee.id}/', headers=self.auth)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['name'], employee.name)
+            self.assertEqual(response['X-Cache'], 'MISS')
+
+            response = await self.async_client.get(
+                f'/api/employee/{employee.id}/', headers={**self.auth, 'If-None-Match': response['ETag']}
+            )
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            response = await self.async_client.get('/api/employee/0/', headers=self.auth)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_003_lookup_viewsets_retrieve_from_cache(self):
+        status_obj = await StatusFactory._meta.model.objects.afirst()
+        with mock.patch.object(StatusViewSet, 'retrieve', fail_sync):
+            response = await self.async_client.get(f'/api/status/{status_obj.id}/', headers=self.auth)
+        self.assertEqual(response.json()['name'], status_obj.name)
+
+    async def test_004_authentication_and_permissions(self):
+        response = await self.async_client.get('/api/employee/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.async_client.get('/api/employee/', headers={'Authorization': 'Token nope'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_005_writes_keep_the_sync_path(self):
+        response = await self.async_client.post(
+            '/api/status/', {'name': 'Remote'}, content_type='application/json', headers=self.auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    async def test_006_response_cache_runs_off_the_event_loop(self):
+        calls = []
+
+        def record(method):
+            def wrapper(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    calls.append((method.__name__, 'thread'))
+                else:
+                    calls.append((method.__name__, 'loop'))
+                return method(*args, **kwargs)
+            return wrapper
+
+        with mock.patch.multiple(
+            response_cache,
+            get_with_versions=record(response_cache.get_with_versions),
+            get_versions=record(response_cache.get_versions),
+            set=record(response_cache.set),
+        ):
+            for _ in range(2):
+                response = await self.async_client.get('/api/employee/', headers=self.auth)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual({name for name, _ in calls}, {'get_with_versions', 'get_versions', 'set'})
+        self.assertEqual({where for _, where in calls}, {'thread'})
+
+    async def sync_get(self, *args, **kwargs):
+        return await sync_to_async(self.client.get)(*args, **kwargs)
@@ -0,0 +1,110 @@
+import gzip
+import zlib
+from unittest import mock
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from apps.employee.cache import lookup_cache
+from apps.employee.factories import EmployeeFactory
+from apps.user.factories import TokenFactory, UserFactory
+from core import compression
+from core.cache import response_cache
+from .middleware import CompressionMiddleware
+
+
+class CompressionMiddlewareTestCase(SimpleTestCase):
+    body = b'{"name":"Employee","address":"Example Street"},' * 100
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, accept_encoding='gzip, deflate'):
+        request = self.factory.get('/', headers={'Accept-Encoding': accept_encoding})
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_001_negotiates_by_quality_then_preference(self):
+        with override_settings(RESPONSE_COMPRESSION={'ENCODINGS': ['gzip']}):
+            self.assertEqual(compression.negotiate('br, gzip;q=0.5').name, 'gzip')
+            self.assertEqual(compression.negotiate('*').name, 'gzip')
+            self.assertIsNone(compression.negotiate('gzip;q=0, br'))
+            self.assertIsNone(compression.negotiate(''))
+        self.assertEqual(
+            compression.parse_accept_encoding('gzip;q=0.8, br, zstd;q=bad'),
+            {'gzip': 0.8, 'br': 1.0, 'zstd': 0.0},
+        )
+
+    def test_002_compresses_large_responses(self):
+        response = self.process(HttpResponse(self.body, headers={'ETag': '"abc"'}))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+        response = self.process(HttpResponse(self.body), accept_encoding='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_003_skips_small_and_encoded_responses(self):
+        response = self.process(HttpResponse(b'{}'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+        response = self.process(HttpResponse(self.body, headers={'Content-Encoding': 'br'}))
+        self.assertEqual(response.content, self.body)
+
+    def test_004_compresses_streams_chunk_by_chunk(self):
+        chunks = [self.body[:100], self.body[100:]]
+        response = self.process(StreamingHttpResponse(iter(chunks)))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        decompressor = zlib.decompressobj(31)
+        first = next(response.streaming_content)
+        # Each chunk is flushed so it can be decoded on arrival.
+        self.assertEqual(decompressor.decompress(first), chunks[0])
+        rest = b''.join(response.streaming_content)
+        self.assertEqual(decompressor.decompress(rest), chunks[1])
+
+    async def test_005_compresses_async_streams(self):
+        async def chunks():
+            yield self.body
+
+        response = StreamingHttpResponse(chunks())
+        request = self.factory.get('/', headers={'Accept-Encoding': 'gzip'})
+
+        async def get_response(request):
+            return response
+
+        response = await CompressionMiddleware(get_response)(request)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(gzip.decompress(content), self.body)
+
+
+class CachedCompressionTestCase(APITestCase):
+
+    def setUp(self):
+        lookup_cache.clear()
+        response_cache.clear()
+        token = TokenFactory(user=UserFactory())
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        EmployeeFactory.create_batch(10)
+
+    def test_001_cache_keeps_compressed_bodies(self):
+        expected = self.client.get('/api/employee/').content
+        response_cache.clear()
+        with mock.patch.object(compression.GzipCodec, 'compress', wraps=compression.GzipCodec().compress) as compress:
+            miss = self.client.get('/api/employee/', HTTP_ACCEPT_ENCODING='gzip')
+            hit = self.client.get('/api/employee/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compress.call_count, 1)
+        for response, state in ((miss, 'MISS'), (hit, 'HIT')):
+            self.assertEqual(response['X-Cache'], state)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertEqual(gzip.decompress(response.content), expected)
+
+        hit = self.client.get('/api/employee/')
+        self.assertEqual(hit['X-Cache'], 'HIT')
+        self.assertFalse(hit.has_header('Content-Encoding'))
+        self.assertEqual(hit.content, expected)
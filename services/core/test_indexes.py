@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from apps.employee.models import Employee
+from core.indexes import IndexAdvisor
+from services.employee.api import EmployeeViewSet
+from services.task.api import TaskViewSet
+from services.core.pagination import KeysetPagination
+
+
+class ManagerViewSet:
+    queryset = Employee.objects.all()
+    pagination_class = KeysetPagination
+    filterset_fields = ['is_manager', 'status']
+    search_fields = ['^address', 'status__name']
+
+
+class IndexAdvisorTests(SimpleTestCase):
+
+    def test_migrations_cover_routed_viewsets(self):
+        self.assertEqual(IndexAdvisor(['employee']).missing(), [])
+        out = StringIO()
+        call_command('advise_indexes', '--check', stdout=out)
+        self.assertIn('All indexes are in place.', out.getvalue())
+
+    def test_skips_viewsets_without_a_routed_list(self):
+        viewsets = IndexAdvisor().get_viewsets()
+        self.assertIn(EmployeeViewSet, viewsets)
+        self.assertNotIn(TaskViewSet, viewsets)
+
+    def test_proposes_missing_filter_and_search_indexes(self):
+        advisor = IndexAdvisor()
+        needs = advisor.get_needs(ManagerViewSet)
+        search_needs, unindexable = advisor.get_search_needs(ManagerViewSet)
+        missing = advisor.missing([(ManagerViewSet, needs + search_needs, unindexable)])
+        self.assertEqual(
+            [need.fields for need in missing],
+            [('is_manager', 'created', 'id'), ('address',)],
+        )
+        self.assertEqual(unindexable, ['status__name'])
+
+        indexes = advisor.meta_indexes(missing)
+        self.assertEqual(list(indexes), ['employee.Employee'])
+        employee_indexes = indexes['employee.Employee']
+        self.assertEqual([index.fields for index in employee_indexes], [['is_manager', 'created', 'id'], ['address']])
+        self.assertTrue(all(index.name.startswith('employee_em') for index in employee_indexes))
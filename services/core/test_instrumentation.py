@@ -0,0 +1,44 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.employee.factories import EmployeeFactory
+from apps.user.factories import UserFactory, TokenFactory
+from services.core.instrumentation import recent_requests
+
+
+INSTRUMENTATION = {'ENABLED': True, 'BUFFER_SIZE': 10, 'LOG': False}
+
+
+class InstrumentationTestCase(APITestCase):
+
+    def setUp(self):
+        recent_requests.clear()
+        self.token = TokenFactory(user=UserFactory())
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        EmployeeFactory.create_batch(2)
+
+    @override_settings(API_INSTRUMENTATION=INSTRUMENTATION)
+    def test_001_records_request_metrics(self):
+        response = self.client.get('/api/employee/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [metrics] = recent_requests.snapshot()
+        self.assertEqual(metrics['method'], 'GET')
+        self.assertEqual(metrics['path'], '/api/employee/')
+        self.assertEqual(metrics['view'], 'EmployeeViewSet.list')
+        self.assertEqual(metrics['status'], 200)
+        self.assertGreaterEqual(metrics['query_count'], 1)
+        for name in ('auth', 'permission', 'handler', 'serialization', 'render', 'total'):
+            self.assertIn(f'{name}_ms', metrics)
+
+    @override_settings(API_INSTRUMENTATION=INSTRUMENTATION)
+    def test_002_records_rejected_requests(self):
+        self.client.credentials()
+        response = self.client.get('/api/employee/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        [metrics] = recent_requests.snapshot()
+        self.assertEqual(metrics['status'], 401)
+
+    def test_003_disabled_by_default(self):
+        self.client.get('/api/employee/')
+        self.assertEqual(recent_requests.snapshot(), [])
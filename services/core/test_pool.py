@@ -0,0 +1,105 @@
+import os
+import tempfile
+import threading
+
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+from core.db import pool as pool_module
+from core.db.config import database_settings
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """
+    Runs the pooled backend against a SQLite file standing in for MySQL.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.alias = f'pooled-{self.id()}'
+        self.addCleanup(self.close_pools)
+
+    def close_pools(self):
+        for key, pool in list(pool_module._pools.items()):
+            if key[1] == self.alias:
+                pool.close_idle()
+                del pool_module._pools[key]
+
+    def make_connection(self, **pool):
+        settings = {
+            'ENGINE': 'core.db.backends.sqlite3',
+            'NAME': os.path.join(self.directory.name, 'pool.sqlite3'),
+            'OPTIONS': {'pool': {'timeout': 0.2, **pool}},
+        }
+        return ConnectionHandler({'default': {}, self.alias: settings})[self.alias]
+
+    def stats(self):
+        return pool_module.pool_stats()[self.alias]
+
+    def test_closed_connections_are_reused(self):
+        connection = self.make_connection()
+        connection.ensure_connection()
+        raw = connection.connection
+        connection.close()
+        self.assertEqual(self.stats()['idle'], 1)
+
+        other = self.make_connection()
+        with other.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(other.connection, raw)
+        self.assertEqual(self.stats()['in_use'], 1)
+        other.close()
+        stats = self.stats()
+        self.assertEqual((stats['created'], stats['checkouts'], stats['closed']), (1, 2, 0))
+
+    def test_pool_is_bounded(self):
+        first = self.make_connection(max_size=1)
+        first.ensure_connection()
+        second = self.make_connection(max_size=1)
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+        self.assertEqual(self.stats()['timeouts'], 1)
+
+        first.inc_thread_sharing()
+        thread = threading.Timer(0.05, first.close)
+        thread.start()
+        second.pool.timeout = 2
+        second.ensure_connection()
+        thread.join()
+        stats = self.stats()
+        self.assertEqual((stats['size'], stats['in_use'], stats['waits']), (1, 1, 2))
+        second.close()
+
+    def test_broken_connections_are_replaced(self):
+        connection = self.make_connection(check_interval=0)
+        connection.ensure_connection()
+        raw = connection.connection
+        connection.close()
+        raw.close()
+
+        connection.ensure_connection()
+        self.assertIsNot(connection.connection, raw)
+        self.assertEqual(self.stats()['health_check_failures'], 1)
+        connection.close()
+
+    def test_connections_closed_in_a_transaction_are_discarded(self):
+        connection = self.make_connection()
+        connection.set_autocommit(False)
+        connection.close()
+        stats = self.stats()
+        self.assertEqual((stats['size'], stats['closed']), (0, 1))
+
+    def test_database_settings_from_environment(self):
+        environ = {'DB_NAME': 'employees', 'DB_HOST': 'db', 'DB_POOL_SIZE': '5', 'DB_POOL_TIMEOUT': '2'}
+        settings = database_settings('mysql', environ=environ)
+        self.assertEqual(settings['ENGINE'], 'core.db.backends.mysql')
+        self.assertEqual(settings['CONN_MAX_AGE'], 0)
+        self.assertTrue(settings['CONN_HEALTH_CHECKS'])
+        self.assertEqual(settings['OPTIONS']['pool']['max_size'], 5)
+        self.assertEqual(settings['OPTIONS']['pool']['timeout'], 2)
+
+        settings = database_settings('mysql', environ={'DB_NAME': 'employees'})
+        self.assertEqual(settings['OPTIONS'], {})
+        self.assertEqual(settings['CONN_MAX_AGE'], 60)
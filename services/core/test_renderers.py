@@ -0,0 +1,87 @@
+import datetime
+import io
+import json
+import unittest
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from .parsers import FastJSONParser, MessagePackParser
+from .renderers import FastJSONRenderer, MessagePackRenderer, NDJSONRenderer, msgpack, orjson
+
+
+class FastJSONTestCase(SimpleTestCase):
+    data = {
+        'results': [{
+            'id': 1,
+            'name': 'Zoë \u2028 "quoted"',
+            'salary': Decimal('1234.50'),
+            'created': datetime.datetime(2024, 5, 1, 12, 30, 1, 123456, tzinfo=datetime.timezone.utc),
+            'local': datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+            'day': datetime.date(2024, 5, 1),
+            'time': datetime.time(8, 15),
+            'duration': datetime.timedelta(minutes=90),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'label': gettext_lazy('Active'),
+            'ratio': 0.1,
+            'big': 2 ** 70,
+            'empty': None,
+            'nested': {1: [True, False], 'tuple': (1, 2)},
+        }],
+        'next': None,
+    }
+
+    def test_001_renders_like_json_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_002_indent_uses_json_renderer(self):
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            FastJSONRenderer().render(self.data, media_type),
+            JSONRenderer().render(self.data, media_type),
+        )
+
+    def test_003_streaming_renderers_use_fast_json(self):
+        rows = [{'salary': Decimal('1.50')}, {'salary': Decimal('2.00')}]
+        self.assertEqual(NDJSONRenderer().render(rows), b'{"salary":1.5}\n{"salary":2.0}\n')
+
+    def test_004_parses_like_json_parser(self):
+        body = '{"name": "Zoë", "salary": "10.00", "items": [1, 2.5, null, true]}'.encode()
+        context = {'encoding': 'utf-8'}
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body), parser_context=context),
+            JSONParser().parse(io.BytesIO(body), parser_context=context),
+        )
+        for body in (b'{"a": NaN}', b'{"a": ', b''):
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body), parser_context=context)
+
+        latin = '{"name": "Zoë"}'.encode('latin-1')
+        data = FastJSONParser().parse(io.BytesIO(latin), parser_context={'encoding': 'latin-1'})
+        self.assertEqual(data, {'name': 'Zoë'})
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_005_message_pack_round_trip(self):
+        body = MessagePackRenderer().render(self.data)
+        data = MessagePackParser().parse(io.BytesIO(body))
+        self.assertEqual(data['results'][0]['salary'], 1234.5)
+        self.assertEqual(data['results'][0]['created'], '2024-05-01T12:30:01.123456Z')
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b'\xc1'))
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_006_float_spelling_differs_from_json_renderer(self):
+        floats = [1e16, 1e-07, 0.1]
+        self.assertEqual(FastJSONRenderer().render(floats), b'[1e16,1e-7,0.1]')
+        self.assertEqual(JSONRenderer().render(floats), b'[1e+16,1e-07,0.1]')
+        self.assertEqual(json.loads(FastJSONRenderer().render(floats)), floats)
+
+        self.assertEqual(FastJSONRenderer().render([float('nan'), float('inf')]), b'[null,null]')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render([float('nan')])
@@ -0,0 +1,79 @@
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.employee.models import Employee
+from core.db import routers
+from core.db.config import replica_settings
+from .middleware import ReplicaRoutingMiddleware
+
+
+REPLICA_ROUTING = {'REPLICAS': ['replica'], 'STICKY_SECONDS': 10, 'CACHE': 'default'}
+
+
+@override_settings(REPLICA_ROUTING=REPLICA_ROUTING)
+class ReplicaRoutingTestCase(SimpleTestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.factory = RequestFactory()
+        self.read_from = []
+
+    def view(self, request):
+        self.read_from.append(Employee.objects.all().db)
+        return HttpResponse(status=request.status)
+
+    async def aview(self, request):
+        return self.view(request)
+
+    def request(self, method, status=200, **headers):
+        request = self.factory.generic(method, '/api/employee/', headers=headers)
+        request.status = status
+        ReplicaRoutingMiddleware(self.view)(request)
+        return self.read_from[-1]
+
+    def test_001_router_reads_from_primary_outside_requests(self):
+        self.assertEqual(Employee.objects.all().db, 'default')
+        with routers.use_replicas():
+            self.assertEqual(Employee.objects.all().db, 'replica')
+            self.assertEqual(Employee.objects.db_manager().db, 'replica')
+            with routers.use_primary():
+                self.assertEqual(Employee.objects.all().db, 'default')
+        self.assertEqual(routers.ReplicaRouter().db_for_write(Employee), 'default')
+
+    def test_002_safe_requests_read_from_replicas(self):
+        self.assertEqual(self.request('GET'), 'replica')
+        self.assertEqual(self.request('HEAD'), 'replica')
+        self.assertEqual(self.request('POST', Authorization='Token a'), 'default')
+        self.assertEqual(self.request('GET', X_Read_Primary='1'), 'default')
+        self.assertEqual(Employee.objects.all().db, 'default')
+
+    def test_003_reads_stick_to_primary_after_a_write(self):
+        self.request('PATCH', Authorization='Token a')
+        self.assertEqual(self.request('GET', Authorization='Token a'), 'default')
+        self.assertEqual(self.request('GET', Authorization='Token b'), 'replica')
+
+        self.request('PATCH', status=400, Authorization='Token b')
+        self.assertEqual(self.request('GET', Authorization='Token b'), 'replica')
+
+    async def test_004_async_requests(self):
+        middleware = ReplicaRoutingMiddleware(self.aview)
+        request = self.factory.get('/api/employee/')
+        request.status = 200
+        await middleware(request)
+        self.assertEqual(self.read_from, ['replica'])
+
+    @override_settings(REPLICA_ROUTING={'REPLICAS': []})
+    def test_005_unused_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(self.view)
+
+    def test_006_replica_settings(self):
+        primary = {'ENGINE': 'core.db.backends.mysql', 'NAME': 'db', 'HOST': 'primary', 'PORT': '3306'}
+        replicas = replica_settings(primary, environ={'DB_REPLICA_HOSTS': 'r1, r2:3307'})
+        self.assertEqual(list(replicas), ['replica_1', 'replica_2'])
+        self.assertEqual((replicas['replica_1']['HOST'], replicas['replica_1']['PORT']), ('r1', '3306'))
+        self.assertEqual((replicas['replica_2']['HOST'], replicas['replica_2']['PORT']), ('r2', '3307'))
+        self.assertEqual(replicas['replica_2']['NAME'], 'db')
+        self.assertEqual(replica_settings(primary, environ={}), {})
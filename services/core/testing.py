@@ -0,0 +1,24 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountAssertionsMixin:
+
+    def assertQueryCountConstant(self, func, grow, msg=None):
+        """
+        Fails if ``func`` issues more queries after ``grow`` has added rows.
+        ``func`` is called once beforehand so caches are warm for both counts.
+        """
+        func()
+        with CaptureQueriesContext(connection) as before:
+            func()
+        grow()
+        with CaptureQueriesContext(connection) as after:
+            func()
+        if len(after) != len(before):
+            queries = '\n'.join(query['sql'] for query in after.captured_queries)
+            self.fail(self._formatMessage(
+                msg,
+                f'Query count grew with the number of rows: '
+                f'{len(before)} -> {len(after)}\n{queries}'
+            ))
@@ -1,5 +1,16 @@
 
-from .mixins import ActionSerializersViewSetMixin
+from .mixins import (
+    ActionSerializersViewSetMixin,
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+    AsyncViewSetMixin,
+    ConditionalGetMixin,
+    InstrumentedViewMixin,
+    QueryPlanViewSetMixin,
+    ResponseCacheMixin,
+    SparseFieldsetsMixin,
+    ValuesSerializerMixin,
+)
 from rest_framework.generics import GenericAPIView
 from rest_framework.viewsets import (
     ViewSetMixin
@@ -7,15 +18,22 @@ from rest_framework.viewsets import (
 from rest_framework import mixins
 
 
-class GenericViewSet(ViewSetMixin, GenericAPIView):
+class GenericViewSet(InstrumentedViewMixin, AsyncViewSetMixin, ViewSetMixin, GenericAPIView):
     pass
 
 
-class ModelViewSet(ActionSerializersViewSetMixin,
+class ModelViewSet(SparseFieldsetsMixin,
+                    ActionSerializersViewSetMixin,
+                    QueryPlanViewSetMixin,
+                    ResponseCacheMixin,
+                    ConditionalGetMixin,
+                    ValuesSerializerMixin,
                     mixins.CreateModelMixin,
                     mixins.RetrieveModelMixin,
                     mixins.UpdateModelMixin,
                     mixins.DestroyModelMixin,
                     mixins.ListModelMixin,
+                    AsyncRetrieveModelMixin,
+                    AsyncListModelMixin,
                     GenericViewSet):
-    pass
\ No newline at end of file
+    pass
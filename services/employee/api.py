@@ -1,18 +1,65 @@
-from services.core import viewsets, permissions
+import uuid
+
+from asgiref.sync import sync_to_async
+from services.core import mixins, viewsets, permissions
+from services.core.filters import FullTextSearchFilter
 from apps.employee.models import Employee, Position, Department, Status
-from .serializers import EmployeeSerializer, PositionSerializer, DepartmentSerializer, StatusSerializer
-from rest_framework.authentication import TokenAuthentication
+from .serializers import (
+    EmployeeSerializer,
+    PositionSerializer,
+    DepartmentSerializer,
+    DepartmentSummarySerializer,
+    StatusSerializer,
+)
+from services.auth.authentication import CachedTokenAuthentication
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from django.http import Http404
+from apps.employee.cache import lookup_cache
+from apps.employee.search import employee_search
+from .bulk import EmployeeBulkUpsert, upsert_employees
+from .imports import ImportFileError, get_format, get_import_storage, import_employees, run_import
+from .stats import EmployeeStatsMixin
+
+
+class CachedLookupRetrieveMixin:
+    """
+    Serves ``retrieve`` from the lookup cache. Writes still load the row
+    from the database so they never save a stale copy.
+    """
+
+    def get_object(self):
+        if self.action != 'retrieve':
+            return super().get_object()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = lookup_cache.get(self.queryset.model, self.kwargs[lookup_url_kwarg])
+        if obj is None:
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+    async def aget_object(self):
+        if self.action != 'retrieve':
+            return await super().aget_object()
+        # The lookup cache is sync; its hits don't query the database.
+        return await sync_to_async(self.get_object)()
+
+
+class EmployeeViewSet(EmployeeStatsMixin, mixins.BackgroundTaskMixin, mixins.StreamingExportMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['position', 'department', 'status']
-    search_fields = ['position__name', 'department__name', 'status__name']
+    search_index = employee_search
+    values_serializer_actions = ('list', 'retrieve')
+    response_cache_actions = ('list', 'retrieve', 'stats', 'stats_by', 'stats_timeline')
+    max_page_size = 1000
+    bulk_max_items = 5000
     ACTION_SERIALIZERS = {
         'list': EmployeeSerializer, 
         'retrieve': EmployeeSerializer,
@@ -22,10 +69,51 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         'destroy': EmployeeSerializer,
     }
 
-class PositionViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {"error": "Expected a list of employees."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > self.bulk_max_items:
+            return Response(
+                {"error": f"At most {self.bulk_max_items} employees can be sent at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        upsert = EmployeeBulkUpsert(self.get_serializer_class())
+        if not upsert.validate(rows):
+            return Response({"errors": upsert.errors}, status=status.HTTP_400_BAD_REQUEST)
+        if self.prefers_async(request):
+            return self.enqueue_response(request, upsert_employees, rows=rows)
+        return Response(upsert.save(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {"error": "Expected a CSV or XLSX file in the 'file' field."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            format = get_format(upload.name, request.data.get('format'))
+        except ImportFileError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        name = get_import_storage().save(f'{uuid.uuid4().hex}.{format}', upload)
+        if self.prefers_async(request):
+            return self.enqueue_response(request, import_employees, name=name, format=format)
+        try:
+            result = run_import(name, format)
+        except ImportFileError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
+
+class PositionViewSet(CachedLookupRetrieveMixin, viewsets.ModelViewSet):
     queryset = Position.objects.all()
     serializer_class = PositionSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     ACTION_SERIALIZERS = {
         'list': PositionSerializer, 
@@ -37,23 +125,25 @@ class PositionViewSet(viewsets.ModelViewSet):
     }
 
 class DepartmentViewSet(viewsets.ModelViewSet):
+    # Not served from the lookup cache: the summary fields join
+    # DepartmentSummary, which changes with every employee write.
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     ACTION_SERIALIZERS = {
-        'list': DepartmentSerializer, 
-        'retrieve': DepartmentSerializer,
+        'list': DepartmentSummarySerializer,
+        'retrieve': DepartmentSummarySerializer,
         'create': DepartmentSerializer,
         'update': DepartmentSerializer,
         'partial_update': DepartmentSerializer,
         'destroy': DepartmentSerializer,
     }
 
-class StatusViewSet(viewsets.ModelViewSet):
+class StatusViewSet(CachedLookupRetrieveMixin, viewsets.ModelViewSet):
     queryset = Status.objects.all()
     serializer_class = StatusSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     ACTION_SERIALIZERS = {
         'list': StatusSerializer, 
@@ -0,0 +1,316 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+from apps.employee import summary
+from apps.employee.cache import lookup_cache
+from core.cache import invalidate_instances, invalidate_models
+from apps.employee.models import Employee, Position, Department, Status
+from apps.task.queue import PermanentError, task
+from apps.employee.search import employee_search
+from core.search import get_search_backend
+from .serializers import EmployeeSerializer, PositionSerializer, DepartmentSerializer, StatusSerializer
+
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class RowValidator:
+    """
+    Field level validation for many rows with one serializer instance.
+
+    Validators that query the database (unique/unique together) are
+    dropped; bulk writes resolve conflicts on the natural key instead.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer = serializer_class()
+        self.fields = [
+            field for field in self.serializer.fields.values()
+            if not field.read_only
+        ]
+        for field in self.fields:
+            field.validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, (UniqueValidator, UniqueTogetherValidator))
+            ]
+
+    def validate(self, data):
+        validated, errors = {}, {}
+        for field in self.fields:
+            try:
+                value = field.run_validation(field.get_value(data))
+            except SkipField:
+                continue
+            except serializers.ValidationError as exc:
+                errors[field.field_name] = exc.detail
+                continue
+            validated[field.source] = value
+        return validated, errors
+
+
+class Lookup:
+    def __init__(self, field_name, model, serializer_class, natural_key):
+        self.field_name = field_name
+        self.model = model
+        self.natural_key = natural_key
+        self.validator = RowValidator(serializer_class)
+        self.by_id = {}
+        self.by_key = {}
+        self.missing = {}
+
+    def key_for(self, values):
+        return tuple(values.get(field) for field in self.natural_key)
+
+
+class LookupResolver:
+    """
+    Resolves the position/department/status references of many employee rows
+    with a handful of set based queries instead of per-row get_or_create.
+
+    References are given either as an id or as a dict of the related
+    object's fields, like EmployeeSerializer accepts. Dicts are matched on
+    the natural key and missing objects are created with bulk_create.
+    """
+    lookup_fields = (
+        ('position', Position, PositionSerializer, ('name', 'salary')),
+        ('department', Department, DepartmentSerializer, ('name',)),
+        ('status', Status, StatusSerializer, ('name',)),
+    )
+    batch_size = 500
+
+    def __init__(self):
+        self.lookups = {
+            field_name: Lookup(field_name, model, serializer_class, natural_key)
+            for field_name, model, serializer_class, natural_key in self.lookup_fields
+        }
+        self.references = []
+
+    def add(self, row):
+        """
+        Validates the references of ``row`` and remembers them for ``load``.
+        Returns a dict of errors keyed like EmployeeSerializer reports them.
+        """
+        references, errors = {}, {}
+        for field_name, lookup in self.lookups.items():
+            data = row.get(field_name)
+            if isinstance(data, dict):
+                values, field_errors = lookup.validator.validate(data)
+                missing = {
+                    name: "This field is required."
+                    for name, detail in field_errors.items()
+                    if any(getattr(error, 'code', None) == 'required' for error in detail)
+                }
+                if missing:
+                    errors[field_name] = missing
+                elif field_errors:
+                    errors[field_name] = field_errors
+                else:
+                    references[field_name] = ('key', lookup.key_for(values), values)
+            elif isinstance(data, bool):
+                errors[field_name] = 'Invalid ID'
+            elif isinstance(data, (int, str)):
+                try:
+                    references[field_name] = ('id', lookup.model._meta.pk.to_python(data), None)
+                except DjangoValidationError:
+                    errors[field_name] = 'Invalid ID'
+            else:
+                references[field_name] = None
+        self.references.append(references)
+        return errors
+
+    def load(self):
+        for field_name, lookup in self.lookups.items():
+            ids, keys = set(), {}
+            for references in self.references:
+                reference = references.get(field_name)
+                if reference is None:
+                    continue
+                kind, value, values = reference
+                if kind == 'id':
+                    ids.add(value)
+                else:
+                    keys.setdefault(value, values)
+            self._load_ids(lookup, ids)
+            self._load_keys(lookup, keys)
+
+    def _load_ids(self, lookup, ids):
+        ids = list(ids - lookup.by_id.keys())
+        for batch in batched(ids, self.batch_size):
+            lookup.by_id.update(lookup_cache.get_many(lookup.model, batch))
+
+    def _load_keys(self, lookup, keys):
+        wanted = [key for key in keys if key not in lookup.by_key]
+        names = list({key[0] for key in wanted})
+        first = lookup.natural_key[0]
+        for batch in batched(names, self.batch_size):
+            for obj in lookup.model.objects.filter(**{f'{first}__in': batch}):
+                lookup.by_key[self.key_for_instance(lookup, obj)] = obj
+        for key in wanted:
+            if key not in lookup.by_key:
+                lookup.missing[key] = keys[key]
+
+    def key_for_instance(self, lookup, obj):
+        return tuple(getattr(obj, field) for field in lookup.natural_key)
+
+    def resolve(self, index):
+        """
+        Returns ``(values, errors)`` for the references of the ``index``th row.
+        Dict references that don't exist yet resolve to their natural key
+        until ``create_missing`` has run.
+        """
+        values, errors = {}, {}
+        for field_name, lookup in self.lookups.items():
+            reference = self.references[index].get(field_name)
+            if reference is None:
+                values[field_name] = None
+                continue
+            kind, value, _ = reference
+            if kind == 'id':
+                obj = lookup.by_id.get(value)
+                if obj is None:
+                    errors[field_name] = 'Invalid ID'
+                values[field_name] = obj
+            else:
+                values[field_name] = lookup.by_key.get(value, value)
+        return values, errors
+
+    def create_missing(self):
+        created = []
+        for lookup in self.lookups.values():
+            if not lookup.missing:
+                continue
+            created.append(lookup.model)
+            objs = [lookup.model(**values) for values in lookup.missing.values()]
+            lookup.model.objects.bulk_create(objs, batch_size=self.batch_size, ignore_conflicts=True)
+            keys = dict(lookup.missing)
+            lookup.missing.clear()
+            self._load_keys(lookup, keys)
+        return created
+
+    def get(self, field_name, value):
+        if value is None or isinstance(value, self.lookups[field_name].model):
+            return value
+        return self.lookups[field_name].by_key[value]
+
+
+UPDATE_FIELDS = ['address', 'is_manager', 'status', 'position', 'department', 'last_updated']
+
+
+def write_employees(employees, batch_size=500, update_fields=UPDATE_FIELDS, changed_models=()):
+    """
+    Creates or updates the unsaved ``employees``, matched on their unique
+    name, with bulk_create(update_conflicts=True), and refreshes what the
+    signals would have: department summaries, the search index, the cached
+    responses of the written employees and of ``changed_models`` too. Returns
+    ``(created, updated)``. Call it inside a transaction.
+    """
+    names = [employee.name for employee in employees]
+    existing, departments = set(), set()
+    for batch in batched(names, batch_size):
+        for name, department_id in Employee.objects.filter(name__in=batch).values_list('name', 'department'):
+            existing.add(name)
+            departments.add(department_id)
+    departments.update(employee.department_id for employee in employees)
+    Employee.objects.bulk_create(
+        employees,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['name'],
+        update_fields=update_fields,
+    )
+    pks = []
+    for batch in batched(names, batch_size):
+        pks.extend(Employee.objects.filter(name__in=batch).values_list('pk', flat=True))
+    # bulk_create sends no signals.
+    invalidate_models(Employee, *changed_models)
+    invalidate_instances(Employee, pks)
+    departments.discard(None)
+    summary.refresh(departments)
+    get_search_backend(Employee.objects.db).update(employee_search, pks)
+    return len(names) - len(existing), len(existing)
+
+
+class EmployeeBulkUpsert:
+    """
+    Creates or updates many employees at once, matching existing rows on
+    the unique ``name``. Every row is validated before anything is written;
+    rows are then written with bulk_create(update_conflicts=True) inside a
+    single transaction. Rows replace the stored employee, fields left out
+    take their defaults.
+    """
+    batch_size = 500
+    update_fields = UPDATE_FIELDS
+
+    def __init__(self, serializer_class=EmployeeSerializer):
+        self.validator = RowValidator(serializer_class)
+        self.resolver = LookupResolver()
+        self.rows = []
+        self.errors = []
+
+    def validate(self, rows):
+        errors_by_index = {}
+        names = set()
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors_by_index[index] = {'non_field_errors': ['Expected an object.']}
+                self.resolver.references.append({})
+                self.rows.append(None)
+                continue
+            values, errors = self.validator.validate(row)
+            errors.update(self.resolver.add(row))
+            name = values.get('name')
+            if name is not None:
+                if name in names:
+                    errors.setdefault('name', ['Duplicate name in request.'])
+                names.add(name)
+            if errors:
+                errors_by_index[index] = errors
+            self.rows.append(values)
+
+        self.resolver.load()
+        for index, values in enumerate(self.rows):
+            if values is None:
+                continue
+            references, errors = self.resolver.resolve(index)
+            if errors:
+                errors_by_index.setdefault(index, {}).update(errors)
+            values.update(references)
+        self.errors = [
+            {'index': index, 'errors': errors_by_index[index]}
+            for index in sorted(errors_by_index)
+        ]
+        return not self.errors
+
+    def save(self):
+        assert not self.errors, 'Cannot save rows with errors.'
+        with transaction.atomic():
+            created_models = self.resolver.create_missing()
+            employees = [
+                Employee(**{
+                    field: self.resolver.get(field, value) if field in self.resolver.lookups else value
+                    for field, value in values.items()
+                })
+                for values in self.rows
+            ]
+            created, updated = write_employees(employees, self.batch_size, self.update_fields, created_models)
+        return {
+            'created': created,
+            'updated': updated,
+        }
+
+
+@task(max_attempts=3)
+def upsert_employees(rows):
+    """
+    EmployeeBulkUpsert as a background task. Rows are validated again, as
+    the lookups may have changed since the request.
+    """
+    upsert = EmployeeBulkUpsert()
+    if not upsert.validate(rows):
+        raise PermanentError({'errors': upsert.errors})
+    return upsert.save()
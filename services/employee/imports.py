@@ -0,0 +1,382 @@
+import csv
+import io
+import json
+import os
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+from apps.employee.models import Employee, Position, Department, Status
+from apps.task.queue import PermanentError, heartbeat, task
+from .bulk import RowValidator, write_employees
+from .serializers import EmployeeSerializer
+
+
+FORMATS = ('csv', 'xlsx')
+COLUMNS = ('name', 'address', 'is_manager', 'position', 'position_salary', 'department', 'status')
+REPORT_COLUMNS = ('row', 'name', 'errors')
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def get_format(filename, format=None):
+    format = (format or os.path.splitext(filename)[1].lstrip('.')).lower()
+    if format not in FORMATS:
+        raise ImportFileError(f'Unsupported file type {format!r}; expected one of {", ".join(FORMATS)}.')
+    return format
+
+
+def normalize_header(header):
+    return [str(name or '').strip().lower().replace(' ', '_') for name in header]
+
+
+def read_csv(file):
+    """
+    Yields the rows of the binary CSV ``file`` as lists, header first,
+    without reading the whole file.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise ImportFileError(f'Could not read the CSV file: {exc}')
+
+
+def read_xlsx(file):
+    """
+    Yields the rows of the first sheet of the XLSX ``file``. Needs
+    openpyxl, whose read-only mode streams the sheet.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('Reading XLSX files needs openpyxl; export the sheet as CSV instead.')
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ImportFileError(f'Could not read the XLSX file: {exc}')
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield ['' if value is None else value for value in row]
+    finally:
+        workbook.close()
+
+
+READERS = {
+    'csv': read_csv,
+    'xlsx': read_xlsx,
+}
+
+
+def read_rows(file, format):
+    """
+    Returns ``(columns, rows)``: the known columns of the header (row 1)
+    and an iterator of ``(row_number, {column: text})`` for the data rows.
+    Blank cells and unknown columns are left out, blank rows are skipped.
+    """
+    rows = READERS[format](file)
+    header = normalize_header(next(rows, []))
+    if 'name' not in header:
+        raise ImportFileError(f'The first row must name the columns, including "name"; known columns: {", ".join(COLUMNS)}.')
+    columns = [(index, name) for index, name in enumerate(header) if name in COLUMNS]
+    return [name for _, name in columns], parse_rows(rows, columns)
+
+
+def parse_rows(rows, columns):
+    for number, cells in enumerate(rows, start=2):
+        row = {}
+        for index, name in columns:
+            value = cells[index] if index < len(cells) else ''
+            value = value.strip() if isinstance(value, str) else str(value)
+            if value:
+                row[name] = value
+        if row:
+            yield number, row
+
+
+class NameMap:
+    """
+    The ids of a lookup model by name, loaded with one query so rows
+    resolve their references without touching the database.
+    """
+
+    def __init__(self, model):
+        self.label = model._meta.verbose_name
+        self.ids = dict(model.objects.values_list('name', 'pk'))
+
+    def resolve(self, name, row):
+        try:
+            return self.ids[name]
+        except KeyError:
+            raise ImportFileError(f'Unknown {self.label} "{name}".')
+
+
+class PositionNameMap(NameMap):
+    """
+    Positions are unique by name and salary; a name alone resolves when
+    only one position has it, ``position_salary`` picks among the others.
+    """
+
+    def __init__(self, model=Position):
+        self.label = model._meta.verbose_name
+        self.ids = {}
+        for name, salary, pk in model.objects.values_list('name', 'salary', 'pk'):
+            self.ids.setdefault(name, {})[salary] = pk
+
+    def resolve(self, name, row):
+        salaries = self.ids.get(name)
+        if not salaries:
+            raise ImportFileError(f'Unknown position "{name}".')
+        salary = row.get('position_salary')
+        if salary is None:
+            if len(salaries) > 1:
+                raise ImportFileError(f'More than one position is named "{name}"; add a position_salary column.')
+            return next(iter(salaries.values()))
+        try:
+            return salaries[Decimal(salary)]
+        except (InvalidOperation, KeyError):
+            raise ImportFileError(f'No position "{name}" has the salary {salary}.')
+
+
+class ImportProgress:
+    """
+    What an import has done so far, kept in a JSON file next to the source
+    and written after every committed chunk, so an interrupted import can
+    carry on where it stopped.
+    """
+
+    def __init__(self, path, source_size):
+        self.path = path
+        self.state = {'source_size': source_size, 'rows': 0, 'created': 0, 'updated': 0, 'failed': 0, 'complete': False}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as file:
+            state = json.load(file)
+        if state.get('source_size') != self.state['source_size']:
+            raise ImportFileError(f'{self.path} belongs to another version of the file; import it from the start.')
+        self.state.update(state)
+        return True
+
+    def save(self):
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.state, file)
+        os.replace(temporary, self.path)
+
+
+class EmployeeImport:
+    """
+    Imports employees from a CSV or XLSX file, one ``chunk_size`` row chunk
+    at a time: the rows are parsed as a stream, validated like the API
+    validates them, their position/department/status names are resolved
+    from NameMaps and the valid ones are created or updated (matched on
+    name) in one transaction per chunk.
+
+    Existing employees only get the columns the file has; a blank cell in
+    one of them clears the field. New employees take the defaults of the
+    missing columns and need every required one.
+
+    Rows that fail are written to the error report CSV and skipped. With
+    ``resume``, rows a previous run of the same file committed are skipped
+    and the report is appended to.
+    """
+    chunk_size = 1000
+    lookups = (
+        ('position', PositionNameMap, Position),
+        ('department', NameMap, Department),
+        ('status', NameMap, Status),
+    )
+
+    def __init__(self, path, format=None, progress_path=None, report_path=None, chunk_size=None,
+                 serializer_class=EmployeeSerializer):
+        self.path = path
+        self.format = get_format(path, format)
+        self.progress = ImportProgress(progress_path or f'{path}.progress.json', os.path.getsize(path))
+        self.report_path = report_path or f'{path}.errors.csv'
+        self.chunk_size = chunk_size or self.chunk_size
+        self.validator = RowValidator(serializer_class)
+        self.validated_fields = {field.field_name for field in self.validator.fields}
+        self.maps = {}
+        self.columns = []
+        self.update_fields = []
+
+    def run(self, resume=False, progress=None):
+        """
+        Imports the file and returns the counts; ``progress(state)`` is
+        called after every chunk.
+        """
+        resumed = resume and self.progress.load()
+        state = self.progress.state
+        if state['complete']:
+            return self.result()
+        self.maps = {field: map_class(model) for field, map_class, model in self.lookups}
+        with open(self.path, 'rb') as file, open(self.report_path, 'a' if resumed else 'w', newline='') as report:
+            writer = csv.writer(report)
+            if not resumed:
+                writer.writerow(REPORT_COLUMNS)
+            self.columns, rows = read_rows(file, self.format)
+            self.update_fields = self.get_update_fields(self.columns)
+            chunk = []
+            for index, (number, row) in enumerate(rows):
+                if index < state['rows']:
+                    continue
+                chunk.append((number, row))
+                if len(chunk) == self.chunk_size:
+                    self.import_chunk(chunk, writer, report, progress)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk, writer, report, progress)
+        state['complete'] = True
+        self.progress.save()
+        return self.result()
+
+    def get_update_fields(self, columns):
+        fields = [field for field in ('address', 'is_manager', 'position', 'department', 'status') if field in columns]
+        return fields + ['last_updated']
+
+    def get_existing(self, chunk):
+        """
+        Returns the names of the chunk's employees that already exist, when
+        the file lacks a column only new employees need.
+        """
+        missing = [field for field in self.validator.fields if field.required and field.field_name not in self.columns]
+        if not missing:
+            return set()
+        names = [row['name'] for _, row in chunk if 'name' in row]
+        return set(Employee.objects.filter(name__in=names).values_list('name', flat=True))
+
+    def import_chunk(self, chunk, writer, report, progress):
+        state = self.progress.state
+        employees = {}
+        existing = self.get_existing(chunk)
+        for number, row in chunk:
+            employee, errors = self.build(row, row.get('name') in existing)
+            if errors:
+                writer.writerow([number, row.get('name', ''), format_errors(errors)])
+                state['failed'] += 1
+            else:
+                # A name repeated in the file updates the earlier row.
+                employees[employee.name] = employee
+        if employees:
+            with transaction.atomic():
+                created, updated = write_employees(list(employees.values()), update_fields=self.update_fields)
+            state['created'] += created
+            state['updated'] += updated
+        state['rows'] += len(chunk)
+        # The report reaches the disk before the progress that skips its rows.
+        report.flush()
+        self.progress.save()
+        if progress is not None:
+            progress(dict(state))
+
+    def build(self, row, exists=False):
+        """
+        Returns ``(employee, errors)`` for a parsed row.
+        """
+        values, errors = self.validator.validate(row)
+        if exists:
+            # Columns the file doesn't have are kept, so needn't be given.
+            errors = {
+                field: detail for field, detail in errors.items()
+                if field in self.columns or field not in self.validated_fields
+            }
+        for field, name_map in self.maps.items():
+            if field not in self.columns:
+                continue
+            name = row.get(field)
+            if name is None:
+                values[f'{field}_id'] = None
+                continue
+            try:
+                values[f'{field}_id'] = name_map.resolve(name, row)
+            except ImportFileError as exc:
+                errors[field] = [str(exc)]
+        if errors:
+            return None, errors
+        return Employee(**values), {}
+
+    def result(self):
+        state = self.progress.state
+        return {
+            'rows': state['rows'],
+            'created': state['created'],
+            'updated': state['updated'],
+            'failed': state['failed'],
+        }
+
+
+def format_errors(errors):
+    parts = []
+    for field, detail in errors.items():
+        messages = detail if isinstance(detail, list) else [detail]
+        parts.append(f'{field}: {" ".join(str(message) for message in messages)}')
+    return '; '.join(parts)
+
+
+def get_import_storage():
+    """
+    Storage of uploaded import files, outside MEDIA_ROOT so they're never
+    served.
+    """
+    return FileSystemStorage(location=settings.IMPORT_ROOT)
+
+
+def run_import(name, format):
+    """
+    Imports the file ``name`` of the import storage, resuming a previous
+    attempt, and removes it with its progress and report afterwards.
+    Returns the counts and the first rows of the error report.
+    """
+    importer = EmployeeImport(get_import_storage().path(name), format)
+    try:
+        # Run as a task, every chunk renews the lease so no other worker
+        # takes a long import for dead.
+        result = importer.run(resume=True, progress=lambda state: heartbeat())
+        result['errors'] = read_report(importer.report_path)
+    except ImportFileError:
+        cleanup(name, format)
+        raise
+    cleanup(name, format)
+    return result
+
+
+def cleanup(name, format):
+    """
+    Removes an uploaded import file and what importing it left behind.
+    """
+    path = get_import_storage().path(name)
+    for leftover in (path, f'{path}.progress.json', f'{path}.progress.json.tmp', f'{path}.errors.csv'):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+
+@task(max_attempts=3, on_failure=cleanup, atomic=False)
+def import_employees(name, format):
+    """
+    run_import() as a background task. Each chunk commits on its own, so a
+    retry resumes after the chunks the failed attempt committed; a file
+    that can't be read isn't retried.
+    The upload is removed once the task succeeded or failed for good.
+    """
+    try:
+        return run_import(name, format)
+    except ImportFileError as exc:
+        raise PermanentError({'error': str(exc)})
+
+
+def read_report(path, limit=100):
+    """
+    Returns up to ``limit`` rows of an error report as dicts.
+    """
+    with open(path, newline='') as file:
+        reader = csv.DictReader(file)
+        return [
+            {'row': int(row['row']), 'name': row['name'], 'errors': row['errors']}
+            for row, _ in zip(reader, range(limit))
+        ]
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from apps.employee.models import Employee, Position, Department, Status
+from apps.employee.cache import lookup_cache
+from core.images import variant_urls
 
 class StatusSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,16 +17,50 @@ class DepartmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Department
         fields = '__all__'
+
+
+class DepartmentSummarySerializer(DepartmentSerializer):
+    headcount = serializers.IntegerField(source='summary.headcount', read_only=True)
+    managers = serializers.IntegerField(source='summary.managers', read_only=True)
+    salary_total = serializers.DecimalField(
+        source='summary.salary_total', max_digits=14, decimal_places=2, read_only=True
+    )
+
+    class Meta(DepartmentSerializer.Meta):
+        pass
     
 
+class ImageVariantsField(serializers.Field):
+    """
+    Renders ``Employee.image_variants`` as URLs per size and format, or None
+    until the variants are built. URLs are derived from MEDIA_URL, the
+    storage isn't asked.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        sizes = value.get('sizes') if value else None
+        return variant_urls(sizes) if sizes else None
+
+
 class EmployeeSerializer(serializers.ModelSerializer):
     position = serializers.SerializerMethodField()
     department = serializers.SerializerMethodField()
     status = serializers.SerializerMethodField()
+    image = serializers.ImageField(write_only=True, required=False, allow_null=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Employee
-        fields = ['id', 'name', 'address', 'is_manager', 'position', 'department', 'status']
+        fields = ['id', 'name', 'address', 'is_manager', 'position', 'department', 'status', 'image', 'image_variants']
+        nested_serializers = {
+            'position': PositionSerializer,
+            'department': DepartmentSerializer,
+            'status': StatusSerializer,
+        }
 
     def to_internal_value(self, data):
         internal_value = super().to_internal_value(data)
@@ -47,13 +83,13 @@ class EmployeeSerializer(serializers.ModelSerializer):
             if missing_fields:
                 raise serializers.ValidationError({model_key:missing_fields})
             
-            obj = model.objects.filter(**data).first()
+            obj = lookup_cache.find(model, data)
             if obj:
                 return obj
             return model.objects.get_or_create(**serializer.validated_data)[0]
 
         elif isinstance(data, int) or isinstance(data, str):
-            obj = model.objects.filter(id=data).first()
+            obj = lookup_cache.get(model, data)
             if obj:
                 return obj
             else:
@@ -61,17 +97,16 @@ class EmployeeSerializer(serializers.ModelSerializer):
         else:
             return None
 
-    def get_position(self, obj):
-        if obj.position:
-            return PositionSerializer(obj.position).data
+    def _nested(self, field_name, obj):
+        if obj:
+            return lookup_cache.representation(self.Meta.nested_serializers[field_name], obj)
         return None
 
+    def get_position(self, obj):
+        return self._nested('position', obj.position)
+
     def get_department(self, obj):
-        if obj.department:
-            return DepartmentSerializer(obj.department).data
-        return None
+        return self._nested('department', obj.department)
 
     def get_status(self, obj):
-        if obj.status:
-            return StatusSerializer(obj.status).data
-        return None
+        return self._nested('status', obj.status)
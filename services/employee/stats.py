@@ -0,0 +1,119 @@
+from datetime import datetime, time
+
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+GROUPS = ('department', 'position', 'status')
+BUCKETS = ('day', 'week', 'month', 'quarter', 'year')
+
+salary_field = serializers.DecimalField(max_digits=None, decimal_places=2)
+
+
+class EmployeeStats:
+    """
+    Headcount and salary figures for an employee queryset, computed with
+    aggregate queries. Salaries are those of the employees' positions;
+    employees without one count towards headcount only.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset.order_by()
+
+    def aggregates(self):
+        return {
+            'headcount': Count('pk'),
+            'managers': Count('pk', filter=Q(is_manager=True)),
+            'salary_total': Sum('position__salary'),
+            'salary_average': Avg('position__salary'),
+        }
+
+    def format(self, row):
+        for name in ('salary_total', 'salary_average', 'salary_min', 'salary_max'):
+            if row.get(name) is not None:
+                row[name] = salary_field.to_representation(row[name])
+        return row
+
+    def summary(self):
+        return self.format(self.queryset.aggregate(
+            **self.aggregates(),
+            salary_min=Min('position__salary'),
+            salary_max=Max('position__salary'),
+        ))
+
+    def by(self, group):
+        rows = self.queryset.values(group, f'{group}__name').annotate(**self.aggregates())
+        return [
+            self.format({
+                'id': row.pop(group),
+                'name': row.pop(f'{group}__name'),
+                **row,
+            })
+            for row in rows.order_by('-headcount', group)
+        ]
+
+    def timeline(self, bucket):
+        rows = self.queryset.annotate(period=Trunc('created', bucket)).values('period')
+        return [self.format(row) for row in rows.annotate(**self.aggregates()).order_by('period')]
+
+
+class EmployeeStatsMixin:
+    """
+    ``stats/`` (totals), ``stats/<department|position|status>/`` (per
+    group) and ``stats/timeline/?bucket=month`` (hires per period of
+    ``created``) actions. The view's filters apply, as do
+    ``created_after``/``created_before``. Answers come from the response
+    cache when the actions are in ``response_cache_actions``, so employee
+    and lookup writes evict them.
+    """
+    stats_class = EmployeeStats
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        return self.cached_response(request, self.stats_response, lambda stats: stats.summary())
+
+    @action(detail=False, methods=['get'], url_path=f'stats/(?P<group>{"|".join(GROUPS)})')
+    def stats_by(self, request, group):
+        return self.cached_response(request, self.stats_response, lambda stats: {'results': stats.by(group)})
+
+    @action(detail=False, methods=['get'], url_path='stats/timeline')
+    def stats_timeline(self, request):
+        bucket = request.query_params.get('bucket', 'month')
+        if bucket not in BUCKETS:
+            raise ValidationError({'bucket': [f"Expected one of {', '.join(BUCKETS)}."]})
+        return self.cached_response(
+            request, self.stats_response, lambda stats: {'bucket': bucket, 'results': stats.timeline(bucket)}
+        )
+
+    def stats_response(self, request, compute):
+        queryset = self.filter_created(request, self.filter_queryset(self.get_queryset()))
+        return Response(compute(self.stats_class(queryset)))
+
+    def filter_created(self, request, queryset):
+        for param, lookup in (('created_after', 'gte'), ('created_before', 'lt')):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            queryset = queryset.filter(**{f'created__{lookup}': self.parse_created(param, value)})
+        return queryset
+
+    def parse_created(self, param, value):
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                parsed = parse_date(value)
+                if parsed is not None:
+                    parsed = datetime.combine(parsed, time.min)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({param: ['Expected an ISO 8601 date or date and time.']})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
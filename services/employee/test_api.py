@@ -1,7 +1,19 @@
+import io
 import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework.authtoken.models import Token
+from PIL import Image
 
 from apps.employee.models import (
     Employee,
@@ -17,13 +29,19 @@ from apps.employee.factories import (
 )
 from apps.user.factories import UserFactory
 from apps.user.factories import TokenFactory 
+from apps.employee.cache import lookup_cache
+from core.cache import response_cache
+from services.core.testing import QueryCountAssertionsMixin
+from services.employee.api import EmployeeViewSet
 
 
 
-class EmployeeAPITestCase(APITestCase):
+class EmployeeAPITestCase(QueryCountAssertionsMixin, APITestCase):
 
     def setUp(self):
         super().setUp()
+        lookup_cache.clear()
+        response_cache.clear()
         self.user = UserFactory()
         self.token = TokenFactory(user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
@@ -36,7 +54,7 @@ class EmployeeAPITestCase(APITestCase):
     def test_001_get_employee_list(self):
         response = self.client.get('/api/employee/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_002_get_employee_detail(self):
         response = self.client.get(f'/api/employee/{self.employee.id}/')
@@ -180,11 +198,526 @@ class EmployeeAPITestCase(APITestCase):
         response = self.client.post('/api/employee/', data, 'json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data, {"position": {"name": "This field is required."}})
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_013_list_query_count_does_not_grow_with_rows(self):
+        self.assertQueryCountConstant(
+            lambda: self.client.get('/api/employee/'),
+            lambda: EmployeeFactory.create_batch(5),
+        )
+
+    def test_014_list_defers_unserialized_columns(self):
+        EmployeeFactory.create_batch(3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/employee/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        employee_query = queries.captured_queries[-1]['sql']
+        self.assertIn('JOIN "employee_position"', employee_query)
+        self.assertNotIn('"employee_employee"."image"', employee_query)
+        self.assertEqual(response.data['results'][0]['position']['name'], "Developer")
+
+    def test_015_paginate_list_with_cursors(self):
+        EmployeeFactory.create_batch(4)
+        names = list(Employee.objects.order_by('created', 'id').values_list('name', flat=True))
+        response = self.client.get('/api/employee/', {'page_size': 2})
+        self.assertEqual([row['name'] for row in response.data['results']], names[:2])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['name'] for row in response.data['results']], names[2:4])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['name'] for row in response.data['results']], names[4:])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([row['name'] for row in response.data['results']], names[2:4])
+
+    def test_016_paginate_list_by_name_descending(self):
+        EmployeeFactory.create_batch(2)
+        names = sorted(Employee.objects.values_list('name', flat=True), reverse=True)
+        response = self.client.get('/api/employee/', {'ordering': '-name', 'page_size': 2})
+        self.assertEqual([row['name'] for row in response.data['results']], names[:2])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(response.data['next'])
+        self.assertEqual([row['name'] for row in response.data['results']], names[2:])
+        self.assertNotIn('OFFSET', queries.captured_queries[-1]['sql'])
+
+    def test_017_page_size_is_capped_by_viewset(self):
+        EmployeeFactory.create_batch(3)
+        with mock.patch.object(EmployeeViewSet, 'max_page_size', 2):
+            response = self.client.get('/api/employee/', {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_018_invalid_cursor_and_ordering(self):
+        response = self.client.get('/api/employee/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/api/employee/', {'ordering': 'address'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_019_export_streams_ndjson(self):
+        EmployeeFactory.create_batch(3)
+        response = self.client.get('/api/employee/export/', {'format': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]['name'], "John Doe")
+        self.assertEqual(rows[0]['department']['name'], "IT")
+
+    def test_020_export_streams_json_array_with_filters(self):
+        EmployeeFactory.create_batch(2)
+        response = self.client.get('/api/employee/export/', {
+            'format': 'json',
+            'department': self.department.id,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['name'] for row in rows], ["John Doe"])
+
+    def test_021_export_query_count_does_not_grow_with_rows(self):
+        self.assertQueryCountConstant(
+            lambda: b''.join(self.client.get('/api/employee/export/').streaming_content),
+            lambda: EmployeeFactory.create_batch(5),
+        )
+
+    def get_bulk_rows(self, count, start=0):
+        return [
+            {
+                "name": f"Bulk Employee {index}",
+                "address": "Bulk Address",
+                "is_manager": index % 2 == 0,
+                "position": {"name": f"Position {index % 3}", "salary": 1000},
+                "department": self.department.id,
+                "status": {"name": "Active"},
+            }
+            for index in range(start, start + count)
+        ]
+
+    def test_022_bulk_create_employees(self):
+        response = self.client.post('/api/employee/bulk/', self.get_bulk_rows(6), 'json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"created": 6, "updated": 0})
+        self.assertEqual(Employee.objects.count(), 7)
+        self.assertEqual(Position.objects.filter(name__startswith="Position").count(), 3)
+        self.assertEqual(Status.objects.count(), 1)
+        employee = Employee.objects.get(name="Bulk Employee 4")
+        self.assertEqual(employee.position.name, "Position 1")
+        self.assertEqual(employee.department, self.department)
+        self.assertEqual(employee.status, self.status)
+
+    def test_023_bulk_upsert_updates_existing_names(self):
+        rows = self.get_bulk_rows(2)
+        rows.append({
+            "name": "John Doe",
+            "address": "Moved",
+            "position": self.position.id,
+            "department": {"name": "HR"},
+            "status": self.status.id,
+        })
+        response = self.client.post('/api/employee/bulk/', rows, 'json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"created": 2, "updated": 1})
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.address, "Moved")
+        self.assertEqual(self.employee.department.name, "HR")
+
+    def test_024_bulk_reports_row_errors_and_writes_nothing(self):
+        rows = self.get_bulk_rows(3)
+        rows[0]["position"] = 99999
+        rows[1]["position"] = {"name": "Manager"}
+        del rows[2]["address"]
+        rows.append(dict(rows[2], address="Duplicate"))
+        response = self.client.post('/api/employee/bulk/', rows, 'json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {error['index']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(errors[0], {"position": "Invalid ID"})
+        self.assertEqual(errors[1], {"position": {"salary": "This field is required."}})
+        self.assertIn('address', errors[2])
+        self.assertIn('name', errors[3])
+        self.assertEqual(Employee.objects.count(), 1)
+        self.assertFalse(Position.objects.filter(name__startswith="Position").exists())
+
+    def test_025_bulk_rejects_non_list_payload(self):
+        response = self.client.post('/api/employee/bulk/', {"name": "Jane"}, 'json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_026_bulk_query_count_does_not_grow_with_rows(self):
+        batches = iter(range(1, 100))
+
+        def post_batch(size):
+            start = next(batches) * 100
+            response = self.client.post('/api/employee/bulk/', self.get_bulk_rows(size, start), 'json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        post_batch(3)
+        with CaptureQueriesContext(connection) as few:
+            post_batch(2)
+        with CaptureQueriesContext(connection) as many:
+            post_batch(50)
+        self.assertEqual(len(few), len(many))
+
+    def test_027_list_answers_if_none_match_with_304(self):
+        response = self.client.get('/api/employee/')
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        response = self.client.get('/api/employee/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        self.employee.update(save=True, address="Changed")
+        response = self.client.get('/api/employee/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_028_list_etag_changes_with_rows_and_query(self):
+        etag = self.client.get('/api/employee/')['ETag']
+        self.assertNotEqual(self.client.get('/api/employee/', {'ordering': 'name'})['ETag'], etag)
+        Employee.objects.filter(id=self.employee.id).update(position=None)
+        self.assertNotEqual(self.client.get('/api/employee/')['ETag'], etag)
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_029_detail_answers_conditional_requests(self):
+        response = self.client.get(f'/api/employee/{self.employee.id}/')
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/employee/{self.employee.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(f'/api/employee/{self.employee.id}/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.position.update(save=True, name="Architect")
+        response = self.client.get(f'/api/employee/{self.employee.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['position']['name'], "Architect")
+
+    def test_030_list_and_detail_are_served_from_response_cache(self):
+        response = self.client.get('/api/employee/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/employee/')
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(self.client.get('/api/employee/', {'ordering': 'name'})['X-Cache'], 'MISS')
+
+        url = f'/api/employee/{self.employee.id}/'
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_031_writes_evict_only_dependent_responses(self):
+        other = EmployeeFactory(position=self.position, department=self.department, status=self.status)
+        url, other_url = f'/api/employee/{self.employee.id}/', f'/api/employee/{other.id}/'
+        for path in ('/api/employee/', url, other_url):
+            self.client.get(path)
+
+        self.client.patch(url, {"address": "Changed"}, 'json')
+        self.assertEqual(self.client.get('/api/employee/')['X-Cache'], 'MISS')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['address'], "Changed")
+        self.assertEqual(self.client.get(other_url)['X-Cache'], 'HIT')
+
+        self.position.update(save=True, name="Architect")
+        response = self.client.get(other_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['position']['name'], "Architect")
+
+    def test_032_bulk_upsert_evicts_cached_lists(self):
+        self.client.get('/api/employee/')
+        response = self.client.post('/api/employee/bulk/', self.get_bulk_rows(2), 'json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get('/api/employee/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_033_response_cache_reports_hit_ratio(self):
+        response_cache.hits = response_cache.misses = 0
+        self.client.get('/api/employee/')
+        self.client.get('/api/employee/')
+        self.client.get('/api/employee/')
+        stats = response_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertAlmostEqual(stats['hit_ratio'], 2 / 3)
+
+    def test_034_search_matches_own_and_related_fields(self):
+        EmployeeFactory(name="Mary Major", address="1 Elm Street", position=PositionFactory(name="Designer"))
+        for query, names in [
+            ('john', ["John Doe"]),
+            ('elm', ["Mary Major"]),
+            ('developer', ["John Doe"]),
+            ('designer elm', ["Mary Major"]),
+            ('dev', []),
+            ('dev*', ["John Doe"]),
+        ]:
+            response = self.client.get('/api/employee/', {'search': query})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([row['name'] for row in response.data['results']], names, query)
+
+    def test_035_search_ranks_and_paginates_by_relevance(self):
+        EmployeeFactory(name="Ann Oak", address="Developer Road 1", position=None)
+        EmployeeFactory(name="Developer Smith", address="Main Street 2", position=None)
+        response = self.client.get('/api/employee/', {'search': 'developer', 'page_size': 2})
+        self.assertEqual([row['name'] for row in response.data['results']], ["Developer Smith", "John Doe"])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['name'] for row in response.data['results']], ["Ann Oak"])
+        self.assertIsNone(response.data['next'])
+        response = self.client.get('/api/employee/', {'ordering': 'rank'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_036_search_index_follows_writes(self):
+        self.position.update(save=True, name="Architect")
+        response = self.client.get('/api/employee/', {'search': 'architect'})
+        self.assertEqual(len(response.data['results']), 1)
+        self.status.delete()
+        self.assertEqual(len(self.client.get('/api/employee/', {'search': 'active'}).data['results']), 0)
+
+        response = self.client.post('/api/employee/bulk/', self.get_bulk_rows(2), 'json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        name = self.get_bulk_rows(1)[0]['name']
+        response = self.client.get('/api/employee/', {'search': name})
+        self.assertEqual([row['name'] for row in response.data['results']], [name])
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_037_values_serializer_output_matches_serializer(self):
+        self.department.update(save=True, manager=self.employee)
+        EmployeeFactory(position=None, department=None, status=None)
+        EmployeeFactory.create_batch(3)
+        urls = ['/api/employee/?page_size=3', f'/api/employee/{self.employee.id}/']
+        lean = [self.client.get(url) for url in urls]
+        lean.append(self.client.get(lean[0].data['next']))
+        with mock.patch.object(EmployeeViewSet, 'values_serializer_actions', ()):
+            expected = [self.client.get(url) for url in urls]
+            expected.append(self.client.get(expected[0].data['next']))
+        for response, expected_response in zip(lean, expected):
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, expected_response.content)
+
+    def test_038_sparse_fieldsets_shape_response_and_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/employee/', {'fields': 'id,name'})
+        self.assertEqual(response.data['results'], [{'id': self.employee.id, 'name': 'John Doe'}])
+        sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('address', sql)
+        self.assertNotIn('JOIN', sql)
+
+        response = self.client.get('/api/employee/', {'fields': 'id,position,status', 'expand': 'position'})
+        row = response.data['results'][0]
+        self.assertEqual(row['position']['name'], 'Developer')
+        self.assertEqual(row['status'], self.status.id)
+
+        response = self.client.get(f'/api/employee/{self.employee.id}/', {'fields': 'name,department.name'})
+        self.assertEqual(response.data, {'name': 'John Doe', 'department': {'name': 'IT'}})
+
+        response = self.client.get('/api/employee/', {'expand': ''})
+        row = response.data['results'][0]
+        self.assertEqual((row['position'], row['department'], row['status']), (self.position.id, self.department.id, self.status.id))
+
+        response = self.client.get('/api/employee/export/', {'fields': 'name'})
+        self.assertEqual(b''.join(response.streaming_content), b'{"name":"John Doe"}\n')
+
+    def test_039_sparse_fieldsets_reject_unknown_fields(self):
+        for params in ({'fields': 'id,salary'}, {'fields': 'name.first'}, {'expand': 'address'}):
+            response = self.client.get('/api/employee/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         
+    def test_040_stats_are_aggregated_in_the_database(self):
+        EmployeeFactory(position=PositionFactory(salary=2000), department=self.department, is_manager=True)
+        EmployeeFactory(position=None, department=None, status=self.status)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/employee/stats/')
+        self.assertEqual(len([query for query in queries if 'employee_employee' in query['sql']]), 1)
+        self.assertEqual(response.data['headcount'], 3)
+        self.assertEqual(response.data['managers'], 1)
+        self.assertEqual(response.data['salary_total'], f'{self.position.salary + 2000:.2f}')
+
+        response = self.client.get('/api/employee/stats/department/')
+        self.assertEqual(
+            [(row['id'], row['name'], row['headcount']) for row in response.data['results']],
+            [(self.department.id, 'IT', 2), (None, None, 1)],
+        )
+        self.assertIsNone(response.data['results'][1]['salary_total'])
+
+        response = self.client.get('/api/employee/stats/status/', {'department': self.department.id})
+        self.assertEqual([row['headcount'] for row in response.data['results']], [1, 1])
+
+        response = self.client.get('/api/employee/stats/timeline/', {'bucket': 'year'})
+        self.assertEqual(response.data['bucket'], 'year')
+        [row] = response.data['results']
+        self.assertEqual(row['headcount'], 3)
+        self.assertEqual(row['period'].month, 1)
+
+    def test_041_stats_filter_on_created(self):
+        Employee.objects.filter(pk=self.employee.pk).update(created='2020-06-15T10:00:00Z')
+        EmployeeFactory()
+        response = self.client.get('/api/employee/stats/', {'created_before': '2021-01-01'})
+        self.assertEqual(response.data['headcount'], 1)
+        response = self.client.get('/api/employee/stats/timeline/', {'bucket': 'month', 'created_after': '2020-01-01T00:00:00Z'})
+        self.assertEqual([row['headcount'] for row in response.data['results']], [1, 1])
+        for params in ({'bucket': 'decade'}, {'created_after': 'yesterday'}, {'created_before': '2020-13-01'}):
+            response = self.client.get('/api/employee/stats/timeline/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_042_stats_are_cached_until_employee_or_lookup_writes(self):
+        self.client.get('/api/employee/stats/department/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/employee/stats/department/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        EmployeeFactory(department=self.department)
+        response = self.client.get('/api/employee/stats/department/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['headcount'], 2)
+
+        self.department.update(save=True, name="Engineering")
+        response = self.client.get('/api/employee/stats/department/')
+        self.assertEqual(response.data['results'][0]['name'], "Engineering")
+
+        self.client.get('/api/employee/stats/')
+        self.client.post('/api/employee/bulk/', self.get_bulk_rows(2), 'json')
+        response = self.client.get('/api/employee/stats/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['headcount'], 4)
+
+
+    def test_043_upload_image_exposes_variant_urls(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        buffer = io.BytesIO()
+        Image.new('RGB', (400, 200)).save(buffer, 'PNG')
+        upload = SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+        url = f'/api/employee/{self.employee.id}/'
+        with override_settings(MEDIA_ROOT=media_root, IMAGE_VARIANTS={'SIZES': {'thumbnail': 100}}, TASKS={'EAGER': True}):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(url, {'image': upload}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('image', response.data)
+            response = self.client.get(url)
+        thumbnail = response.data['image_variants']['thumbnail']
+        self.assertEqual((thumbnail['width'], thumbnail['height']), (100, 50))
+        self.assertTrue(thumbnail['webp'].startswith('/media/variants/'))
+        self.assertTrue(thumbnail['jpeg'].endswith('.jpg'))
+        self.assertEqual(self.client.get('/api/employee/').data['results'][0]['image_variants'], response.data['image_variants'])
+
+
+    @override_settings(TASKS={'EAGER': True})
+    def test_044_bulk_upsert_runs_in_background_when_asked(self):
+        headers = {'HTTP_PREFER': 'respond-async', 'HTTP_IDEMPOTENCY_KEY': 'import-1'}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/employee/bulk/', self.get_bulk_rows(3), 'json', **headers)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        response = self.client.get(response['Location'])
+        self.assertEqual(response.data['status'], 'succeeded')
+        self.assertEqual(response.data['result'], {'created': 3, 'updated': 0})
+        self.assertEqual(Employee.objects.count(), 4)
+
+        again = self.client.post('/api/employee/bulk/', self.get_bulk_rows(3), 'json', **headers)
+        self.assertEqual(again.data['id'], response.data['id'])
+        invalid = self.client.post('/api/employee/bulk/', [{"name": ""}], 'json', **headers)
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def get_import_file(self):
+        rows = [
+            "Name,Address,Is Manager,Position,Department,Status",
+            "Jane Roe,1 Main St,yes,Developer,IT,Active",
+            "John Doe,2 Main St,,Developer,,",
+            "Nobody,3 Main St,maybe,Designer,IT,Active",
+        ]
+        return SimpleUploadedFile('staff.csv', '\n'.join(rows).encode(), content_type='text/csv')
+
+    def test_045_import_file(self):
+        import_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, import_root, ignore_errors=True)
+        with override_settings(IMPORT_ROOT=import_root):
+            response = self.client.post('/api/employee/import/', {'file': self.get_import_file()}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                {key: response.data[key] for key in ('rows', 'created', 'updated', 'failed')},
+                {'rows': 3, 'created': 1, 'updated': 1, 'failed': 1},
+            )
+            self.assertEqual(response.data['errors'][0]['row'], 4)
+            self.assertIn('Unknown position', response.data['errors'][0]['errors'])
+            jane = Employee.objects.get(name="Jane Roe")
+            self.assertEqual((jane.is_manager, jane.position, jane.department), (True, self.position, self.department))
+            self.assertIsNone(Employee.objects.get(name="John Doe").department)
+
+            unsupported = SimpleUploadedFile('staff.txt', b'name', content_type='text/plain')
+            response = self.client.post('/api/employee/import/', {'file': unsupported}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            headerless = SimpleUploadedFile('staff.csv', b'Jane Roe,1 Main St', content_type='text/csv')
+            response = self.client.post('/api/employee/import/', {'file': headerless}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(os.listdir(import_root), [])
+
+    def test_046_import_file_in_background(self):
+        import_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, import_root, ignore_errors=True)
+        with override_settings(IMPORT_ROOT=import_root, TASKS={'EAGER': True}):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    '/api/employee/import/', {'file': self.get_import_file()}, format='multipart',
+                    HTTP_PREFER='respond-async',
+                )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        response = self.client.get(response['Location'])
+        self.assertEqual(response.data['status'], 'succeeded')
+        self.assertEqual(response.data['result']['created'], 1)
+        self.assertEqual(response.data['result']['failed'], 1)
+        self.assertEqual(os.listdir(import_root), [])
+
+    def test_047_list_if_modified_since_sees_deletes(self):
+        older = EmployeeFactory(position=self.position, department=self.department, status=self.status)
+        Employee.objects.filter(pk=older.pk).update(last_updated=self.employee.last_updated - timedelta(days=1))
+        response = self.client.get('/api/employee/')
+        self.assertEqual(len(response.data['results']), 2)
+        since = http_date(self.employee.last_updated.timestamp() + 1)
+        older.delete()
+        response = self.client.get('/api/employee/', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_048_bulk_upsert_evicts_cached_details(self):
+        url = f'/api/employee/{self.employee.id}/'
+        self.client.get(url)
+        rows = [{
+            "name": "John Doe",
+            "address": "Moved",
+            "position": self.position.id,
+            "department": self.department.id,
+            "status": self.status.id,
+        }]
+        response = self.client.post('/api/employee/bulk/', rows, 'json')
+        self.assertEqual(response.data, {"created": 0, "updated": 1})
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['address'], "Moved")
+
+    def test_049_browsable_api_is_not_cached_across_users(self):
+        url = f'/api/employee/{self.employee.id}/'
+        other = UserFactory()
+        for user in (self.user, other):
+            self.client.force_authenticate(user)
+            response = self.client.get(url, HTTP_ACCEPT='text/html')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(response.has_header('X-Cache'))
+            self.assertIn(user.username, response.content.decode())
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+
 class StatusAPITestCase(APITestCase):
 
     def setUp(self):
         super().setUp()
+        lookup_cache.clear()
+        response_cache.clear()
         self.user = UserFactory()
         self.token = TokenFactory(user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
@@ -193,7 +726,7 @@ class StatusAPITestCase(APITestCase):
     def test_001_get_status_list(self):
         response = self.client.get('/api/status/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_002_get_status_detail(self):
         response = self.client.get(f'/api/status/{self.status.id}/')
@@ -225,10 +758,21 @@ class StatusAPITestCase(APITestCase):
         self.status.refresh_from_db()
         self.assertEqual(self.status.name, "Archived")
 
+    def test_007_detail_is_cached_and_invalidated_by_writes(self):
+        self.client.get(f'/api/status/{self.status.id}/')
+        self.client.patch(f'/api/status/{self.status.id}/', {"name": "Archived"})
+        response = self.client.get(f'/api/status/{self.status.id}/')
+        self.assertEqual(response.data['name'], "Archived")
+        self.client.delete(f'/api/status/{self.status.id}/')
+        response = self.client.get(f'/api/status/{self.status.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 class DepartmentAPITestCase(APITestCase):
 
     def setUp(self):
         super().setUp()
+        lookup_cache.clear()
+        response_cache.clear()
         self.user = UserFactory()
         self.token = TokenFactory(user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
@@ -237,7 +781,7 @@ class DepartmentAPITestCase(APITestCase):
     def test_001_get_department_list(self):
         response = self.client.get('/api/department/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_002_get_department_detail(self):
         response = self.client.get(f'/api/department/{self.department.id}/')
@@ -269,10 +813,40 @@ class DepartmentAPITestCase(APITestCase):
         self.department.refresh_from_db()
         self.assertEqual(self.department.name, "Operations")
 
+    def test_007_list_serves_summary_in_one_query(self):
+        position = PositionFactory(salary=1500)
+        EmployeeFactory(department=self.department, position=position, is_manager=True)
+        EmployeeFactory(department=self.department, position=position)
+        for _ in range(3):
+            DepartmentFactory()
+        self.client.get(f'/api/department/{self.department.id}/')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/department/', {'page_size': 10})
+        row = next(row for row in response.data['results'] if row['id'] == self.department.id)
+        self.assertEqual((row['headcount'], row['managers'], row['salary_total']), (2, 1, '3000.00'))
+
+        EmployeeFactory(department=self.department, position=None)
+        response = self.client.get(f'/api/department/{self.department.id}/')
+        self.assertEqual(response.data['headcount'], 3)
+
+    def test_008_conditional_get_sees_summary_changes(self):
+        for enabled in (True, False):
+            with self.subTest(response_cache=enabled), override_settings(RESPONSE_CACHE={'ENABLED': enabled}):
+                for url in (f'/api/department/{self.department.id}/', '/api/department/'):
+                    etag = self.client.get(url)['ETag']
+                    EmployeeFactory(department=self.department)
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertNotEqual(response['ETag'], etag)
+        response = self.client.get(f'/api/department/{self.department.id}/')
+        self.assertEqual(response.data['headcount'], 4)
+
 class PositionAPITestCase(APITestCase):
 
     def setUp(self):
         super().setUp()
+        lookup_cache.clear()
+        response_cache.clear()
         self.user = UserFactory()
         self.token = TokenFactory(user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
@@ -281,7 +855,7 @@ class PositionAPITestCase(APITestCase):
     def test_001_get_position_list(self):
         response = self.client.get('/api/position/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_002_get_position_detail(self):
         response = self.client.get(f'/api/position/{self.position.id}/')
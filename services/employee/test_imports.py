@@ -0,0 +1,189 @@
+import csv
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from openpyxl import Workbook
+
+from apps.employee import summary
+from apps.employee.factories import DepartmentFactory, PositionFactory, StatusFactory
+from apps.employee.models import Employee
+from apps.task.models import Task
+from apps.task.worker import claim, execute
+from services.employee import imports
+from services.employee.imports import EmployeeImport, get_import_storage, import_employees
+
+
+class Interrupted(Exception):
+    pass
+
+
+class EmployeeImportTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.developer = PositionFactory(name="Developer", salary=1000)
+        PositionFactory(name="Analyst", salary=1000)
+        PositionFactory(name="Analyst", salary=2000)
+        self.it = DepartmentFactory(name="IT")
+        StatusFactory(name="Active")
+
+    def write(self, rows, name='staff.csv'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', newline='') as file:
+            csv.writer(file).writerows(rows)
+        return path
+
+    def read_report(self, path):
+        with open(path, newline='') as file:
+            return list(csv.reader(file))
+
+    def test_resumes_after_interruption(self):
+        path = self.write([
+            ['name', 'address', 'position', 'position_salary', 'department', 'status'],
+            ['Ann', '1 Main St', 'Developer', '', 'IT', 'Active'],
+            ['Bob', '2 Main St', 'Analyst', '', 'IT', ''],
+            ['Cid', '3 Main St', 'Analyst', '2000', 'IT', ''],
+            ['Dee', '', 'Developer', '', 'Sales', ''],
+            ['Eve', '5 Main St', '', '', '', ''],
+        ])
+
+        def interrupt(state):
+            raise Interrupted
+
+        with self.assertRaises(Interrupted):
+            EmployeeImport(path, chunk_size=2).run(progress=interrupt)
+        self.assertEqual(list(Employee.objects.values_list('name', flat=True)), ['Ann'])
+
+        out = StringIO()
+        call_command('import_employees', path, '--resume', '--chunk-size', '2', stdout=out)
+        self.assertIn('Imported 5 rows: 3 created, 0 updated, 2 failed.', out.getvalue())
+        self.assertEqual(sorted(Employee.objects.values_list('name', flat=True)), ['Ann', 'Cid', 'Eve'])
+        self.assertEqual(Employee.objects.get(name='Cid').position.salary, 2000)
+        report = self.read_report(f'{path}.errors.csv')
+        self.assertEqual([row[:2] for row in report], [['row', 'name'], ['3', 'Bob'], ['5', 'Dee']])
+        self.assertIn('position_salary', report[1][2])
+        self.assertIn('address', report[2][2])
+        self.assertIn('Unknown department "Sales"', report[2][2])
+        self.assertEqual(summary.check(), [])
+
+        # Finished imports aren't repeated; without --resume they start over.
+        call_command('import_employees', path, '--resume', stdout=out)
+        self.assertEqual(Employee.objects.count(), 3)
+        out = StringIO()
+        call_command('import_employees', path, stdout=out)
+        self.assertIn('0 created, 3 updated, 2 failed.', out.getvalue())
+
+    def test_updates_only_the_columns_given(self):
+        call_command('import_employees', self.write([
+            ['name', 'address', 'is_manager', 'position', 'department', 'status'],
+            ['Ann', '1 Main St', 'yes', 'Developer', 'IT', 'Active'],
+            ['Bob', '2 Main St', 'no', 'Developer', 'IT', ''],
+        ]), stdout=StringIO())
+        out = StringIO()
+        call_command('import_employees', self.write([
+            ['name', 'address'],
+            ['Ann', '9 New St'],
+            ['Cid', ''],
+        ], name='addresses.csv'), stdout=out)
+        self.assertIn('0 created, 1 updated, 1 failed.', out.getvalue())
+        ann = Employee.objects.get(name='Ann')
+        self.assertEqual(ann.address, '9 New St')
+        self.assertEqual(
+            (ann.is_manager, ann.position, ann.department, ann.status.name),
+            (True, self.developer, self.it, 'Active'),
+        )
+
+        call_command('import_employees', self.write([
+            ['name', 'is_manager', 'department'],
+            ['Bob', 'yes', ''],
+            ['Dee', 'no', 'IT'],
+        ], name='managers.csv'), stdout=out)
+        bob = Employee.objects.get(name='Bob')
+        self.assertEqual((bob.address, bob.is_manager, bob.department, bob.position), ('2 Main St', True, None, self.developer))
+        self.assertFalse(Employee.objects.filter(name='Dee').exists())
+        self.assertEqual(summary.check(), [])
+
+    def test_reads_xlsx(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['Name', 'Address', 'Is Manager', 'Position', 'Position Salary', 'Department'])
+        sheet.append(['Ann', '1 Main St', True, 'Analyst', 2000, 'IT'])
+        sheet.append([None, None, None, None, None, None])
+        sheet.append(['Bob', '2 Main St', None, 'Analyst', None, None])
+        path = os.path.join(self.directory, 'staff.xlsx')
+        workbook.save(path)
+        out = StringIO()
+        call_command('import_employees', path, stdout=out)
+        self.assertIn('Imported 2 rows: 1 created, 0 updated, 1 failed.', out.getvalue())
+        ann = Employee.objects.get(name='Ann')
+        self.assertEqual((ann.is_manager, ann.position.salary, ann.department), (True, 2000, self.it))
+        self.assertEqual(self.read_report(f'{path}.errors.csv')[1][:2], ['4', 'Bob'])
+
+    def test_failed_import_task_removes_the_upload(self):
+        with override_settings(IMPORT_ROOT=self.directory):
+            name = get_import_storage().save('upload.csv', StringIO('name,address\nAnn,1 Main St\n'))
+            queued = import_employees.enqueue(name=name, format='csv')
+            Task.objects.filter(pk=queued.pk).update(attempts=queued.max_attempts - 1)
+            [pk] = claim(1, 300, 'worker')
+            self.assertTrue(os.path.exists(os.path.join(self.directory, name)))
+            with mock.patch.object(EmployeeImport, 'run', side_effect=RuntimeError('database went away')):
+                with self.assertLogs('apps.task', 'WARNING'):
+                    self.assertEqual(execute(pk), Task.FAILED)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_rejects_unreadable_files(self):
+        with self.assertRaises(CommandError):
+            call_command('import_employees', self.write([['address'], ['1 Main St']]), stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('import_employees', self.write([['name']], name='staff.txt'), stdout=StringIO())
+
+
+class EmployeeImportTaskTestCase(TransactionTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        PositionFactory(name="Developer", salary=1000)
+        DepartmentFactory(name="IT")
+        StatusFactory(name="Active")
+
+    def test_retry_resumes_after_the_committed_chunks(self):
+        rows = '\n'.join(f'E{number},{number} Main St,Developer,IT,Active' for number in range(1, 6))
+        write_employees = imports.write_employees
+        writes = []
+
+        def fail_second_chunk(*args, **kwargs):
+            writes.append(args)
+            if len(writes) == 2:
+                raise RuntimeError('database went away')
+            return write_employees(*args, **kwargs)
+
+        with override_settings(IMPORT_ROOT=self.directory), mock.patch.object(EmployeeImport, 'chunk_size', 2):
+            name = get_import_storage().save('upload.csv', StringIO(f'name,address,position,department,status\n{rows}\n'))
+            queued = import_employees.enqueue(name=name, format='csv')
+            [pk] = claim(1, 300, 'worker')
+            with mock.patch.object(imports, 'write_employees', fail_second_chunk):
+                with self.assertLogs('apps.task', 'WARNING'):
+                    self.assertEqual(execute(pk), Task.PENDING)
+            # The first chunk committed before the second failed.
+            self.assertEqual(sorted(Employee.objects.values_list('name', flat=True)), ['E1', 'E2'])
+
+            Task.objects.filter(pk=pk).update(run_at=timezone.now())
+            [pk] = claim(1, 300, 'worker')
+            self.assertEqual(execute(pk), Task.SUCCEEDED)
+        queued.refresh_from_db()
+        self.assertEqual(sorted(Employee.objects.values_list('name', flat=True)), ['E1', 'E2', 'E3', 'E4', 'E5'])
+        self.assertEqual(
+            {key: queued.result[key] for key in ('rows', 'created', 'updated', 'failed')},
+            {'rows': 5, 'created': 5, 'updated': 0, 'failed': 0},
+        )
+        self.assertEqual(summary.check(), [])
+        self.assertEqual(os.listdir(self.directory), [])
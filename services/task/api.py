@@ -0,0 +1,19 @@
+from rest_framework import mixins
+from services.core import viewsets, permissions
+from services.auth.authentication import CachedTokenAuthentication
+from apps.task.models import Task
+from .serializers import TaskSerializer
+
+
+class TaskViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Status of background tasks, e.g. the one a 202 response points to.
+    Users only see the tasks they queued.
+    """
+    queryset = Task.objects.all()
+    serializer_class = TaskSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(created_by=self.request.user)
@@ -0,0 +1,8 @@
+from rest_framework import serializers
+from apps.task.models import Task
+
+
+class TaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ['id', 'name', 'status', 'attempts', 'max_attempts', 'run_at', 'result', 'created', 'last_updated']
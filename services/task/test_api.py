@@ -0,0 +1,22 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.task.queue import enqueue
+from apps.user.factories import TokenFactory, UserFactory
+
+
+class TaskAPITestCase(APITestCase):
+
+    def setUp(self):
+        self.owner = UserFactory()
+        self.task = enqueue('apps.employee.images.process_image', {'pk': 1, 'name': 'photo.png'}, created_by=self.owner)
+
+    def get_task(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + TokenFactory(user=user).key)
+        return self.client.get(f'/api/task/{self.task.pk}/')
+
+    def test_001_only_the_creator_sees_a_task(self):
+        response = self.get_task(self.owner)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(self.get_task(UserFactory()).status_code, status.HTTP_404_NOT_FOUND)
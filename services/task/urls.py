@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .api import TaskViewSet
+
+router = DefaultRouter()
+router.register(r'task', TaskViewSet)
+
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
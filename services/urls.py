@@ -19,5 +19,6 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('services.auth.urls')),
-    path('api/', include('services.employee.urls'))
+    path('api/', include('services.employee.urls')),
+    path('api/', include('services.task.urls')),
 ]
@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
+from importlib.util import find_spec
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -43,9 +45,13 @@ INSTALLED_APPS = [
     
     'apps.user',
     'apps.employee',
+    'apps.task',
 ]
 
 MIDDLEWARE = [
+    'services.core.middleware.InstrumentationMiddleware',
+    'services.core.middleware.CompressionMiddleware',
+    'services.core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,6 +59,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'services.core.middleware.AsyncViewMiddleware',
 ]
 
 ROOT_URLCONF = 'services.urls'
@@ -75,11 +82,110 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'wsgi.application'
 
+ASGI_APPLICATION = 'asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
 
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+
+# Database aliases safe requests may read from, see core.db.routers and
+# services.core.middleware.ReplicaRoutingMiddleware. Empty means every
+# query goes to 'default'.
+REPLICA_ROUTING = {
+    'REPLICAS': [],
+    'STICKY_SECONDS': 10,
+    'CACHE': 'default',
+    'PRIMARY_HEADER': 'X-Read-Primary',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared tier of the employee lookup cache. Point this at a
+    # FileBasedCache (or memcached/redis) to share it between workers.
+    'lookups': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'lookups',
+        'TIMEOUT': 300,
+    },
+    # Must be shared by every worker serving the API, see settings/prod.py;
+    # locmem is only right for a single process.
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+    },
+}
+
+EMPLOYEE_LOOKUP_CACHE = {
+    'ALIAS': 'lookups',
+    'MAX_SIZE': 1024,
+    'LOCAL_TTL': 30,
+    'TIMEOUT': 300,
+}
+
+# Rendered list/detail responses, evicted by model and row tags.
+RESPONSE_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'responses',
+    'TIMEOUT': 300,
+}
+
+# gzip, plus brotli/zstd when installed, see core.compression. The
+# response cache keeps compressed copies of its entries.
+RESPONSE_COMPRESSION = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,
+    'ENCODINGS': ['zstd', 'br', 'gzip'],
+    'LEVELS': {'gzip': 6, 'br': 5, 'zstd': 3},
+}
+
+# Full-text search, see core.search. 'auto' uses SQLite FTS5 or MySQL
+# FULLTEXT and falls back to an in-process index on other databases.
+SEARCH_BACKEND = {
+    'BACKEND': 'auto',
+    'MAX_RESULTS': 1000,
+}
+
+# Resized, metadata free copies of uploaded images, built by the task
+# worker, see core.images.
+IMAGE_VARIANTS = {
+    'SIZES': {'thumbnail': 128, 'small': 320, 'medium': 800},
+    'FORMATS': ['webp', 'jpeg'],
+    'QUALITY': 80,
+    'PREFIX': 'employee/variants',
+}
+
+# Database backed background tasks, see apps.task. Run the worker with
+# `manage.py run_tasks`; EAGER runs tasks in-process after commit instead.
+TASKS = {
+    'EAGER': os.getenv('TASKS_EAGER', '') == '1',
+    'PROCESSES': 2,
+    'POLL_INTERVAL': 1.0,
+    'LEASE': 300,
+}
+
+AUTH_TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+}
+
+
+# Per request timings and query counts, see services.core.instrumentation.
+API_INSTRUMENTATION = {
+    'ENABLED': os.getenv('API_INSTRUMENTATION', '') == '1',
+    'BUFFER_SIZE': 1000,
+    'LOG': False,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -118,4 +224,35 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Uploaded employee import files with their progress and error reports,
+# see services.employee.imports. Kept out of MEDIA_ROOT: they hold personal
+# data and mustn't be served. The task worker must see the same directory.
+IMPORT_ROOT = os.getenv('IMPORT_ROOT', os.path.join(tempfile.gettempdir(), 'employee_management', 'imports'))
+
 AUTH_USER_MODEL = 'user.User'
+
+
+# Django REST framework
+
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'services.core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    # orjson backed JSON, byte for byte what DRF's JSONRenderer produces.
+    'DEFAULT_RENDERER_CLASSES': [
+        'services.core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'services.core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Accept: application/msgpack when msgpack is installed.
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('services.core.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('services.core.parsers.MessagePackParser')
@@ -8,5 +8,18 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, os.getenv('DB_NAME')),
+        # Task worker processes write concurrently: take the write lock when
+        # a transaction starts, so they wait for it instead of failing.
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
     }
 }
+
+# Set DB_REPLICA_NAME to a copy of the database file to try replica reads
+# locally.
+if os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, os.getenv('DB_REPLICA_NAME')),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_ROUTING = {**REPLICA_ROUTING, 'REPLICAS': ['replica']}
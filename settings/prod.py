@@ -1,15 +1,31 @@
-from .base import *
 import os
 
+from .base import *
+from core.db.config import database_settings, replica_settings
+
 DEBUG = False
 
+# Connection handling (persistent connections, health checks, per worker
+# pool) is configured with DB_* variables, see core.db.config. Pool usage
+# is reported by core.db.pool.pool_stats().
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': os.getenv('DB_NAME'),
-        'USER': os.getenv('DB_USER'),
-        'PASSWORD': os.getenv('DB_PASSWORD'),
-        'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT'),
-    }
-}
\ No newline at end of file
+    'default': database_settings('mysql'),
+}
+
+# Safe requests read from the replicas listed in DB_REPLICA_HOSTS.
+DATABASES.update(replica_settings(DATABASES['default']))
+REPLICA_ROUTING = {**REPLICA_ROUTING, 'REPLICAS': [alias for alias in DATABASES if alias != 'default']}
+
+# Writes evict cached responses by bumping tag versions in the cache, so
+# every worker has to read the same cache: a LocMemCache would keep
+# serving other workers' stale entries until they time out. The file
+# based cache is shared by the workers of one host; set
+# RESPONSE_CACHE_BACKEND/RESPONSE_CACHE_LOCATION to a memcached or redis
+# cache when several hosts serve the API.
+CACHES = {
+    **CACHES,
+    'responses': {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', '/var/tmp/employee_management/responses'),
+    },
+}